@@ -0,0 +1,56 @@
+import pytest
+import numpy as np
+import xarray as xr
+
+from dea_tools.bandindices import calculate_indices, _normalise_bands
+
+
+@pytest.fixture()
+def native_ds():
+    # Create native int16 surface reflectance data, with nodata pixels
+    red = np.array([[[1000, 2000], [-999, 3000]]], dtype=np.int16)
+    nir = np.array([[[3000, 2000], [4000, -999]]], dtype=np.int16)
+    return xr.Dataset(
+        {
+            "nbart_red": (("time", "y", "x"), red, {"nodata": -999}),
+            "nbart_nir": (("time", "y", "x"), nir, {"nodata": -999}),
+        }
+    )
+
+
+def test_normalise_bands(native_ds):
+    ds = native_ds.assign(
+        float_band=native_ds.nbart_red.astype("float64"),
+        bool_band=native_ds.nbart_red > 0,
+    )
+    normalised = _normalise_bands(ds, 10000.0)
+
+    # Verify integer bands are converted to float32 with nodata as NaN
+    assert normalised.nbart_red.dtype == np.float32
+    np.testing.assert_allclose(
+        normalised.nbart_red.values, [[[0.1, 0.2], [np.nan, 0.3]]], rtol=1e-6
+    )
+
+    # Verify float bands are divided as before, and booleans unchanged
+    assert normalised.float_band.dtype == np.float64
+    np.testing.assert_allclose(normalised.float_band.values, ds.float_band / 10000)
+    xr.testing.assert_equal(normalised.bool_band, ds.bool_band)
+
+
+@pytest.mark.parametrize("chunks", [None, {"x": 1}])
+def test_calculate_indices_native(native_ds, chunks):
+    if chunks is not None:
+        native_ds = native_ds.chunk(chunks)
+
+    # Verify indices from integer data are float32, with NaN where any
+    # input band is nodata
+    ds = calculate_indices(native_ds, index="NDVI", collection="ga_ls_3")
+    assert ds.NDVI.dtype == np.float32
+    np.testing.assert_allclose(
+        ds.NDVI.values, [[[0.5, 0.0], [np.nan, np.nan]]], rtol=1e-6
+    )
+
+    # Verify results match indices calculated from float data
+    float_ds = native_ds.where(native_ds != -999).astype("float64")
+    expected = calculate_indices(float_ds, index="NDVI", collection="ga_ls_3")
+    np.testing.assert_allclose(ds.NDVI.values, expected.NDVI.values, rtol=1e-6)
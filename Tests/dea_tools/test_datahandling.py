@@ -0,0 +1,1085 @@
+import os
+import zipfile
+import time
+import hashlib
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+import datacube
+import rioxarray
+import numpy as np
+import dask.array as da
+import pandas as pd
+import xarray as xr
+import odc.algo
+
+from odc.algo import mask_cleanup
+from odc.geo.geobox import GeoBox
+from scipy.ndimage import binary_dilation
+from skimage.color import hsv2rgb, rgb2hsv
+from skimage.exposure import match_histograms
+
+from dea_tools import datahandling
+from dea_tools.datahandling import (
+    ARDCache,
+    DatasetCache,
+    first,
+    last,
+    nearest,
+    parallel_apply,
+    load_reproject,
+    download_unzip,
+    dilate,
+    wofs_fuser,
+    wofs_decode_flags,
+    wofs_clear_wet,
+    load_ard,
+    xr_pansharpen,
+)
+
+FMASK_FLAGS = {
+    "fmask": {
+        "bits": [0, 1, 2, 3, 4, 5, 6, 7],
+        "values": {
+            "0": "nodata",
+            "1": "valid",
+            "2": "cloud",
+            "3": "shadow",
+            "4": "snow",
+            "5": "water",
+        },
+    }
+}
+
+
+class FakeDataset:
+    # Minimal stand-in for `datacube.model.Dataset`, holding the pixel
+    # values returned when it is loaded by `FakeDatacube.load`
+    def __init__(self, id, center_time, bands=None, properties=None, extent=None):
+        self.id = id
+        self.center_time = pd.Timestamp(center_time).to_pydatetime()
+        self.bands = bands
+        self.metadata_doc = {"properties": properties or {}}
+        self.extent = extent
+
+
+class FakeDatacube:
+    # Minimal stand-in for `datacube.Datacube` that records searches
+    # and loads, returning either placeholder strings or `datasets`
+    group_datasets = staticmethod(datacube.Datacube.group_datasets)
+
+    def __init__(self, url="postgresql://fake", datasets=None):
+        self.index = type("FakeIndex", (), {"url": url})()
+        self.datasets = datasets
+        self.calls = []
+        self.loads = []
+
+    def find_datasets(self, product, **query):
+        self.calls.append((product, query))
+        if self.datasets is not None:
+            return list(self.datasets)
+        return [f"{product}_{i}" for i in range(3)]
+
+    def load(self, datasets, measurements, dask_chunks=None, **kwargs):
+        # Stack the first dataset of each observation along time
+        self.loads.append(measurements)
+        grouped = self.group_datasets(datasets, "time")
+        ds = xr.Dataset(
+            {
+                band: (
+                    ("time", "y", "x"),
+                    np.stack([group[0].bands[band] for group in grouped.values]),
+                    (
+                        {"flags_definition": FMASK_FLAGS}
+                        if band == "oa_fmask"
+                        else {"nodata": 255 if "contiguity" in band else -999}
+                    ),
+                )
+                for band in measurements
+            },
+            coords={"time": grouped.time.values},
+        )
+        if dask_chunks is not None:
+            ds = ds.chunk({"time": 1, "x": 5, **dask_chunks})
+        return ds
+
+
+@pytest.fixture()
+def ard_dc():
+    # Create fake Landsat datasets with increasing amounts of cloud
+    rng = np.random.default_rng(0)
+    datasets = []
+    for i, cloud in enumerate([0.0, 0.3, 0.6, 0.9, 0.1]):
+        fmask = rng.choice([1, 4, 5], size=(8, 12)).astype(np.uint8)
+        fmask[rng.random((8, 12)) < cloud] = 2
+        fmask[0, 0] = 0
+        contiguity = (rng.random((8, 12)) > 0.1).astype(np.uint8)
+        red = rng.integers(0, 5000, size=(8, 12)).astype(np.int16)
+        red[1, :3] = -999
+        bands = {
+            "nbart_red": red,
+            "nbart_green": red // 2,
+            "oa_fmask": fmask,
+            "oa_nbart_contiguity": contiguity,
+        }
+        datasets.append(FakeDataset(i, f"2020-01-{i + 1:02}", bands))
+    return FakeDatacube(datasets=datasets)
+
+
+def test_dataset_cache():
+    dc = FakeDatacube()
+    cache = DatasetCache()
+
+    # Verify repeated searches are only run once, and that load-only
+    # parameters do not affect cache keys
+    first_result = cache.find_datasets(dc, "ls8", time="2020")
+    first_result.append("modified")
+    result = cache.find_datasets(dc, "ls8", time="2020", output_crs="EPSG:3577")
+    assert result == ["ls8_0", "ls8_1", "ls8_2"]
+    assert len(dc.calls) == 1
+
+    # Verify predicates are applied after the cached search
+    result = cache.find_datasets(
+        dc, "ls8", time="2020", dataset_predicate=lambda ds: ds.endswith("1")
+    )
+    assert result == ["ls8_1"]
+    assert len(dc.calls) == 1
+
+    # Verify different queries, products and indexes are searched again
+    cache.find_datasets(dc, "ls8", time="2021")
+    cache.find_datasets(dc, "ls9", time="2020")
+    cache.find_datasets(FakeDatacube(url="postgresql://other"), "ls8", time="2020")
+    assert len(dc.calls) == 3
+
+
+def test_dataset_cache_key():
+    dc = FakeDatacube()
+
+    # Verify keys are stable regardless of parameter order, and differ
+    # between products
+    key = DatasetCache._make_key(dc, "ls8", {"time": "2020", "x": (1, 2)})
+    assert key == DatasetCache._make_key(dc, "ls8", {"x": (1, 2), "time": "2020"})
+    assert key != DatasetCache._make_key(dc, "ls9", {"time": "2020", "x": (1, 2)})
+
+
+def test_dataset_cache_lru():
+    dc = FakeDatacube()
+    cache = DatasetCache(maxsize=2)
+
+    # Verify least recently used query is evicted once `maxsize` is
+    # exceeded, and that re-used queries are kept
+    cache.find_datasets(dc, "a")
+    cache.find_datasets(dc, "b")
+    cache.find_datasets(dc, "a")
+    cache.find_datasets(dc, "c")
+    assert len(dc.calls) == 3
+    cache.find_datasets(dc, "a")
+    assert len(dc.calls) == 3
+    cache.find_datasets(dc, "b")
+    assert len(dc.calls) == 4
+
+
+def test_dataset_cache_ttl(monkeypatch):
+    dc = FakeDatacube()
+    cache = DatasetCache(ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(datahandling.time, "time", lambda: now[0])
+
+    # Verify results are re-used until they expire
+    cache.find_datasets(dc, "ls8")
+    now[0] += 59
+    cache.find_datasets(dc, "ls8")
+    assert len(dc.calls) == 1
+    now[0] += 2
+    cache.find_datasets(dc, "ls8")
+    assert len(dc.calls) == 2
+
+
+def test_dataset_cache_disk(tmp_path, monkeypatch):
+    dc = FakeDatacube()
+    now = [1000.0]
+    monkeypatch.setattr(datahandling.time, "time", lambda: now[0])
+
+    # Verify results persisted to disk are re-used by a new cache
+    DatasetCache(cache_dir=tmp_path).find_datasets(dc, "ls8")
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+    result = DatasetCache(cache_dir=tmp_path).find_datasets(dc, "ls8")
+    assert result == ["ls8_0", "ls8_1", "ls8_2"]
+    assert len(dc.calls) == 1
+
+    # Verify expired results on disk are removed and searched again
+    now[0] += 7200
+    DatasetCache(cache_dir=tmp_path, ttl=3600).find_datasets(dc, "ls8")
+    assert len(dc.calls) == 2
+
+    # Verify clearing the cache removes results from disk
+    DatasetCache(cache_dir=tmp_path).clear()
+    assert len(list(tmp_path.glob("*.pkl"))) == 0
+
+
+@pytest.fixture()
+def nan_da():
+    # Create time series with missing values; pixel (0, 0) contains
+    # only NaN values, and pixel (0, 1) contains no NaN values
+    values = np.array(
+        [
+            [[np.nan, 1.0], [2.0, np.nan]],
+            [[np.nan, 3.0], [np.nan, 4.0]],
+            [[np.nan, 5.0], [np.nan, np.nan]],
+            [[np.nan, 7.0], [8.0, 9.0]],
+        ]
+    )
+    return xr.DataArray(
+        values,
+        dims=("time", "y", "x"),
+        coords={
+            "time": pd.date_range("2020-01-01", periods=4, freq="10D"),
+            "y": [1, 0],
+            "x": [0, 1],
+        },
+    )
+
+
+@pytest.mark.parametrize("chunks", [None, {"x": 1, "time": 2}])
+def test_first_last(nan_da, chunks):
+    if chunks is not None:
+        nan_da = nan_da.chunk(chunks)
+
+    first_da = first(nan_da, dim="time", index_name="idx")
+    last_da = last(nan_da, dim="time", index_name="idx")
+
+    # Verify that dask arrays remain lazy
+    assert (first_da.chunks is None) == (chunks is None)
+
+    # Verify expected values, times and indices are returned
+    np.testing.assert_equal(first_da.values, [[np.nan, 1.0], [2.0, 4.0]])
+    np.testing.assert_equal(last_da.values, [[np.nan, 7.0], [8.0, 9.0]])
+    assert (first_da.time.values[1] == nan_da.time.values[[0, 1]]).all()
+    assert (last_da.time.values[1] == nan_da.time.values[[3, 3]]).all()
+    np.testing.assert_equal(first_da.idx.values[1], [0, 1])
+    np.testing.assert_equal(last_da.idx.values[1], [-1, -1])
+
+
+@pytest.mark.parametrize("chunks", [None, {"x": 1}])
+@pytest.mark.parametrize(
+    "target, expected",
+    [
+        ("2020-01-01", [[np.nan, 1.0], [2.0, 4.0]]),  # Start of time series
+        ("2020-01-14", [[np.nan, 3.0], [2.0, 4.0]]),  # Between timesteps
+        ("2020-01-28", [[np.nan, 7.0], [8.0, 9.0]]),  # Between timesteps
+        ("2021-01-01", [[np.nan, 7.0], [8.0, 9.0]]),  # After time series
+    ],
+)
+def test_nearest(nan_da, chunks, target, expected):
+    if chunks is not None:
+        nan_da = nan_da.chunk(chunks)
+
+    nearest_da = nearest(nan_da, dim="time", target=target, index_name="idx")
+
+    # Verify expected values are returned, and that returned times
+    # and indices match the values that were selected
+    np.testing.assert_equal(nearest_da.values, expected)
+    selected = nan_da.isel(time=nearest_da.idx.compute())
+    np.testing.assert_equal(selected.values, nearest_da.values)
+    assert (selected.time == nearest_da.time).all()
+
+
+def _scale_offset(ds, scale, offset=0):
+    return ds * scale + offset
+
+
+@pytest.mark.parametrize("use_threads", [True, False])
+def test_parallel_apply(nan_da, use_threads):
+    ds = nan_da.to_dataset(name="band").fillna(0)
+
+    # Apply function with both args and kwargs
+    out = parallel_apply(ds, "time", _scale_offset, use_threads, 2, offset=1)
+
+    # Verify output matches applying function to entire dataset
+    xr.testing.assert_allclose(out, _scale_offset(ds, 2, offset=1))
+
+    # Verify DataArrays are returned as DataArrays
+    out_da = parallel_apply(ds.band, "time", _scale_offset, use_threads, scale=2)
+    assert isinstance(out_da, xr.DataArray)
+    xr.testing.assert_allclose(out_da, ds.band * 2)
+
+
+def test_parallel_apply_lazy(nan_da):
+    # Verify lazy inputs are supported without being loaded in place
+    da_lazy = nan_da.fillna(0).chunk({"time": 1})
+    out = parallel_apply(da_lazy, "time", _scale_offset, True, 2)
+    xr.testing.assert_allclose(out, _scale_offset(da_lazy, 2).compute())
+    assert da_lazy.chunks is not None
+
+
+@pytest.fixture()
+def dem_tiles(tmp_path):
+    # Split elevation data into four tiles
+    raster_path = "Supplementary_data/Reprojecting_data/canberra_dem_250m.tif"
+    da = rioxarray.open_rasterio(raster_path)
+    tile_paths = []
+    for i, (y, x) in enumerate([(0, 0), (0, 50), (45, 0), (45, 50)]):
+        tile_path = str(tmp_path / f"tile_{i}.tif")
+        da.isel(y=slice(y, y + 45), x=slice(x, x + 50)).rio.to_raster(tile_path)
+        tile_paths.append(tile_path)
+    return raster_path, tile_paths
+
+
+@pytest.mark.parametrize(
+    "how",
+    [
+        GeoBox.from_bbox((149.0, -35.4, 149.1, -35.3), "EPSG:4326", resolution=0.001),
+        "EPSG:4326",
+    ],
+    ids=["geobox", "crs"],
+)
+@pytest.mark.parametrize("masked", [True, False])
+def test_load_reproject_mosaic(dem_tiles, how, masked):
+    raster_path, tile_paths = dem_tiles
+
+    # Verify that mosaicking tiles gives same result as whole raster
+    params = dict(how=how, resolution="same", masked=masked)
+    da = load_reproject(raster_path, **params).compute()
+    da_mosaic = load_reproject(tile_paths, **params).compute()
+    assert da.shape == da_mosaic.shape
+    assert da_mosaic.dtype == ("float32" if masked else "int16")
+    np.testing.assert_allclose(da.values, da_mosaic.values)
+
+    # Verify that unmasked gaps between tiles are filled, and that
+    # pixels outside all tiles are set to nodata
+    if not masked:
+        assert da_mosaic.odc.nodata == -32768
+        assert (da_mosaic == -32768).sum() == (da == -32768).sum()
+
+
+@pytest.mark.parametrize("masked", [True, False])
+def test_load_reproject_mixed_nodata(tmp_path, masked):
+    raster_path = "Supplementary_data/Reprojecting_data/canberra_dem_250m.tif"
+    da = rioxarray.open_rasterio(raster_path).squeeze("band")
+
+    # Create a tile with a gap, and a second overlapping tile with a
+    # different nodata value and a gap outside the first tile
+    tile_a = da.isel(x=slice(0, 50)).copy()
+    tile_a[:10] = -32768
+    tile_a.rio.write_nodata(-32768, inplace=True).rio.to_raster(tmp_path / "a.tif")
+    tile_b = da.copy()
+    tile_b[:10, 60:70] = -9999
+    tile_b.rio.write_nodata(-9999, inplace=True).rio.to_raster(tmp_path / "b.tif")
+
+    # Verify gaps in the first tile are filled by the second, and that
+    # gaps in the second tile use the first tile's nodata value
+    out = load_reproject(
+        [tmp_path / "a.tif", tmp_path / "b.tif"], how=da.odc.geobox, masked=masked
+    ).compute()
+    if masked:
+        assert out.isnull().sum() == 100
+    else:
+        assert out.dtype == "int16"
+        assert out.odc.nodata == -32768
+        assert out.attrs["nodata"].dtype == "int16"
+        assert (out == -32768).sum() == 100
+        assert not (out == -9999).any()
+    np.testing.assert_allclose(out.values[10:], da.values[10:])
+    np.testing.assert_allclose(out.values[:10, :60], da.values[:10, :60])
+
+
+@pytest.mark.parametrize("single", [True, False])
+def test_load_reproject_no_overlap(dem_tiles, single):
+    raster_path, tile_paths = dem_tiles
+
+    # Verify that an array of NaN is returned if no rasters overlap
+    geobox = GeoBox.from_bbox((0, 0, 1, 1), "EPSG:4326", resolution=0.1)
+    da = load_reproject(raster_path if single else tile_paths, how=geobox)
+    assert da.shape == geobox.shape
+    assert da.isnull().all()
+
+
+@pytest.fixture()
+def zip_server(tmp_path):
+    # Create zip file to serve
+    serve_dir = tmp_path / "server"
+    serve_dir.mkdir()
+    zip_path = serve_dir / "test_data.zip"
+    with zipfile.ZipFile(zip_path, "w") as zip_ref:
+        zip_ref.writestr("test_data/data.txt", "Digital Earth Australia\n" * 1000)
+    requests_made = []
+
+    # Local HTTP server that supports range requests
+    class RangeRequestHandler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(serve_dir), **kwargs)
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests_made.append(self.headers.get("Range"))
+            data = zip_path.read_bytes()
+            start = 0
+            if self.headers.get("Range"):
+                start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                if start >= len(data):
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(data)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(206)
+            else:
+                self.send_response(200)
+            self.send_header("Content-Length", str(len(data) - start))
+            self.end_headers()
+            self.wfile.write(data[start:])
+
+    server = HTTPServer(("localhost", 0), RangeRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://localhost:{server.server_port}/test_data.zip"
+    yield url, zip_path, requests_made
+    server.shutdown()
+
+
+def test_download_unzip(zip_server, tmp_path, monkeypatch):
+    url, _, _ = zip_server
+    monkeypatch.chdir(tmp_path)
+
+    download_unzip(url, output_dir="output")
+
+    # Verify files are extracted and zip is removed
+    assert (tmp_path / "output" / "test_data" / "data.txt").exists()
+    assert not (tmp_path / "test_data.zip").exists()
+
+
+def test_download_unzip_cache(zip_server, tmp_path):
+    url, zip_path, requests_made = zip_server
+    cache_dir = tmp_path / "cache"
+    checksum = hashlib.sha256(zip_path.read_bytes()).hexdigest()
+
+    # Simulate an interrupted previous download
+    cache_dir.mkdir()
+    (cache_dir / "test_data.zip.part").write_bytes(zip_path.read_bytes()[:100])
+
+    # Verify download is resumed using a range request
+    download_unzip(url, output_dir=tmp_path / "output_1", cache_dir=cache_dir)
+    assert requests_made == ["bytes=100-"]
+    assert (tmp_path / "output_1" / "test_data" / "data.txt").exists()
+    assert (cache_dir / checksum).is_dir()
+
+    # Verify cached files are re-used without downloading again,
+    # both with and without a checksum
+    download_unzip(url, output_dir=tmp_path / "output_2", cache_dir=cache_dir)
+    download_unzip(
+        url,
+        output_dir=tmp_path / "output_3",
+        cache_dir=cache_dir,
+        checksum=f"sha256:{checksum}",
+    )
+    assert len(requests_made) == 1
+    assert (tmp_path / "output_3" / "test_data" / "data.txt").exists()
+
+
+@pytest.mark.parametrize("extra_bytes", [0, 10])
+def test_download_unzip_complete_part(zip_server, tmp_path, extra_bytes):
+    url, zip_path, requests_made = zip_server
+    cache_dir = tmp_path / "cache"
+    size = len(zip_path.read_bytes())
+
+    # Simulate a complete (or corrupt, oversized) previous download
+    cache_dir.mkdir()
+    part_data = zip_path.read_bytes() + b"x" * extra_bytes
+    (cache_dir / "test_data.zip.part").write_bytes(part_data)
+
+    # Verify a complete partial file is used without downloading
+    # again, while an oversized file is downloaded from scratch
+    download_unzip(
+        url, output_dir=tmp_path / "output", cache_dir=cache_dir, remove_zip=False
+    )
+    expected = [f"bytes={size + extra_bytes}-"] + ([None] if extra_bytes else [])
+    assert requests_made == expected
+    assert (tmp_path / "output" / "test_data" / "data.txt").exists()
+    assert (cache_dir / "test_data.zip").read_bytes() == zip_path.read_bytes()
+    assert not (cache_dir / "test_data.zip.part").exists()
+
+
+def test_download_unzip_checksum(zip_server, tmp_path):
+    url, _, _ = zip_server
+
+    # Verify error is raised if checksum does not match
+    with pytest.raises(ValueError):
+        download_unzip(
+            url,
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            checksum="md5:00000000000000000000000000000000",
+        )
+    assert not os.path.exists(tmp_path / "output")
+
+
+@pytest.mark.parametrize("dilation", [0, 1, 5, 20])
+@pytest.mark.parametrize("invert", [True, False])
+def test_dilate(dilation, invert):
+    # Create random cloud mask, including all-valid and all-invalid
+    # timesteps
+    rng = np.random.default_rng(0)
+    array = rng.random((4, 60, 80)) > 0.02
+    array[1] = True
+    array[2] = False
+
+    # Reference dilation using a disk kernel
+    y, x = np.ogrid[-dilation : (dilation + 1), -dilation : (dilation + 1)]
+    kernel = (x * x) + (y * y) <= (dilation + 0.5) ** 2
+    expected = ~binary_dilation(
+        ~array if invert else array, structure=kernel[np.newaxis]
+    )
+
+    # Verify numpy and dask outputs are identical to reference
+    np.testing.assert_array_equal(dilate(array, dilation, invert), expected)
+    dask_array = da.from_array(array, chunks=(1, 20, 30))
+    np.testing.assert_array_equal(
+        dilate(dask_array, dilation, invert).compute(), expected
+    )
+
+    # Verify xarray inputs return xarray outputs with the same coords
+    xr_array = xr.DataArray(
+        array, dims=("time", "y", "x"), coords={"time": np.arange(4)}
+    )
+    out = dilate(xr_array, dilation, invert)
+    assert isinstance(out, xr.DataArray)
+    assert out.dims == xr_array.dims
+    xr.testing.assert_identical(out.time, xr_array.time)
+    np.testing.assert_array_equal(out.values, expected)
+
+
+@pytest.fixture()
+def wo_da():
+    # Create random WO data from a range of valid flag combinations
+    rng = np.random.default_rng(0)
+    values = np.array([0, 1, 2, 3, 4, 8, 16, 32, 64, 68, 128, 129, 130, 136, 192])
+    return xr.DataArray(
+        rng.choice(values, size=(3, 40, 50)).astype(np.uint8),
+        dims=("time", "y", "x"),
+    )
+
+
+def test_wofs_fuser(wo_da):
+    dest, src = wo_da.values[0].copy(), wo_da.values[1]
+
+    # Reference implementation using boolean indexing
+    expected = dest.copy()
+    empty = (expected & 1).astype(bool)
+    both = ~empty & ~((src & 1).astype(bool))
+    expected[empty] = src[empty]
+    expected[both] |= src[both]
+
+    wofs_fuser(dest, src)
+    np.testing.assert_array_equal(dest, expected)
+
+
+def test_wofs_decode_flags(wo_da):
+    flags_ds = wofs_decode_flags(wo_da.chunk({"x": 10}))
+    assert flags_ds.wet.chunks is not None
+    flags_ds = flags_ds.compute()
+    assert ((flags_ds.wet == (wo_da >= 128)).all()).item()
+    assert ((flags_ds.nodata == (wo_da % 2 == 1)).all()).item()
+
+    # Verify subset of flags can be decoded
+    flags_ds = wofs_decode_flags(wo_da, flags=["cloud"])
+    assert list(flags_ds.data_vars) == ["cloud"]
+    assert ((flags_ds.cloud == ((wo_da & 64) > 0)).all()).item()
+
+
+def test_wofs_clear_wet(wo_da):
+    clear_wet_ds = wofs_clear_wet(wo_da)
+    assert ((clear_wet_ds.clear == wo_da.isin([0, 128])).all()).item()
+    assert ((clear_wet_ds.wet == (wo_da == 128)).all()).item()
+
+
+def _is_clear(dataset):
+    return True
+
+
+@pytest.fixture()
+def fake_load_ard(monkeypatch):
+    # Replace `load_ard` with a function that records its parameters
+    # and returns a small dataset based on the query
+    calls = []
+
+    def _fake_load_ard(dc, dask_chunks=None, dataset_cache=False, **params):
+        calls.append(params)
+        values = np.full((2, 20, 20), params.get("min_gooddata", 0), dtype="float32")
+        return xr.Dataset(
+            {"nbart_red": (("time", "y", "x"), values)},
+            coords={"time": pd.date_range("2020-01-01", periods=2)},
+        )
+
+    monkeypatch.setattr(datahandling, "load_ard", _fake_load_ard)
+    return calls
+
+
+def test_ard_cache(fake_load_ard, tmp_path):
+    dc = FakeDatacube()
+    ard_cache = ARDCache(tmp_path)
+    query = dict(products=["ls8"], time="2020", dataset_predicate=_is_clear)
+
+    # Verify data is loaded on the first call, then read from cache
+    ds = load_ard(dc, min_gooddata=0.5, ard_cache=ard_cache, **query)
+    ds_cached = load_ard(dc, min_gooddata=0.5, ard_cache=ard_cache, **query)
+    assert len(fake_load_ard) == 1
+    assert fake_load_ard[0]["min_gooddata"] == 0.5
+    assert fake_load_ard[0]["dataset_predicate"] is _is_clear
+    xr.testing.assert_equal(ds, ds_cached)
+    assert ds_cached.nbart_red.chunks is None
+
+    # Verify lazy data is returned if `dask_chunks` is provided
+    ds_lazy = load_ard(
+        dc, dask_chunks={}, min_gooddata=0.5, ard_cache=ard_cache, **query
+    )
+    assert ds_lazy.nbart_red.chunks is not None
+    assert len(fake_load_ard) == 1
+
+    # Verify different parameters are loaded again
+    load_ard(dc, min_gooddata=0.8, ard_cache=ard_cache, **query)
+    assert len(fake_load_ard) == 2
+    assert len(list(tmp_path.glob("*.zarr"))) == 2
+
+    # Verify lambda functions are never cached
+    with pytest.warns(UserWarning):
+        ard_cache.load_ard(dc, products=["ls8"], dataset_predicate=lambda ds: True)
+    assert len(fake_load_ard) == 3
+    assert len(list(tmp_path.glob("*.zarr"))) == 2
+
+    # Verify cache can be cleared
+    ard_cache.clear()
+    assert len(list(tmp_path.glob("*.zarr"))) == 0
+
+
+def test_ard_cache_eviction(fake_load_ard, tmp_path):
+    dc = FakeDatacube()
+    ard_cache = ARDCache(tmp_path, max_size=None)
+
+    # Create two cached stores, with the first used least recently
+    ard_cache.load_ard(dc, products=["ls8"], min_gooddata=0.1)
+    ard_cache.load_ard(dc, products=["ls8"], min_gooddata=0.2)
+    path_1, path_2 = [
+        ard_cache._path(DatasetCache._make_key(dc, ["ls8"], params))
+        for params in fake_load_ard
+    ]
+    os.utime(path_1, (1000, 1000))
+    os.utime(path_2, (2000, 2000))
+
+    # Verify a cache hit marks the store as recently used
+    ard_cache.load_ard(dc, products=["ls8"], min_gooddata=0.1)
+    assert len(fake_load_ard) == 2
+    assert os.path.getmtime(path_1) > os.path.getmtime(path_2)
+
+    # Verify that once `max_size` is exceeded, the least recently used
+    # store is removed
+    ard_cache.max_size = 2.5 * ARDCache._store_size(path_1)
+    ard_cache.load_ard(dc, products=["ls8"], min_gooddata=0.3)
+    assert os.path.exists(path_1)
+    assert not os.path.exists(path_2)
+    assert len(list(tmp_path.glob("*.zarr"))) == 2
+
+
+@pytest.mark.parametrize("dtype", ["native", "float32"])
+def test_load_ard_return_mask(ard_dc, dtype):
+    query = dict(
+        products=["ga_ls8c_ard_3"],
+        measurements=["nbart_red"],
+        mask_contiguity=True,
+        dtype=dtype,
+    )
+
+    # Verify combined pixel quality and contiguity mask is returned
+    ds = load_ard(ard_dc, return_mask=True, **query)
+    raw = ard_dc.load(ard_dc.datasets, ["oa_fmask", "oa_nbart_contiguity"])
+    expected = raw.oa_fmask.isin([1, 4, 5]) & (raw.oa_nbart_contiguity == 1)
+    assert ds.good_data.dtype == bool
+    np.testing.assert_array_equal(ds.good_data.values, expected.values)
+
+    # Verify masked pixels are nodata or NaN, and that the mask is not
+    # returned by default
+    masked = ds.nbart_red.values[~ds.good_data.values]
+    assert (masked == -999).all() if dtype == "native" else np.isnan(masked).all()
+    assert "good_data" not in load_ard(ard_dc, **query).data_vars
+
+
+@pytest.mark.parametrize(
+    "properties, cloud_mask, expected",
+    [
+        ({"fmask:clear": 60, "fmask:snow": 10, "fmask:water": 20}, "fmask", 0.9),
+        ({"s2cloudless:clear": 70, "eo:cloud_cover": 50}, "s2cloudless", 0.7),
+        ({"fmask:clear": 60, "eo:cloud_cover": 25}, "fmask", 0.75),
+        ({}, "fmask", None),
+    ],
+)
+def test_scene_gooddata(properties, cloud_mask, expected):
+    # Verify good data is estimated from pixel quality metadata,
+    # falling back to `eo:cloud_cover` and then unknown (None)
+    pq_categories = ["valid", "snow", "water"] if cloud_mask == "fmask" else ["valid"]
+    dataset = FakeDataset("a", "2020-01-01", properties=properties)
+    result = datahandling._scene_gooddata(dataset, cloud_mask, pq_categories)
+    assert result == pytest.approx(expected) if expected else result is None
+
+
+def test_metadata_prefilter(capsys):
+    from odc.geo.geom import box
+
+    # Two half-overlapping scenes per day, with one scene per day
+    # covering the query area
+    query_area = box(0, 0, 1000, 1000, "EPSG:3577")
+    scene_properties = [
+        ("2020-01-01", [{"fmask:clear": 90, "eo:cloud_cover": 10}] * 2),
+        ("2020-01-02", [{"fmask:clear": 20, "eo:cloud_cover": 80}] * 2),
+        ("2020-01-03", [{"fmask:clear": 20, "eo:cloud_cover": 80}, {}]),
+        ("2020-01-04", [{}, {}]),
+    ]
+    datasets = [
+        FakeDataset(
+            f"{time}-{i}",
+            time,
+            properties=properties,
+            extent=query_area if i == 0 else box(500, 0, 1500, 1000, "EPSG:3577"),
+        )
+        for time, scenes in scene_properties
+        for i, properties in enumerate(scenes)
+    ]
+    dc = FakeDatacube(datasets=datasets)
+    params = dict(
+        query={"x": (0, 1000), "y": (0, 1000), "crs": "EPSG:3577"},
+        cloud_mask="fmask",
+        pq_categories=["valid"],
+        group_by="time",
+    )
+
+    def _filter(**kwargs):
+        filtered = datahandling._metadata_prefilter(dc, datasets, **params, **kwargs)
+        return [ds.id for ds in filtered]
+
+    # Verify observations that can't meet `min_gooddata` are removed,
+    # while observations with unknown cloud cover are kept
+    assert _filter(min_gooddata=0.5) == [
+        "2020-01-01-0",
+        "2020-01-01-1",
+        "2020-01-03-0",
+        "2020-01-03-1",
+        "2020-01-04-0",
+        "2020-01-04-1",
+    ]
+
+    # Verify cloudy scenes are removed by `max_scene_cloud`, while
+    # scenes without `eo:cloud_cover` are kept
+    assert _filter(max_scene_cloud=50) == [
+        "2020-01-01-0",
+        "2020-01-01-1",
+        "2020-01-03-1",
+        "2020-01-04-0",
+        "2020-01-04-1",
+    ]
+    assert "Filtering to 5 out of 8 datasets" in capsys.readouterr().out
+
+    # Verify nothing is reported if no datasets are removed
+    assert len(_filter(max_scene_cloud=100)) == len(datasets)
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("min_gooddata", [0.3, 0.6])
+def test_load_ard_two_pass(ard_dc, min_gooddata):
+    query = dict(
+        products=["ga_ls8c_ard_3"],
+        measurements=["nbart_red", "nbart_green"],
+        min_gooddata=min_gooddata,
+    )
+
+    # Verify two-pass filtering returns identical results to filtering
+    # after loading all bands
+    ds = load_ard(ard_dc, **query)
+    ds_two_pass = load_ard(ard_dc, two_pass=True, **query)
+    xr.testing.assert_identical(ds, ds_two_pass)
+    assert 0 < len(ds.time) < len(ard_dc.datasets)
+
+    # Verify the first pass loads only the pixel quality band
+    assert ard_dc.loads[-2] == ["oa_fmask"]
+
+
+@pytest.fixture()
+def fake_iter_load_ard(monkeypatch):
+    # Replace `load_ard` with a function returning lazy data that
+    # records which timesteps are computed, and fails on timestep 3
+    computed = []
+
+    def _record(block, block_info=None):
+        i = block_info[0]["chunk-location"][0]
+        if i == 3:
+            raise RuntimeError("Failed to load timestep 3")
+        computed.append(i)
+        return block
+
+    def _fake_load_ard(dc, products=None, dask_chunks=None, **kwargs):
+        values = da.arange(5, chunks=1)[:, None, None] * da.ones(
+            (5, 4, 4), chunks=(1, 4, 4)
+        )
+        data = values.map_blocks(_record, dtype=values.dtype)
+        return xr.Dataset(
+            {"nbart_red": (("time", "y", "x"), data)},
+            coords={"time": pd.date_range("2020-01-01", periods=5)},
+        )
+
+    monkeypatch.setattr(datahandling, "load_ard", _fake_load_ard)
+    return computed
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_ard(fake_iter_load_ard, prefetch):
+    # Verify batches are yielded in order as in-memory data
+    batches = datahandling.iter_ard(None, batch_size=2, prefetch=prefetch)
+    ds_batch = next(batches)
+    assert ds_batch.nbart_red.chunks is None
+    np.testing.assert_array_equal(ds_batch.nbart_red[:, 0, 0], [0, 1])
+
+    # Verify exceptions raised while loading are propagated
+    with pytest.raises(RuntimeError, match="timestep 3"):
+        next(batches)
+
+
+def test_iter_ard_close(fake_iter_load_ard):
+    # Verify that closing the generator early stops prefetching, and
+    # leaves no background loads running
+    batches = datahandling.iter_ard(None, prefetch=True)
+    next(batches)
+    batches.close()
+    n_computed = len(fake_iter_load_ard)
+    assert n_computed <= 2
+    time.sleep(0.2)
+    assert len(fake_iter_load_ard) == n_computed
+
+
+@pytest.mark.parametrize("dtype", ["native", "float32"])
+@pytest.mark.parametrize(
+    "mask_filters, mask_contiguity",
+    [(None, False), (None, True), ([("dilation", 1)], False), ([("opening", 1)], True)],
+)
+def test_load_ard_masking(ard_dc, dtype, mask_filters, mask_contiguity):
+    measurements = ["nbart_red", "nbart_green"]
+    ds = load_ard(
+        ard_dc,
+        products=["ga_ls8c_ard_3"],
+        measurements=measurements,
+        mask_filters=mask_filters,
+        mask_contiguity=mask_contiguity,
+        dtype=dtype,
+        dask_chunks={"x": 4},
+    )
+
+    # Calculate expected output using separate masking and dtype
+    # conversion steps on chunked data
+    raw = ard_dc.load(
+        ard_dc.datasets,
+        measurements + ["oa_fmask", "oa_nbart_contiguity"],
+        dask_chunks={"x": 4},
+    )
+    mask = odc.algo.fmask_to_bool(raw.oa_fmask, categories=["valid", "snow", "water"])
+    if mask_filters is not None:
+        mask = ~mask_cleanup(~mask, mask_filters=mask_filters)
+    if mask_contiguity:
+        mask = mask & (raw.oa_nbart_contiguity == 1)
+    expected = odc.algo.keep_good_only(raw[measurements], mask)
+    if dtype != "native":
+        expected = odc.algo.to_float(expected, dtype=dtype)
+
+    # Verify outputs are identical, including dtypes and nodata attrs
+    assert raw.oa_fmask.dtype == np.uint8
+    assert ds.nbart_red.chunks is not None
+    xr.testing.assert_identical(ds.compute(), expected.compute())
+
+
+@pytest.fixture()
+def pansharpen_ds():
+    # Create a multi-timestep dataset where multispectral bands are
+    # positively or negatively correlated with the pan band
+    rng = np.random.default_rng(0)
+    pan = rng.random((3, 10, 12))
+    signs = np.array([1, -1, 1])[:, None, None]
+    bands = {
+        band: 0.5 + signs * scale * (pan - 0.5) + 0.1 * rng.random(pan.shape)
+        for band, scale in [
+            ("nbart_red", 0.8),
+            ("nbart_green", 0.6),
+            ("nbart_blue", 0.3),
+        ]
+    }
+    bands["nbart_panchromatic"] = pan
+    return xr.Dataset(
+        {band: (("time", "y", "x"), values) for band, values in bands.items()},
+        coords={
+            "time": pd.date_range("2020-01-01", periods=3),
+            "y": np.arange(10),
+            "x": np.arange(12),
+        },
+    )
+
+
+def _pca_pansharpen_reference(ds_i, pan_band, pca_rescaling):
+    # Reference PCA pansharpening for a single timestep using
+    # `sklearn.decomposition.PCA`, ignoring pixels with missing data
+    from sklearn.decomposition import PCA
+
+    da_2d = (
+        ds_i.to_array()
+        .stack(pixel=("y", "x"))
+        .transpose("pixel", "variable")
+        .dropna(dim="pixel")
+    )
+    da_2d_nopan = da_2d.drop_sel(variable=pan_band)
+    pan = da_2d.sel(variable=pan_band).values
+
+    pca = PCA()
+    pca_array = pca.fit_transform(da_2d_nopan)
+    if pca_rescaling == "simple":
+        pca_array[:, 0] = (pan - pan.mean()) * (
+            pca_array[:, 0].std() / pan.std()
+        ) + pca_array[:, 0].mean()
+    else:
+        pca_array[:, 0] = match_histograms(pan, pca_array[:, 0])
+
+    da_2d_nopan[:] = pca.inverse_transform(pca_array)
+    return da_2d_nopan.unstack("pixel").to_dataset("variable")
+
+
+@pytest.mark.parametrize("pca_rescaling", ["simple", "histogram"])
+@pytest.mark.parametrize("parallelise", [False, True])
+def test_xr_pansharpen_pca(pansharpen_ds, pca_rescaling, parallelise):
+    # Add missing data to one timestep
+    ds = pansharpen_ds.copy(deep=True)
+    ds["nbart_red"][0, :2, :3] = np.nan
+
+    # Verify outputs match a separate `sklearn` PCA fitted to each
+    # timestep, including the sign of the first principal component
+    # (which affects the result when the pan band is rescaled)
+    ds_pansharpened = xr_pansharpen(
+        ds, transform="pca", pca_rescaling=pca_rescaling, parallelise=parallelise
+    )
+    for i in range(len(ds.time)):
+        expected = _pca_pansharpen_reference(
+            ds.isel(time=i), "nbart_panchromatic", pca_rescaling
+        ).reindex_like(ds.isel(time=i))
+        xr.testing.assert_allclose(
+            ds_pansharpened.isel(time=i), expected[list(ds_pansharpened.data_vars)]
+        )
+
+    # Verify lazy data gives the same results
+    ds_lazy = xr_pansharpen(
+        ds.chunk({"time": 1}), transform="pca", pca_rescaling=pca_rescaling
+    )
+    assert ds_lazy.nbart_red.chunks is not None
+    xr.testing.assert_allclose(ds_lazy.compute(), ds_pansharpened)
+
+
+@pytest.mark.parametrize("pca_rescaling", ["simple", "histogram"])
+def test_xr_pansharpen_pca_single_pixel(pansharpen_ds, pca_rescaling):
+    # Mask all but one pixel in the first timestep
+    ds = pansharpen_ds.copy(deep=True)
+    ds["nbart_red"][0] = np.nan
+    ds["nbart_red"][0, 0, 0] = 0.5
+
+    # Verify the single valid pixel is passed through unchanged, without
+    # affecting other timesteps
+    with np.errstate(all="raise"):
+        ds_pansharpened = xr_pansharpen(
+            ds, transform="pca", pca_rescaling=pca_rescaling
+        )
+    first = ds_pansharpened.isel(time=0)
+    expected = ds[list(ds_pansharpened.data_vars)].isel(time=0, y=0, x=0)
+    xr.testing.assert_allclose(first.isel(y=0, x=0), expected)
+    assert first.to_array().isnull().sum() == 3 * (10 * 12 - 1)
+    assert ds_pansharpened.isel(time=slice(1, None)).to_array().notnull().all()
+
+
+@pytest.mark.parametrize("parallelise", [False, True])
+def test_xr_pansharpen_hsv(pansharpen_ds, parallelise):
+    # Verify outputs match converting each timestep to HSV, replacing
+    # value with the pan band and converting back to RGB
+    ds_pansharpened = xr_pansharpen(
+        pansharpen_ds, transform="hsv", parallelise=parallelise
+    )
+    rgb_bands = ["nbart_red", "nbart_green", "nbart_blue"]
+    for i in range(len(pansharpen_ds.time)):
+        ds_i = pansharpen_ds.isel(time=i)
+        hsv = rgb2hsv(np.stack([ds_i[band].values for band in rgb_bands], axis=-1))
+        hsv[..., 2] = ds_i.nbart_panchromatic.values
+        expected = hsv2rgb(hsv)
+        for j, band in enumerate(rgb_bands):
+            np.testing.assert_allclose(
+                ds_pansharpened[band].isel(time=i).values, expected[..., j]
+            )
+
+    # Verify a single timestep without a time dimension is supported
+    ds_single = xr_pansharpen(pansharpen_ds.isel(time=0), transform="hsv")
+    xr.testing.assert_allclose(ds_single, ds_pansharpened.isel(time=0))
+
+
+def _brovey_esri_reference(ds, transform, band_weights):
+    # Reference Brovey and ESRI pansharpening using `xarray` weighted
+    # sums and means across bands
+    da_nopan = ds.drop_vars("nbart_panchromatic").to_array()
+    da_pan = ds.nbart_panchromatic
+    weights = xr.DataArray(
+        [1.0] * 3 if band_weights is None else list(band_weights.values()),
+        coords={"variable": list(da_nopan["variable"].values)},
+    )
+    if transform == "brovey":
+        da_total = da_nopan.weighted(weights).sum(dim="variable")
+        return (da_nopan / da_total * da_pan).to_dataset("variable")
+    else:
+        da_mean = da_nopan.weighted(weights).mean(dim="variable")
+        return (da_nopan + (da_pan - da_mean)).to_dataset("variable")
+
+
+@pytest.mark.parametrize("transform", ["brovey", "esri"])
+@pytest.mark.parametrize(
+    "band_weights",
+    [None, {"nbart_red": 0.4, "nbart_green": 0.4, "nbart_blue": 0.2}],
+)
+@pytest.mark.parametrize("output_dtype", [None, "int16"])
+def test_xr_pansharpen_brovey_esri(
+    pansharpen_ds, transform, band_weights, output_dtype
+):
+    # Scale data to integer-like values, with one missing pixel if
+    # outputs are floating point
+    ds = (pansharpen_ds * 1000).astype("float32")
+    if output_dtype is None:
+        ds["nbart_blue"][1, 2, 3] = np.nan
+
+    # Verify outputs match reference weighted sum/mean calculations,
+    # in both the input float32 and a requested integer dtype
+    ds_pansharpened = xr_pansharpen(
+        ds, transform=transform, band_weights=band_weights, output_dtype=output_dtype
+    )
+    expected = _brovey_esri_reference(ds, transform, band_weights)
+    expected = expected.astype(output_dtype or "float32")
+    assert all(ds_pansharpened[band].dtype == expected[band].dtype for band in expected)
+    xr.testing.assert_allclose(ds_pansharpened, expected[list(ds_pansharpened)])
+
+    # Verify lazy data gives the same results
+    ds_lazy = xr_pansharpen(
+        ds.chunk({"x": 5}),
+        transform=transform,
+        band_weights=band_weights,
+        output_dtype=output_dtype,
+    )
+    assert ds_lazy.nbart_red.chunks is not None
+    xr.testing.assert_allclose(ds_lazy.compute(), ds_pansharpened)
+
+
+def test_band_weights():
+    bands = ["nbart_red", "nbart_green", "nbart_blue"]
+    band_weights = {"nbart_blue": 0.2, "nbart_red": 0.4, "nbart_green": 0.4}
+
+    # Verify weights are returned in band order, or as 1 if no weights
+    assert datahandling._band_weights(bands, None) == [1.0, 1.0, 1.0]
+    assert datahandling._band_weights(bands, band_weights) == [0.4, 0.4, 0.2]
+
+    # Verify error is raised if any bands are missing weights
+    with pytest.raises(ValueError, match="nbart_green"):
+        datahandling._band_weights(bands, {"nbart_red": 0.5, "nbart_blue": 0.5})
@@ -0,0 +1,22 @@
+import numpy as np
+import xarray as xr
+
+from dea_tools.plotting import _nodata_to_nan
+
+
+def test_nodata_to_nan():
+    values = np.array([[1, -999], [3, 4]], dtype=np.int16)
+    ds = xr.Dataset(
+        {
+            "native": (("y", "x"), values, {"nodata": -999}),
+            "no_nodata": (("y", "x"), values),
+            "float": (("y", "x"), values.astype("float64"), {"nodata": -999}),
+        }
+    )
+    out = _nodata_to_nan(ds)
+
+    # Verify only integer bands with a nodata attribute are converted
+    assert out.native.dtype == np.float32
+    np.testing.assert_equal(out.native.values, [[1, np.nan], [3, 4]])
+    xr.testing.assert_identical(out.no_nodata, ds.no_nodata)
+    xr.testing.assert_identical(out["float"], ds["float"])
@@ -1,9 +1,14 @@
 import pytest
+import dask
+import warnings
+import scipy.interpolate
+import rasterstats
 import rioxarray
 import numpy as np
 import pandas as pd
 import xarray as xr
 import geopandas as gpd
+from shapely.geometry import Point
 
 import datacube
 from datacube.utils.masking import mask_invalid_data
@@ -13,7 +18,9 @@ from dea_tools.spatial import (
     xr_vectorize,
     xr_rasterize,
     xr_interpolate,
+    xr_zonal_stats,
     idw,
+    IDWInterpolator,
 )
 from dea_tools.validation import eval_metrics
 
@@ -162,6 +169,29 @@ def test_xr_vectorize_mask(categorical_da):
     assert (categorical_gdf.attribute == 1).all()
 
 
+@pytest.mark.parametrize("tile_size", [7, (10, 25)])
+@pytest.mark.parametrize("chunks", [None, 9])
+def test_xr_vectorize_tiled(categorical_da, tile_size, chunks):
+    # Vectorize data in a single pass and in tiles, from either
+    # in-memory or lazy dask data
+    categorical_gdf = xr_vectorize(categorical_da)
+    da = categorical_da if chunks is None else categorical_da.chunk(chunks)
+    tiled_gdf = xr_vectorize(da, tile_size=tile_size)
+
+    # Verify polygons split along tile seams are dissolved, giving
+    # identical polygons to vectorising in a single pass
+    assert len(tiled_gdf.index) == len(categorical_gdf.index)
+    assert tiled_gdf.crs == categorical_gdf.crs
+    expected = categorical_gdf.dissolve(by="attribute").geometry
+    tiled = tiled_gdf.dissolve(by="attribute").geometry
+    assert expected.geom_equals(tiled).all()
+
+    # Verify lazy data is vectorised in a single pass unless a tile
+    # size is provided
+    untiled_gdf = xr_vectorize(categorical_da.chunk(9))
+    assert untiled_gdf.geom_equals(categorical_gdf).all()
+
+
 def test_xr_vectorize_output_path(categorical_da):
     # Vectorize and export to file
     categorical_gdf = xr_vectorize(categorical_da, output_path="testing.geojson")
@@ -197,6 +227,28 @@ def test_xr_rasterize(categorical_da, name):
     assert rasterized_da.odc.geobox.crs == categorical_da.odc.geobox.crs
 
 
+@pytest.mark.parametrize("attribute_col", [None, "attribute"])
+def test_xr_rasterize_chunks(categorical_da, attribute_col):
+    # Create vector to rasterize
+    categorical_gdf = xr_vectorize(categorical_da)
+
+    # Rasterize vector both in memory and lazily
+    rasterized_da = xr_rasterize(
+        gdf=categorical_gdf, da=categorical_da, attribute_col=attribute_col
+    )
+    lazy_da = xr_rasterize(
+        gdf=categorical_gdf,
+        da=categorical_da,
+        attribute_col=attribute_col,
+        chunks=(20, 30),
+    )
+
+    # Verify output is lazy, and identical to in-memory output
+    assert lazy_da.chunks is not None
+    assert lazy_da.dtype == rasterized_da.dtype
+    xr.testing.assert_identical(lazy_da.compute(), rasterized_da)
+
+
 def test_xr_rasterize_output_path(categorical_da):
     # Create vector to rasterize
     categorical_gdf = xr_vectorize(categorical_da)
@@ -307,6 +359,50 @@ def test_subpixel_contours_attribute_df(dem_da, z_values, expected):
     assert contours_gdf.bar.tolist() == expected
 
 
+@pytest.mark.parametrize("chunks", [None, {"time": 1}])
+@pytest.mark.parametrize("scheduler", ["threads", "processes"])
+def test_subpixel_contours_parallel(dem_da, chunks, scheduler):
+    # Create multi-timestep array, optionally backed by dask
+    times = pd.date_range("2020-01-01", periods=3)
+    stacked_da = xr.concat(
+        [dem_da + i * 20 for i in range(len(times))], dim="time"
+    ).assign_coords(time=times)
+    if chunks is not None:
+        stacked_da = stacked_da.chunk(chunks)
+
+    with dask.config.set(scheduler=scheduler):
+        contours_gdf = subpixel_contours(stacked_da, z_values=700)
+
+    # Verify one contour per timestep, and that contours match those
+    # extracted from each individual array
+    assert contours_gdf.time.to_list() == ["2020-01-01", "2020-01-02", "2020-01-03"]
+    for i, geom in enumerate(contours_gdf.geometry):
+        expected_gdf = subpixel_contours(dem_da, z_values=700 - i * 20)
+        assert geom.equals_exact(expected_gdf.geometry.iloc[0], 1e-6)
+
+
+@pytest.mark.parametrize("tile_size", [10, (16, 25)])
+@pytest.mark.parametrize("chunks", [None, 30])
+def test_subpixel_contours_tiled(dem_da, tile_size, chunks):
+    if chunks is not None:
+        dem_da = dem_da.chunk(chunks)
+
+    # Extract contours from entire array, and from tiles. Z-values are
+    # offset from integer elevations to avoid contours touching at
+    # pixels exactly equal to the z-value, which can be split into
+    # lines in multiple equally valid ways
+    z_values = [600.5, 700.5]
+    contours_gdf = subpixel_contours(dem_da, z_values=z_values)
+    tiled_gdf = subpixel_contours(dem_da, z_values=z_values, tile_size=tile_size)
+
+    # Verify that contours are stitched across tile seams into the
+    # same continuous lines as extracting from the entire array
+    for geom, tiled_geom in zip(contours_gdf.geometry, tiled_gdf.geometry):
+        assert len(geom.geoms) == len(tiled_geom.geoms)
+        assert np.isclose(geom.length, tiled_geom.length)
+        assert geom.hausdorff_distance(tiled_geom) < 1e-6
+
+
 @pytest.mark.parametrize(
     "z_values, expected",
     [
@@ -431,9 +527,83 @@ def test_idw():
     assert np.allclose(out[:, 1], [10, 20, 30, 40])
 
 
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("block_size", [None, 70, 1000])
+@pytest.mark.parametrize("dtype", ["float64", "float32"])
+def test_idw_blocks(lazy, block_size, dtype):
+    # Create random input points and values, including missing values
+    rng = np.random.default_rng(0)
+    input_x, input_y = rng.random((2, 100))
+    output_x, output_y = rng.random((2, 500))
+    input_z = rng.random((100, 2))
+    input_z[0, 1] = np.nan
+
+    # Verify blockwise interpolation gives same result as default
+    expected = idw(input_z, input_x, input_y, output_x, output_y, max_dist=0.1)
+    out = idw(
+        input_z,
+        input_x,
+        input_y,
+        output_x,
+        output_y,
+        max_dist=0.1,
+        block_size=block_size,
+        dtype=dtype,
+        lazy=lazy,
+    )
+    assert out.dtype == dtype
+    assert (out.chunks is not None) if lazy else isinstance(out, np.ndarray)
+    assert np.allclose(out, expected, equal_nan=True, rtol=1e-5)
+
+
+@pytest.mark.parametrize("p", [2, 4, 8])
+def test_idw_float32_coincident(p):
+    # Verify outputs at input points return input values in float32,
+    # even when epsilon raised to a high power underflows float32
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        out = idw(
+            [1, 2, 3],
+            [0, 1, 2],
+            [0, 1, 2],
+            [0, 1, 2],
+            [0, 1, 2],
+            p=p,
+            k=3,
+            dtype="float32",
+        )
+    assert out.dtype == "float32"
+    assert np.allclose(out, [1, 2, 3])
+
+
+def test_idw_interpolator():
+    # Create random input points and values, including missing values
+    rng = np.random.default_rng(0)
+    input_x, input_y = rng.random((2, 100))
+    output_x, output_y = rng.random((2, 500))
+    input_z = rng.random((100, 3, 4))
+    input_z[0, 1, 2] = np.nan
+
+    # Verify interpolator gives same results as `idw` for 1D, 2D and
+    # multi-dimensional inputs, including with a distance limit
+    for kwargs in [{}, {"k": 1}, {"k": 5, "p": 2, "max_dist": 0.1, "k_min": 3}]:
+        interpolator = IDWInterpolator(input_x, input_y, output_x, output_y, **kwargs)
+        for z in [input_z[:, 0, 0], input_z[:, :, 0], input_z]:
+            out = interpolator(z)
+            assert out.shape == (500,) + z.shape[1:]
+            expected = idw(
+                z.reshape(100, -1), input_x, input_y, output_x, output_y, **kwargs
+            )
+            assert np.allclose(out.reshape(500, -1), expected, equal_nan=True)
+
+    # Verify error is raised if values do not match input points
+    with pytest.raises(ValueError):
+        interpolator(input_z[:50])
+
+
 @pytest.mark.parametrize(
     "method",
-    ["linear", "cubic", "nearest", "rbf", "idw"],
+    ["linear", "cubic", "nearest", "rbf", "rbf_local", "idw"],
 )
 def test_xr_interpolate(dem_da, points_gdf, method):
     # Run interpolation and verify that pixel grids are the same and
@@ -494,6 +664,12 @@ def test_xr_interpolate(dem_da, points_gdf, method):
     assert "z" not in interpolated_ds_cols2.data_vars
     assert "num_var" in interpolated_ds_cols2.data_vars
 
+    # Verify that interpolating multiple columns together gives the
+    # same results as interpolating each column individually
+    xr.testing.assert_allclose(
+        interpolated_ds_cols.num_var, interpolated_ds_cols2.num_var
+    )
+
     # Verify that error is raised if no numeric columns exist
     with pytest.raises(ValueError):
         xr_interpolate(
@@ -522,3 +698,140 @@ def test_xr_interpolate(dem_da, points_gdf, method):
                 method=method,
                 k=10,
             )
+
+
+def test_xr_interpolate_idw(dem_da, points_gdf):
+    # Verify IDW interpolation into a pixel grid gives the same results
+    # as applying an `IDWInterpolator` to every pixel
+    interpolated_ds = xr_interpolate(
+        dem_da, gdf=points_gdf, method="idw", k=4, p=2, block_size=100
+    )
+    points = points_gdf.to_crs(dem_da.odc.crs)
+    grid_y, grid_x = np.meshgrid(dem_da.y, dem_da.x, indexing="ij")
+    interpolator = IDWInterpolator(
+        points.geometry.x, points.geometry.y, grid_x.ravel(), grid_y.ravel(), k=4, p=2
+    )
+    expected = interpolator(points.z.values).reshape(grid_y.shape)
+    assert np.allclose(interpolated_ds["z"].values, expected)
+
+
+def test_xr_interpolate_rbf_local(dem_da, points_gdf):
+    # Interpolate using local RBFs fitted to each pixel's nearest points
+    interpolated_ds = xr_interpolate(dem_da, gdf=points_gdf, method="rbf_local", k=3)
+    geobox_test(interpolated_ds.odc.geobox, dem_da.odc.geobox)
+    assert interpolated_ds["z"].notnull().all()
+
+    # Verify outputs do not depend on chunking, so there are no seams
+    # between chunks that are interpolated separately
+    chunked_ds = xr_interpolate(
+        dem_da, gdf=points_gdf, method="rbf_local", k=3, dask_chunks={"x": 7, "y": 5}
+    )
+    np.testing.assert_allclose(chunked_ds["z"].values, interpolated_ds["z"].values)
+
+    # Verify that if `k` includes all points, results match a single
+    # RBF fitted to all points
+    points = points_gdf.to_crs(dem_da.odc.crs)
+    rbf = scipy.interpolate.RBFInterpolator(
+        np.column_stack((points.geometry.y, points.geometry.x)), points.z
+    )
+    grid_y, grid_x = np.meshgrid(dem_da.y, dem_da.x, indexing="ij")
+    expected = rbf(np.column_stack((grid_y.ravel(), grid_x.ravel())))
+    interpolated_ds = xr_interpolate(dem_da, gdf=points_gdf, method="rbf_local", k=6)
+    assert np.allclose(interpolated_ds["z"].values.ravel(), expected)
+
+    # Verify error is raised if `k` is too small for the RBF kernel,
+    # unless the kernel does not require a minimum number of points
+    with pytest.raises(ValueError):
+        xr_interpolate(dem_da, gdf=points_gdf, method="rbf_local", k=2)
+    interpolated_ds = xr_interpolate(
+        dem_da, gdf=points_gdf, method="rbf_local", k=1, kernel="linear"
+    )
+    assert interpolated_ds["z"].notnull().all()
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic", "rbf", "rbf_local", "idw"])
+@pytest.mark.parametrize("factor", [1, 3])
+def test_xr_interpolate_dask(dem_da, points_gdf, method, factor):
+    # Interpolate into memory for comparison
+    expected = xr_interpolate(dem_da, gdf=points_gdf, method=method, k=5, factor=factor)
+
+    # Verify that Dask-backed inputs return lazy outputs with matching
+    # chunks, and that these match in-memory outputs once computed
+    interpolated_ds = xr_interpolate(
+        dem_da.chunk({"x": 20, "y": 15}),
+        gdf=points_gdf,
+        method=method,
+        k=5,
+        factor=factor,
+    )
+    assert interpolated_ds["z"].chunks == dem_da.chunk({"x": 20, "y": 15}).chunks
+    xr.testing.assert_allclose(interpolated_ds.compute(), expected)
+
+    # Verify that chunks can also be set using `dask_chunks`
+    interpolated_ds = xr_interpolate(
+        dem_da,
+        gdf=points_gdf,
+        method=method,
+        k=5,
+        factor=factor,
+        dask_chunks={"x": 32},
+    )
+    assert interpolated_ds["z"].chunks[1][0] == 32
+    xr.testing.assert_allclose(interpolated_ds.compute(), expected)
+
+
+@pytest.mark.parametrize("chunks", [None, {"x": 40, "y": 30}])
+def test_xr_zonal_stats(dem_da, points_gdf, chunks):
+    # Create non-overlapping polygons around each point, plus a polygon
+    # outside the extent of `dem_da`
+    buffered = points_gdf.to_crs("EPSG:3577").buffer(2000).set_axis(list("abcdef"))
+    zones_gdf = gpd.GeoDataFrame(geometry=buffered)
+    zones_gdf.loc["g", "geometry"] = Point(0, 0).buffer(1000)
+
+    # Calculate zonal statistics
+    stats = ["count", "sum", "mean", "min", "max", "std", "median", "percentile_90"]
+    da = dem_da if chunks is None else dem_da.chunk(chunks)
+    stats_df = xr_zonal_stats(da, zones_gdf, stats=stats)
+    assert list(stats_df.columns) == stats
+    assert list(stats_df.index) == list(zones_gdf.index)
+    assert stats_df.loc["g", "count"] == 0
+    assert stats_df.loc["g", stats[1:]].isnull().all()
+
+    # Verify statistics match `rasterstats`
+    expected = rasterstats.zonal_stats(
+        list(zones_gdf.to_crs(dem_da.odc.crs).geometry[:-1]),
+        dem_da.values,
+        affine=dem_da.odc.geobox.transform,
+        nodata=np.nan if dem_da.odc.nodata is None else dem_da.odc.nodata,
+        stats=stats,
+    )
+    expected_df = pd.DataFrame(expected, index=zones_gdf.index[:-1])[stats]
+    pd.testing.assert_frame_equal(
+        stats_df.iloc[:-1].astype(float), expected_df.astype(float), check_exact=False
+    )
+
+    # Verify error is raised for unsupported statistics
+    with pytest.raises(ValueError):
+        xr_zonal_stats(da, zones_gdf, stats=["mode"])
+
+
+@pytest.mark.parametrize("chunks", [None, {"x": 40, "y": 30}])
+def test_xr_zonal_stats_percentiles(dem_da, points_gdf, chunks):
+    # Use integer data with many tied values, which are counted into
+    # the same histogram bins when calculating percentiles
+    rng = np.random.default_rng(0)
+    int_da = dem_da.copy(data=rng.integers(0, 5, dem_da.shape).astype("int16"))
+    int_da = int_da if chunks is None else int_da.chunk(chunks)
+    zones_gdf = gpd.GeoDataFrame(
+        geometry=points_gdf.to_crs("EPSG:3577").buffer(2000).values,
+        crs="EPSG:3577",
+    )
+
+    # Verify percentiles match `np.percentile` for each zone
+    stats = ["percentile_0", "percentile_25", "median", "percentile_99"]
+    stats_df = xr_zonal_stats(int_da, zones_gdf, stats=stats)
+    zones = xr_rasterize(zones_gdf.assign(zone=np.arange(1, 7)), dem_da, "zone")
+    for i, row in stats_df.iterrows():
+        values = int_da.values[zones.values == i + 1]
+        expected = np.percentile(values, [0, 25, 50, 99])
+        np.testing.assert_allclose(row.values, expected)
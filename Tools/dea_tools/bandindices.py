@@ -15,14 +15,32 @@ here: https://gis.stackexchange.com/questions/tagged/open-data-cube).
 If you would like to report an issue with this script, you can file one
 on GitHub (https://github.com/GeoscienceAustralia/dea-notebooks/issues/new).
 
-Last modified: June 2023
+Last modified: October 2026
 '''
 
 # Import required packages
 import warnings
 import numpy as np
+import odc.algo
 
 # Define custom functions
+def _normalise_bands(ds, mult):
+    """
+    Divide all bands in a dataset by `mult`. Integer bands are
+    converted directly to `float32` with nodata values set to NaN,
+    avoiding inflating native integer data to `float64`.
+    """
+
+    def _normalise(da):
+        if da.dtype == bool:
+            return da
+        elif np.issubdtype(da.dtype, np.integer):
+            return odc.algo.to_float(da, scale=1.0 / mult, dtype='float32')
+        return da / mult
+
+    return ds.map(_normalise)
+
+
 def calculate_indices(ds,
                       index=None,
                       collection=None,
@@ -39,7 +57,14 @@ def calculate_indices(ds,
     in memory. This can be a memory-expensive operation, so to avoid
     this, set `inplace=True`.
 
-    Last modified: June 2023
+    Integer data (e.g. loaded using `load_ard(dtype='native')`) is
+    converted to `float32` only while calculating each index, with
+    nodata values (identified using each band's `nodata` attribute)
+    treated as NaN. Indices calculated from integer data are therefore
+    returned as `float32`, with NaN for any pixel that was nodata in
+    an input band.
+
+    Last modified: October 2026
     
     Parameters
     ----------
@@ -132,7 +157,8 @@ def calculate_indices(ds,
         The original xarray Dataset inputted into the function, with a 
         new varible containing the remote sensing index as a DataArray.
         If drop = True, the new variable/s as DataArrays in the 
-        original Dataset. 
+        original Dataset. Indices are `float32` if calculated from
+        integer bands, with nodata pixels set to NaN.
     """
     
     # Set ds equal to a copy of itself in order to prevent the function 
@@ -407,7 +433,8 @@ def calculate_indices(ds,
         try:
             # If normalised=True, divide data by 10,000 before applying func
             mult = 10000.0 if normalise else 1.0
-            index_array = index_func(ds.rename(bands_to_rename) / mult)
+            index_array = index_func(
+                _normalise_bands(ds.rename(bands_to_rename), mult))
         except AttributeError:
             raise ValueError(f'Please verify that all bands required to '
                              f'compute {index} are present in `ds`. \n'
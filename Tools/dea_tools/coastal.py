@@ -39,7 +39,6 @@ from shapely.geometry import box, shape
 from owslib.wfs import WebFeatureService
 
 from datacube.utils.geometry import CRS
-from dea_tools.datahandling import parallel_apply
 from dea_tools.spatial import idw
 
 # Fix converters for tidal plot
@@ -17,24 +17,27 @@ here: https://gis.stackexchange.com/questions/tagged/open-data-cube).
 If you would like to report an issue with this script, you can file one
 on GitHub (https://github.com/GeoscienceAustralia/dea-notebooks/issues/new).
 
-Last modified: Feb 2024
+Last modified: October 2026
 """
 
 import datetime
 
 # Import required packages
 import os
+import time
+import inspect
+import pickle
+import hashlib
 import warnings
 import zipfile
 import requests
-from collections import Counter
+from collections import Counter, OrderedDict
 
 import rioxarray
 import numpy as np
 import pandas as pd
 import xarray as xr
-import sklearn.decomposition
-from scipy.ndimage import binary_dilation
+from scipy.ndimage import distance_transform_edt
 from skimage.color import hsv2rgb, rgb2hsv
 from skimage.exposure import match_histograms
 
@@ -95,6 +98,439 @@ def _common_bands(dc, products):
     return [band for band in bands if band in common]
 
 
+class DatasetCache:
+    """
+    A least-recently-used (LRU) cache of `dc.find_datasets` results,
+    keyed by datacube index, product and query parameters.
+
+    Workflows often run identical dataset searches several times (e.g.
+    calling `mostcommon_crs` then `load_ard` with the same query).
+    Caching these results avoids repeated round-trips to the datacube
+    database. Results are held in memory, and can optionally be
+    persisted to disk so they can be re-used between sessions.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of queries to hold in memory. Once this is
+        exceeded, the least recently used query is discarded.
+        Defaults to 128.
+    ttl : int or float, optional
+        The time (in seconds) that cached results remain valid before
+        the datacube database is searched again. Defaults to 3600
+        (i.e. one hour); set to None to never expire results.
+    cache_dir : str, optional
+        An optional directory used to persist cached results to disk.
+        Defaults to None, which will cache results in memory only.
+    """
+
+    def __init__(self, maxsize=128, ttl=3600, cache_dir=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def _make_key(dc, product, query):
+        """
+        Create a unique, stable key for a datacube index, product and
+        set of query parameters.
+        """
+
+        def _normalise(value):
+            # Represent xarray objects by their pixel grid rather
+            # than their (potentially very large) data values, and
+            # functions by their name rather than their memory address
+            if isinstance(value, (xr.Dataset, xr.DataArray)):
+                return repr(value.odc.geobox)
+            if callable(value):
+                return f"{value.__module__}.{value.__qualname__}"
+            return repr(value)
+
+        index_id = str(getattr(dc.index, "url", id(dc.index)))
+        query_str = repr(sorted((k, _normalise(v)) for k, v in query.items()))
+        key_str = f"{index_id}|{product}|{query_str}"
+        return hashlib.sha1(key_str.encode()).hexdigest()
+
+    def _is_valid(self, timestamp):
+        return self.ttl is None or (time.time() - timestamp) < self.ttl
+
+    def _get(self, key):
+        # Try in-memory cache first
+        if key in self._cache:
+            timestamp, datasets = self._cache[key]
+            if self._is_valid(timestamp):
+                self._cache.move_to_end(key)
+                return datasets
+            del self._cache[key]
+
+        # Otherwise, fall back to on-disk cache if available
+        if self.cache_dir is not None:
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            if os.path.exists(path):
+                try:
+                    with open(path, "rb") as f:
+                        timestamp, datasets = pickle.load(f)
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    return None
+                if self._is_valid(timestamp):
+                    self._put(key, datasets, timestamp, persist=False)
+                    return datasets
+                os.remove(path)
+
+        return None
+
+    def _put(self, key, datasets, timestamp=None, persist=True):
+        timestamp = time.time() if timestamp is None else timestamp
+        self._cache[key] = (timestamp, datasets)
+        self._cache.move_to_end(key)
+
+        # Drop least recently used entries
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+        # Optionally persist to disk
+        if persist and self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            with open(path, "wb") as f:
+                pickle.dump((timestamp, datasets), f)
+
+    def find_datasets(self, dc, product, **query):
+        """
+        Return datasets matching a product and query, using cached
+        results if available. Accepts the same parameters as
+        `dc.find_datasets`.
+
+        Parameters
+        ----------
+        dc : datacube Datacube object
+            The Datacube to search.
+        product : str
+            The name of the product to search for.
+        **query :
+            Query parameters passed to `dc.find_datasets`.
+
+        Returns
+        -------
+        datasets : list
+            A list of `datacube.model.Dataset` objects.
+        """
+
+        # Drop load-only parameters (e.g. `output_crs`) that do not
+        # affect the search, so that equivalent queries share results.
+        # Predicates are arbitrary functions that cannot be reliably
+        # used as cache keys, so apply them after the cached search
+        query = _dc_query_only(**query)
+        predicate = query.pop("dataset_predicate", None)
+
+        key = self._make_key(dc, product, query)
+        datasets = self._get(key)
+        if datasets is None:
+            datasets = dc.find_datasets(product=product, **query)
+            self._put(key, datasets)
+
+        # Return a copy so callers can't modify cached results
+        if predicate is not None:
+            return [ds for ds in datasets if predicate(ds)]
+        return list(datasets)
+
+    def clear(self):
+        """
+        Remove all cached results from memory and disk.
+        """
+        self._cache.clear()
+        if self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for fname in os.listdir(self.cache_dir):
+                if fname.endswith(".pkl"):
+                    os.remove(os.path.join(self.cache_dir, fname))
+
+
+# Default cache shared by `load_ard`, `mostcommon_crs` and
+# `dea_tools.spatial.sun_angles` if `dataset_cache=True`
+default_dataset_cache = DatasetCache()
+
+
+def _find_datasets(dc, product, cache=False, **query):
+    """
+    Find datasets for a product using either the default shared
+    `DatasetCache` (if `cache=True`), a custom `DatasetCache`, or by
+    searching the datacube directly (if `cache=False`).
+    """
+    if cache is True:
+        return default_dataset_cache.find_datasets(dc, product, **query)
+    elif isinstance(cache, DatasetCache):
+        return cache.find_datasets(dc, product, **query)
+    else:
+        return dc.find_datasets(product=product, **query)
+
+
+def _scene_gooddata(dataset, cloud_mask, pq_categories):
+    """
+    Estimate the proportion of good quality pixels in a dataset from
+    its scene-level pixel quality metadata (e.g. `fmask:clear`),
+    falling back to `eo:cloud_cover` if this is not available.
+
+    Returns
+    -------
+    Proportion of good quality pixels (0.0-1.0), or None if no
+    suitable metadata exists (i.e. the proportion is unknown).
+    """
+    properties = dataset.metadata_doc.get("properties", {})
+
+    # Map pixel quality categories to metadata property names
+    prefix = "fmask" if cloud_mask == "fmask" else "s2cloudless"
+    property_names = {"valid": "clear", "shadow": "cloud_shadow"}
+
+    try:
+        good_perc = sum(
+            properties[f"{prefix}:{property_names.get(category, category)}"]
+            for category in pq_categories
+            if category != "nodata"
+        )
+    except KeyError:
+        cloud_perc = properties.get("eo:cloud_cover", None)
+        return None if cloud_perc is None else 1.0 - cloud_perc / 100.0
+
+    return good_perc / 100.0
+
+
+def _metadata_prefilter(
+    dc,
+    dataset_list,
+    query,
+    cloud_mask,
+    pq_categories,
+    min_gooddata=0.0,
+    max_scene_cloud=None,
+    group_by=None,
+):
+    """
+    Filter a list of datasets using scene-level cloud metadata, without
+    reading any pixel data.
+
+    Datasets with `eo:cloud_cover` greater than `max_scene_cloud` are
+    removed. If `min_gooddata` is greater than 0, observations are also
+    removed if they cannot possibly contain enough good quality pixels
+    within the query area. This is estimated by combining the
+    proportion of good quality pixels in each scene with the area of
+    overlap between the scene footprint and the query area. The query
+    area (in EPSG:3577) is used as an approximation of the output
+    GeoBox; if no spatial query is provided, the combined footprint of
+    all datasets is used instead.
+
+    Datasets without scene-level cloud metadata (or without a
+    footprint) have unknown cloud cover. These are never counted as
+    clear, but are always kept (along with any other datasets from the
+    same observation) so that the actual proportion of good quality
+    pixels can be calculated after loading.
+
+    Returns
+    -------
+    List of `datacube.model.Dataset` objects
+    """
+
+    from datacube.api.query import Query, query_group_by
+    from odc.geo.geom import unary_union
+
+    n_datasets = len(dataset_list)
+
+    # Remove scenes with more cloud than `max_scene_cloud`, keeping
+    # scenes with unknown cloud cover
+    if max_scene_cloud is not None:
+        cloud_cover = [
+            ds.metadata_doc.get("properties", {}).get("eo:cloud_cover", None)
+            for ds in dataset_list
+        ]
+        dataset_list = [
+            ds
+            for ds, cloud in zip(dataset_list, cloud_cover)
+            if cloud is None or cloud <= max_scene_cloud
+        ]
+
+    # Remove observations that cannot meet `min_gooddata`
+    if (min_gooddata > 0.0) and len(dataset_list) > 0:
+        # Calculate areas in Australian Albers equal area projection
+        area_crs = "EPSG:3577"
+        extents = [
+            ds.extent.to_crs(area_crs) if ds.extent is not None else None
+            for ds in dataset_list
+        ]
+        extents_dict = {ds.id: extent for ds, extent in zip(dataset_list, extents)}
+
+        # Use query area if provided, otherwise all dataset footprints
+        query_area = Query(**query).geopolygon
+        if query_area is not None:
+            query_area = query_area.to_crs(area_crs)
+        else:
+            query_area = unary_union([e for e in extents if e is not None])
+
+        # Group datasets into observations in the same way as `dc.load`
+        grouped = dc.group_datasets(dataset_list, query_group_by(group_by=group_by))
+
+        kept_datasets = []
+        for group in grouped.values:
+            # Estimate the maximum good quality area in the query area
+            # by summing the good area in each scene with known cloud
+            # cover, up to the scene's area of overlap with the query area
+            good_area = 0.0
+            unknown = False
+            for ds in group:
+                scene_good = _scene_gooddata(ds, cloud_mask, pq_categories)
+                extent = extents_dict[ds.id]
+                if scene_good is None or extent is None:
+                    unknown = True
+                    continue
+                overlap_area = extent.intersection(query_area).area
+                good_area += min(overlap_area, scene_good * extent.area)
+
+            # Observations containing scenes with unknown cloud cover
+            # can't be ruled out, so are kept
+            if unknown or (good_area / query_area.area >= min_gooddata):
+                kept_datasets.extend(group)
+
+        dataset_list = kept_datasets
+
+    if len(dataset_list) < n_datasets:
+        print(
+            f"Filtering to {len(dataset_list)} out of {n_datasets} "
+            f"datasets using scene-level cloud metadata"
+        )
+
+    return dataset_list
+
+
+def _gooddata_datasets(
+    dc,
+    dataset_list,
+    pq_band,
+    pq_categories,
+    min_gooddata,
+    resolution=None,
+    **kwargs,
+):
+    """
+    Load only the pixel quality band for a list of datasets (optionally
+    at a reduced resolution), and return only the datasets belonging to
+    observations with a proportion of good quality pixels greater than
+    or equal to `min_gooddata`.
+
+    Returns
+    -------
+    List of `datacube.model.Dataset` objects
+    """
+
+    from datacube.api.query import query_group_by
+
+    # Optionally load pixel quality data at a reduced resolution
+    if resolution is not None:
+        if "like" in kwargs:
+            raise ValueError(
+                "`two_pass_resolution` cannot be used in combination " "with `like`."
+            )
+        kwargs["resolution"] = resolution
+
+    # Lazily load pixel quality band only
+    ds_pq = dc.load(
+        datasets=dataset_list,
+        measurements=[pq_band],
+        dask_chunks={},
+        **kwargs,
+    )
+
+    # Compute good data for each observation as % of total pixels
+    pq_mask = odc.algo.fmask_to_bool(ds_pq[pq_band], categories=pq_categories)
+    data_perc = pq_mask.sum(axis=[1, 2], dtype="int32") / (
+        pq_mask.shape[1] * pq_mask.shape[2]
+    )
+    keep = (data_perc >= min_gooddata).values
+
+    # Group datasets into observations in the same way as `dc.load`,
+    # then keep only datasets from observations that passed
+    grouped = dc.group_datasets(dataset_list, query_group_by(**kwargs))
+    kept_datasets = [ds for group in grouped.values[keep] for ds in group]
+
+    if keep.sum() < len(keep):
+        print(
+            f"Filtering to {keep.sum()} out of {len(keep)} "
+            f"time steps with at least {min_gooddata:.1%} "
+            f"good quality pixels"
+        )
+
+    return kept_datasets
+
+
+def _mask_input(mask_band, to_bool):
+    """
+    Prepare a mask band for `_mask_and_convert`. For 8-bit bands, this
+    returns the raw band and a lookup table mapping every possible
+    value to a boolean mask, calculated using the `to_bool` function.
+    Other bands are converted to a boolean mask using `to_bool`.
+    """
+    if mask_band.dtype == np.uint8:
+        values = xr.DataArray(np.arange(256, dtype=np.uint8), attrs=mask_band.attrs)
+        return mask_band, np.asarray(to_bool(values))
+    else:
+        return to_bool(mask_band), None
+
+
+def _mask_and_convert_np(data, *masks, luts, nodata, dtype):
+    """
+    Mask a block of data using one or more mask blocks, and convert
+    to `dtype` (either "native" or a float dtype).
+    """
+    good = None
+    for mask, lut in zip(masks, luts):
+        mask = mask if lut is None else lut[mask]
+        good = mask if good is None else good & mask
+
+    # Set masked pixels to nodata if keeping native dtype
+    if dtype == "native":
+        if good is None:
+            return data
+        return np.where(good, data, data.dtype.type(0 if nodata is None else nodata))
+
+    # Otherwise, set masked and nodata pixels to NaN
+    out = data.astype(dtype)
+    if nodata is not None:
+        out[data == nodata] = np.nan
+    if good is not None:
+        out[~good] = np.nan
+    return out
+
+
+def _mask_and_convert(da, mask_inputs, dtype):
+    """
+    Apply pixel quality/contiguity masks to an xarray.DataArray and
+    convert its dtype using a single blockwise operation, rather than
+    separate dask tasks for creating the mask, masking and converting
+    dtype. This greatly reduces the size of the dask task graph when
+    loading large amounts of data.
+
+    This is equivalent to applying `odc.algo.keep_good_only` followed
+    by `odc.algo.to_float` (if `dtype` is not "native").
+    """
+    attrs = da.attrs.copy()
+    nodata = attrs.get("nodata", None)
+    if dtype != "native":
+        attrs.pop("nodata", None)
+
+    out = xr.apply_ufunc(
+        _mask_and_convert_np,
+        da,
+        *[mask for mask, _ in mask_inputs],
+        kwargs={
+            "luts": [lut for _, lut in mask_inputs],
+            "nodata": nodata,
+            "dtype": dtype,
+        },
+        dask="parallelized",
+        output_dtypes=[da.dtype if dtype == "native" else np.dtype(dtype)],
+    )
+    out.attrs = attrs
+    return out
+
+
 def load_ard(
     dc,
     products=None,
@@ -108,6 +544,13 @@ def load_ard(
     ls7_slc_off=True,
     dtype="auto",
     predicate=None,
+    dataset_cache=False,
+    two_pass=False,
+    two_pass_resolution=None,
+    max_scene_cloud=None,
+    metadata_prefilter=False,
+    return_mask=False,
+    ard_cache=None,
     **kwargs,
 ):
     """
@@ -218,6 +661,10 @@ def load_ard(
         native data type of the data. Be aware that if data is loaded
         in its native dtype, nodata and masked pixels will be returned
         with the data's native nodata value (typically -999), not NaN.
+        Using 'native' halves the memory required for integer bands
+        compared to `float32`; `calculate_indices`, `rgb` and
+        `xr_animation` will automatically treat nodata values in
+        native integer data as NaN.
     predicate : function, optional
         DEPRECATED: Please use `dataset_predicate` instead.
         An optional function that can be passed in to restrict the datasets that
@@ -226,6 +673,68 @@ def load_ard(
         from `dc.find_datasets`), and return a boolean. For example,
         a predicate function could be used to return True for only
         datasets acquired in January: `dataset.time.begin.month == 1`
+    dataset_cache : bool or DatasetCache, optional
+        Whether to re-use the results of previous identical dataset
+        searches instead of querying the datacube database again.
+        Set to True to use a cache shared with `mostcommon_crs` and
+        `dea_tools.spatial.sun_angles`, or supply a custom
+        `DatasetCache` (e.g. with on-disk persistence). Cached results
+        are re-used until they expire (after one hour by default), so
+        datasets indexed in the meantime will not be found. Defaults
+        to False, which always searches the database.
+    two_pass : bool, optional
+        Whether to filter observations by `min_gooddata` in two stages.
+        If True (and `min_gooddata` is greater than 0), only the pixel
+        quality band is loaded first to identify observations with
+        enough good quality pixels; data for all other bands is then
+        loaded only for the observations that were retained. This can
+        greatly reduce the amount of data read in cloudy areas where
+        many observations are discarded. Defaults to False.
+    two_pass_resolution : tuple or float, optional
+        An optional resolution used to load the pixel quality band
+        during the first stage of `two_pass` filtering (e.g.
+        ``(-300, 300)``). A coarser resolution reduces the time taken
+        to count good quality pixels, at the cost of a less precise
+        `min_gooddata` calculation. Defaults to None, which will use
+        the same resolution as the rest of the data.
+    max_scene_cloud : float, optional
+        An optional maximum scene-level cloud cover percentage (0-100,
+        from each dataset's `eo:cloud_cover` metadata). Datasets with
+        more cloud than this are removed before any data is loaded.
+        Note that scene-level cloud cover is calculated across an
+        entire satellite scene, not just the area being loaded.
+        Defaults to None, which will not filter by scene cloud cover.
+        Datasets without `eo:cloud_cover` metadata are kept.
+    metadata_prefilter : bool, optional
+        Whether to use scene-level pixel quality metadata to remove
+        observations that cannot possibly meet `min_gooddata` before
+        any data is loaded. For each observation, the maximum possible
+        proportion of good quality pixels in the query area is
+        estimated from the proportion of good quality pixels in each
+        scene (e.g. `fmask:clear`) and the overlap between each scene
+        footprint and the query area. Observations are then checked
+        against `min_gooddata` as usual. Observations containing
+        scenes without pixel quality metadata are always kept. Note
+        that the query area (e.g. `x` and `y`) is used to approximate
+        the output GeoBox, so areas are not snapped to the output pixel
+        grid. If no spatial query is provided (e.g. when using `like`),
+        the combined footprint of all datasets is used, which may
+        underestimate the proportion of good quality pixels.
+        Defaults to False.
+    return_mask : bool, optional
+        Whether to return the combined pixel quality and contiguity
+        mask used to mask the data as an additional boolean
+        "good_data" variable (True for good quality pixels). This can
+        be useful when loading data with ``dtype='native'``, where
+        masked pixels are otherwise only identifiable by their nodata
+        value. The mask is returned lazily if `dask_chunks` is
+        provided. Defaults to False.
+    ard_cache : ARDCache, optional
+        An optional `ARDCache` used to store masked data in a local
+        Zarr store. If data for an identical query has previously been
+        loaded, it will be read from the local store instead of being
+        loaded and masked again. Defaults to None, which will not cache
+        any data.
     **kwargs :
         A set of keyword arguments to `dc.load` that define the
         spatiotemporal query and load parameters used to extract data.
@@ -252,6 +761,30 @@ def load_ard(
     use `dc.load` instead.
     """
 
+    # Optionally load data via a local Zarr cache
+    if ard_cache is not None:
+        return ard_cache.load_ard(
+            dc,
+            products=products,
+            cloud_mask=cloud_mask,
+            min_gooddata=min_gooddata,
+            mask_pixel_quality=mask_pixel_quality,
+            mask_filters=mask_filters,
+            mask_contiguity=mask_contiguity,
+            fmask_categories=fmask_categories,
+            s2cloudless_categories=s2cloudless_categories,
+            ls7_slc_off=ls7_slc_off,
+            dtype=dtype,
+            predicate=predicate,
+            dataset_cache=dataset_cache,
+            two_pass=two_pass,
+            two_pass_resolution=two_pass_resolution,
+            max_scene_cloud=max_scene_cloud,
+            metadata_prefilter=metadata_prefilter,
+            return_mask=return_mask,
+            **kwargs,
+        )
+
     #########
     # Setup #
     #########
@@ -412,7 +945,7 @@ def load_ard(
             if not ls7_slc_off and product == "ga_ls7e_ard_3"
             else f"    {product}"
         )
-        datasets = dc.find_datasets(product=product, **query)
+        datasets = _find_datasets(dc, product, cache=dataset_cache, **query)
 
         # Remove Landsat 7 SLC-off observations if ls7_slc_off=False
         if not ls7_slc_off and product == "ga_ls7e_ard_3":
@@ -433,6 +966,50 @@ def load_ard(
             "time and location requested"
         )
 
+    # Optionally filter datasets using scene-level cloud metadata,
+    # so that obviously cloudy observations are never loaded
+    if (max_scene_cloud is not None) or metadata_prefilter:
+        dataset_list = _metadata_prefilter(
+            dc,
+            dataset_list,
+            query=query,
+            cloud_mask=cloud_mask,
+            pq_categories=pq_categories,
+            min_gooddata=min_gooddata if metadata_prefilter else 0.0,
+            max_scene_cloud=max_scene_cloud,
+            group_by=kwargs.get("group_by", None),
+        )
+
+        # Raise exception if no datasets are retained
+        if len(dataset_list) == 0:
+            raise ValueError(
+                "No datasets passed the scene-level cloud metadata "
+                "filter for this query."
+            )
+
+    # If two-pass filtering is requested, identify observations with
+    # sufficient good data using only the pixel quality band, so that
+    # other bands are only loaded for the observations we keep
+    two_pass = two_pass and (min_gooddata > 0.0)
+    if two_pass:
+        print(f"Counting good quality pixels for each time step using {cloud_mask}")
+        dataset_list = _gooddata_datasets(
+            dc,
+            dataset_list,
+            pq_band=pq_band,
+            pq_categories=pq_categories,
+            min_gooddata=min_gooddata,
+            resolution=two_pass_resolution,
+            **kwargs,
+        )
+
+        # Raise exception if no observations are retained
+        if len(dataset_list) == 0:
+            raise ValueError(
+                f"No time steps with at least {min_gooddata:.1%} good "
+                f"quality pixels were found for this query."
+            )
+
     #############
     # Load data #
     #############
@@ -456,8 +1033,9 @@ def load_ard(
     # The good data percentage calculation has to load all pixel quality
     # data, which can be slow. If the user has chosen no filtering
     # by using the default `min_gooddata = 0`, we can skip this step
-    # completely to save processing time
-    if min_gooddata > 0.0:
+    # completely to save processing time. This is also skipped if
+    # observations were already filtered using `two_pass`
+    if (min_gooddata > 0.0) and not two_pass:
         # Compute good data for each observation as % of total pixels
         print(f"Counting good quality pixels for each time step using {cloud_mask}")
         data_perc = pq_mask.sum(axis=[1, 2], dtype="int32") / (
@@ -494,44 +1072,56 @@ def load_ard(
     # Apply masks #
     ###############
 
-    # Create a combined mask to hold both pixel quality and contiguity.
-    # This is more efficient than creating multiple dask tasks for
-    # similar masking operations.
-    mask = None
+    # Data are masked using the raw mask bands in a single operation
+    # per chunk below, which keeps the dask task graph small
+    mask_inputs = []
 
-    # Add pixel quality mask to combined mask
+    # Add pixel quality mask
     if mask_pixel_quality:
         print(f"Applying {cloud_mask} pixel quality/cloud mask")
-        mask = pq_mask
 
-    # Add contiguity mask to combined mask
+        # Mask using the raw PQ band if no morphological filters were
+        # applied, otherwise use the filtered boolean mask
+        if mask_filters is None:
+            mask_inputs.append(
+                _mask_input(
+                    ds[pq_band],
+                    lambda x: odc.algo.fmask_to_bool(x, categories=pq_categories),
+                )
+            )
+        else:
+            mask_inputs.append((pq_mask, None))
+
+    # Add contiguity mask
     if mask_contiguity:
         print(f"Applying contiguity mask ({contiguity_band})")
-        cont_mask = ds[contiguity_band] == 1
+        mask_inputs.append(_mask_input(ds[contiguity_band], lambda x: x == 1))
 
-        # If mask already has data if mask_pixel_quality == True,
-        # multiply with cont_mask to perform a logical 'or' operation
-        # (keeping only pixels good in both)
-        mask = cont_mask if mask is None else mask * cont_mask
+    # Only create a combined pixel quality and contiguity mask if it
+    # will be returned to the user
+    mask = None
+    if return_mask and mask_inputs:
+        if mask_pixel_quality:
+            mask = pq_mask
+        if mask_contiguity:
+            cont_mask = ds[contiguity_band] == 1
+            mask = cont_mask if mask is None else mask & cont_mask
+
+    # Automatically set dtype to either native or float32 depending
+    # on whether masking was requested
+    if dtype == "auto":
+        dtype = "float32" if mask_inputs else "native"
 
     # Split into data/masks bands, as conversion to float and masking
     # should only be applied to data bands
     ds_data = ds[data_bands]
     ds_masks = ds[mask_bands]
 
-    # Mask data if either of the above masks were generated
-    if mask is not None:
-        ds_data = odc.algo.keep_good_only(ds_data, where=mask)
-
-    # Automatically set dtype to either native or float32 depending
-    # on whether masking was requested
-    if dtype == "auto":
-        dtype = "native" if mask is None else "float32"
-
-    # Set nodata values using odc.algo tools to reduce peak memory
-    # use when converting data dtype
-    if dtype != "native":
-        ds_data = odc.algo.to_float(ds_data, dtype=dtype)
+    # Mask data and convert dtype in a single operation per chunk
+    if mask_inputs or (dtype != "native"):
+        ds_data = ds_data.map(
+            _mask_and_convert, mask_inputs=mask_inputs, dtype=dtype, keep_attrs=True
+        )
 
     # Put data and mask bands back together
     attrs = ds.attrs
@@ -546,6 +1136,10 @@ def load_ard(
     if requested_measurements:
         ds = ds[requested_measurements]
 
+    # Optionally return mask alongside data
+    if mask is not None:
+        ds["good_data"] = mask
+
     # If user supplied `dask_chunks`, return data as a dask array
     # without actually loading it into memory
     if dask_chunks is not None:
@@ -556,7 +1150,265 @@ def load_ard(
         return ds.compute()
 
 
-def mostcommon_crs(dc, product, query):
+def iter_ard(dc, products=None, batch_size=1, prefetch=True, **kwargs):
+    """
+    Load Geoscience Australia Landsat or Sentinel 2 Collection 3 data
+    using `load_ard`, and iterate through the resulting data one (or
+    a few) timesteps at a time.
+
+    Data is lazily loaded using Dask, and only the current batch of
+    timesteps is loaded into memory. This keeps memory use flat when
+    processing very long time series (e.g. applying a classification
+    to each satellite observation). If `prefetch=True`, the next batch
+    is loaded in a background thread while the current batch is being
+    processed.
+
+    Parameters
+    ----------
+    dc : datacube Datacube object
+        The Datacube to connect to, i.e. ``dc = datacube.Datacube()``.
+    products : list
+        A list of product names to load (see `load_ard`).
+    batch_size : int, optional
+        The number of timesteps to yield at a time. Defaults to 1.
+    prefetch : bool, optional
+        Whether to load the next batch of timesteps in a background
+        thread while the current batch is being processed. Defaults
+        to True.
+    **kwargs :
+        Any other parameters accepted by `load_ard` (e.g. `min_gooddata`,
+        `mask_pixel_quality`, `dtype`), as well as query and load
+        parameters passed to `dc.load` (e.g. `x`, `y`, `time`,
+        `measurements`, `dask_chunks`).
+
+    Yields
+    ------
+    ds_batch : xarray.Dataset
+        An in-memory xarray.Dataset containing up to `batch_size`
+        timesteps of masked data.
+    """
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Always load lazily so that data is only read for each batch
+    if kwargs.get("dask_chunks", None) is None:
+        kwargs["dask_chunks"] = {"time": 1}
+
+    ds = load_ard(dc=dc, products=products, **kwargs)
+
+    # Split into batches of timesteps
+    batches = [
+        ds.isel(time=slice(i, i + batch_size))
+        for i in range(0, len(ds.time), batch_size)
+    ]
+
+    # Load each batch in turn
+    if not prefetch:
+        for batch in batches:
+            yield batch.compute()
+        return
+
+    # Otherwise, load the next batch in the background while the
+    # current batch is being processed
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = None
+    try:
+        future = executor.submit(batches[0].compute) if batches else None
+        for i in range(len(batches)):
+            ds_batch = future.result()
+            future = None
+            if i + 1 < len(batches):
+                future = executor.submit(batches[i + 1].compute)
+            yield ds_batch
+    finally:
+        # If iteration stops early (e.g. `break` or an exception),
+        # cancel any pending load and wait for a running load to
+        # finish so no background work outlives the generator
+        if future is not None:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+class ARDCache:
+    """
+    A local cache of masked data returned by `load_ard`, stored as
+    Zarr on disk and keyed by the products, measurements, spatial and
+    temporal query and masking parameters used to load the data.
+
+    Iterative workflows often re-load the same area and time period
+    many times (e.g. when re-running a notebook). On a cache miss, data
+    is loaded and masked by `load_ard` then written to a Zarr store; on
+    a cache hit, the existing Zarr store is opened lazily instead of
+    reading and masking the original satellite data again. Once the
+    cache grows beyond `max_size`, the least recently used stores are
+    removed.
+
+    Requires the optional `zarr` package to be installed.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory used to store cached Zarr data.
+    max_size : int or str, optional
+        The maximum total size of the cache, either in bytes or as a
+        string (e.g. "10GB"). Defaults to "10GB"; set to None to never
+        remove cached data.
+
+    Notes
+    -----
+    Functions passed to `load_ard` (e.g. `dataset_predicate`) are
+    identified by their module and name, so clear the cache after
+    modifying a function. Data loaded using lambda or nested functions
+    is never cached.
+
+    Examples
+    --------
+    >>> ard_cache = ARDCache("ard_cache", max_size="5GB")
+    >>> ds = load_ard(dc, products=["ga_ls8c_ard_3"], ard_cache=ard_cache, **query)
+    """
+
+    def __init__(self, cache_dir, max_size="10GB"):
+        from dask.utils import parse_bytes
+
+        self.cache_dir = cache_dir
+        self.max_size = parse_bytes(max_size) if isinstance(max_size, str) else max_size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.zarr")
+
+    @staticmethod
+    def _store_size(path):
+        return sum(
+            os.path.getsize(os.path.join(root, fname))
+            for root, _, fnames in os.walk(path)
+            for fname in fnames
+        )
+
+    def _evict(self, keep=None):
+        """
+        Remove least recently used Zarr stores until the cache is
+        smaller than `max_size`.
+        """
+        import shutil
+
+        if self.max_size is None:
+            return
+
+        stores = [
+            os.path.join(self.cache_dir, fname)
+            for fname in os.listdir(self.cache_dir)
+            if fname.endswith(".zarr")
+        ]
+        stores = sorted(stores, key=os.path.getmtime)
+        sizes = {path: self._store_size(path) for path in stores}
+        total_size = sum(sizes.values())
+
+        for path in stores:
+            if total_size <= self.max_size:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total_size -= sizes[path]
+
+    def load_ard(self, dc, dask_chunks=None, dataset_cache=False, **params):
+        """
+        Load data using `load_ard`, reading from the cache if data for
+        an identical query has previously been loaded. Accepts the same
+        parameters as `load_ard`.
+
+        Returns
+        -------
+        ds : xarray.Dataset
+            An xarray.Dataset loaded from the local Zarr store. This is
+            returned lazily if `dask_chunks` is provided, otherwise data
+            is loaded into memory.
+        """
+        import shutil
+
+        # Functions without a unique importable name (e.g. lambdas or
+        # functions defined inside other functions) can't be reliably
+        # identified between sessions, so load data without caching
+        if any(
+            callable(v) and "<" in getattr(v, "__qualname__", "<")
+            for v in params.values()
+        ):
+            warnings.warn(
+                "Data loaded using lambda or nested functions (e.g. "
+                "`dataset_predicate`) can't be cached; loading without "
+                "`ard_cache`.",
+                stacklevel=3,
+            )
+            return load_ard(
+                dc,
+                dask_chunks=dask_chunks,
+                dataset_cache=dataset_cache,
+                **params,
+            )
+
+        # Fill in `load_ard` defaults so that equivalent calls share the
+        # same key. `dask_chunks` and `dataset_cache` do not affect the
+        # data that is returned, so are excluded from the cache key
+        params = {
+            **{
+                name: param.default
+                for name, param in inspect.signature(load_ard).parameters.items()
+                if param.default is not inspect.Parameter.empty
+                and name not in ("dask_chunks", "dataset_cache", "ard_cache")
+            },
+            **params,
+        }
+        key = DatasetCache._make_key(dc, params.get("products"), params)
+        path = self._path(key)
+
+        if os.path.exists(path):
+            print(f"Loading cached data from {path}")
+
+            # Mark store as recently used
+            os.utime(path)
+
+        else:
+            ds = load_ard(
+                dc,
+                dask_chunks={} if dask_chunks is None else dask_chunks,
+                dataset_cache=dataset_cache,
+                **params,
+            )
+
+            # Zarr requires regular chunks, so write one timestep per
+            # chunk. Data is written to a temporary location first so
+            # interrupted writes are never read from the cache
+            print(f"Writing data to cache at {path}")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            ds.chunk({"time": 1}).to_zarr(tmp_path, mode="w", consolidated=False)
+            os.replace(tmp_path, path)
+            self._evict(keep=path)
+
+        ds = xr.open_zarr(
+            path,
+            chunks={} if dask_chunks is None else dask_chunks,
+            consolidated=False,
+        )
+
+        if dask_chunks is not None:
+            return ds
+        else:
+            return ds.compute()
+
+    def clear(self):
+        """
+        Remove all cached data from disk.
+        """
+        import shutil
+
+        if os.path.isdir(self.cache_dir):
+            for fname in os.listdir(self.cache_dir):
+                if fname.endswith((".zarr", ".zarr.tmp")):
+                    shutil.rmtree(os.path.join(self.cache_dir, fname))
+
+
+def mostcommon_crs(dc, product, query, dataset_cache=False):
     """
     Takes a given query and returns the most common CRS for observations
     returned for that spatial extent. This can be useful when your study
@@ -573,6 +1425,12 @@ def mostcommon_crs(dc, product, query):
     query : dict
         A datacube query including x, y and time range to assess for the
         most common CRS
+    dataset_cache : bool or DatasetCache, optional
+        Whether to re-use the results of previous identical dataset
+        searches (e.g. from `load_ard`) instead of querying the datacube
+        database again. Set to True to use the cache shared with
+        `load_ard`, or supply a custom `DatasetCache`. Defaults to
+        False, which always searches the database.
 
     Returns
     -------
@@ -587,9 +1445,11 @@ def mostcommon_crs(dc, product, query):
     if isinstance(product, list):
         matching_datasets = []
         for i in product:
-            matching_datasets.extend(dc.find_datasets(product=i, **query))
+            matching_datasets.extend(
+                _find_datasets(dc, i, cache=dataset_cache, **query)
+            )
     else:
-        matching_datasets = dc.find_datasets(product=product, **query)
+        matching_datasets = _find_datasets(dc, product, cache=dataset_cache, **query)
 
     # Extract all CRSs
     crs_list = [str(i.crs) for i in matching_datasets]
@@ -623,11 +1483,90 @@ def mostcommon_crs(dc, product, query):
         )
 
 
-def download_unzip(url, output_dir=None, remove_zip=True):
+def _download_file(url, path, chunk_size=2**20):
+    """
+    Stream a file from a URL to a local path in chunks, without
+    loading the entire file into memory. Data is first written to a
+    temporary ".part" file; if this already exists from a previous
+    interrupted download, the download is resumed using an HTTP range
+    request (if supported by the server). If the partial file is
+    already complete, it is used without downloading any more data.
+
+    Returns
+    -------
+    The SHA-256 hash of the downloaded file.
+    """
+    part_path = f"{path}.part"
+    sha256 = hashlib.sha256()
+
+    # Resume previous download if a partial file exists
+    headers = {}
+    downloaded = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    if downloaded > 0:
+        headers["Range"] = f"bytes={downloaded}-"
+
+    with requests.get(url, headers=headers, stream=True, timeout=60) as r:
+        # If the requested range is not satisfiable, the partial file
+        # may already be complete. Use it if its size matches the size
+        # reported by the server, otherwise start again from scratch
+        if (r.status_code == 416) and (downloaded > 0):
+            total_size = r.headers.get("Content-Range", "").rpartition("/")[2]
+            if total_size == str(downloaded):
+                os.replace(part_path, path)
+                return _file_checksum(path, "sha256", chunk_size=chunk_size)
+            os.remove(part_path)
+            return _download_file(url, path, chunk_size=chunk_size)
+
+        r.raise_for_status()
+
+        # Append to partial file if server supports range requests,
+        # otherwise start download again from scratch
+        if r.status_code == 206:
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    sha256.update(chunk)
+            mode = "ab"
+        else:
+            mode = "wb"
+
+        with open(part_path, mode) as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                sha256.update(chunk)
+
+    os.replace(part_path, path)
+    return sha256.hexdigest()
+
+
+def _file_checksum(path, algorithm, chunk_size=2**20):
+    """
+    Calculate the checksum of a file using a `hashlib` algorithm.
+    """
+    file_hash = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def download_unzip(
+    url,
+    output_dir=None,
+    remove_zip=True,
+    checksum=None,
+    cache_dir=None,
+    chunk_size=2**20,
+):
     """
     Downloads and unzips a .zip file from an external URL to a local
     directory.
 
+    Files are streamed to disk in chunks so that large files do not
+    need to fit into memory, and interrupted downloads are resumed
+    where possible. If `cache_dir` is provided, extracted files are
+    cached locally and re-used instead of downloading the same file
+    again.
+
     Parameters
     ----------
     url : str
@@ -640,9 +1579,28 @@ def download_unzip(url, output_dir=None, remove_zip=True):
     remove_zip : bool, optional
         An optional boolean indicating whether to remove the downloaded
         .zip file after files are unzipped. Defaults to True, which will
-        delete the .zip file.
+        delete the .zip file. If False, the .zip file is kept in the
+        current working directory, or in `cache_dir` if provided (no
+        .zip file is downloaded if cached files are re-used).
+    checksum : str, optional
+        An optional checksum used to verify the downloaded .zip file,
+        given as a hex digest with an optional algorithm prefix (e.g.
+        "sha256:9f86d0..." or "md5:5d4140..."; SHA-256 is assumed if
+        no prefix is given). A ValueError is raised if the downloaded
+        file does not match.
+    cache_dir : str, optional
+        An optional directory used to cache extracted files. Extracted
+        files are stored in a sub-directory named after the SHA-256
+        hash of the .zip file, so identical files downloaded from
+        different URLs are only stored once. Defaults to None, which
+        will not cache files.
+    chunk_size : int, optional
+        The size (in bytes) of each chunk of data to download at a time.
+        Defaults to 1 MB.
 
     """
+    import shutil
+    import tempfile
 
     # Get basename for zip file
     zip_name = os.path.basename(url)
@@ -655,36 +1613,252 @@ def download_unzip(url, output_dir=None, remove_zip=True):
             f"URL path to a valid .zip file"
         )
 
+    # Parse checksum into algorithm and expected hex digest
+    if checksum is not None:
+        algorithm, _, expected = checksum.rpartition(":")
+        algorithm = algorithm.lower() or "sha256"
+        expected = expected.lower()
+
+    # Identify location of cached files using the hash of the zip file
+    # (either from the checksum or a previous download of this URL)
+    output_dir = os.getcwd() if output_dir is None else output_dir
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        url_index = os.path.join(
+            cache_dir, f"url_{hashlib.sha1(url.encode()).hexdigest()}.txt"
+        )
+        if checksum is not None and algorithm == "sha256":
+            zip_hash = expected
+        elif os.path.exists(url_index):
+            with open(url_index) as f:
+                zip_hash = f.read().strip()
+        else:
+            zip_hash = None
+
+        # Copy previously extracted files from cache if they exist
+        cached_dir = zip_hash and os.path.join(cache_dir, zip_hash)
+        if cached_dir and os.path.isdir(cached_dir):
+            print(f"Using cached copy of {zip_name}")
+            shutil.copytree(cached_dir, output_dir, dirs_exist_ok=True)
+            print(f"Unzipping output files to: {output_dir}")
+            return
+
+        # Download zip into the cache directory so that interrupted
+        # downloads can be resumed
+        zip_path = os.path.join(cache_dir, zip_name)
+    else:
+        zip_path = zip_name
+
     # Download zip file
     print(f"Downloading {zip_name}")
-    r = requests.get(url)
-    with open(zip_name, "wb") as f:
-        f.write(r.content)
+    zip_hash = _download_file(url, zip_path, chunk_size=chunk_size)
 
-    # Extract into output_dir
-    with zipfile.ZipFile(zip_name, "r") as zip_ref:
-        zip_ref.extractall(output_dir)
-        print(
-            f"Unzipping output files to: "
-            f"{output_dir if output_dir else os.getcwd()}"
-        )
+    # Optionally verify checksum
+    if checksum is not None:
+        if algorithm == "sha256":
+            actual = zip_hash
+        else:
+            actual = _file_checksum(zip_path, algorithm, chunk_size=chunk_size)
+
+        if actual != expected:
+            os.remove(zip_path)
+            raise ValueError(
+                f"The checksum of the downloaded file ({algorithm}:{actual}) "
+                f"does not match the expected checksum "
+                f"({algorithm}:{expected})."
+            )
+
+    # Extract into output_dir, via the cache if requested
+    with zipfile.ZipFile(zip_path, "r") as zip_ref:
+        if cache_dir is not None:
+            cached_dir = os.path.join(cache_dir, zip_hash)
+            if not os.path.isdir(cached_dir):
+                tmp_dir = tempfile.mkdtemp(dir=cache_dir)
+                os.chmod(tmp_dir, 0o755)
+                zip_ref.extractall(tmp_dir)
+                os.replace(tmp_dir, cached_dir)
+            with open(url_index, "w") as f:
+                f.write(zip_hash)
+            shutil.copytree(cached_dir, output_dir, dirs_exist_ok=True)
+        else:
+            zip_ref.extractall(output_dir)
+        print(f"Unzipping output files to: {output_dir}")
 
     # Optionally cleanup
     if remove_zip:
-        os.remove(zip_name)
+        os.remove(zip_path)
 
 
 def wofs_fuser(dest, src):
     """
     Fuse two WOfS water measurements represented as ``ndarray``s.
 
-    Note: this is a copy of the function located here:
+    This is a vectorised version of the function located here:
     https://github.com/GeoscienceAustralia/digitalearthau/blob/develop/digitalearthau/utils.py
+
+    Rather than using boolean masks to index into `dest` and `src`,
+    this updates `dest` in-place using only bitwise operations, which
+    is faster when fusing many overlapping datasets. Where `dest` is
+    nodata, values are taken from `src`; where both `dest` and `src`
+    contain valid data, flags from both arrays are combined.
+    """
+
+    # Mask with all bits set where `dest` is nodata (bit 0 set)
+    empty = np.bitwise_and(dest, 1)
+    np.negative(empty, out=empty)
+
+    # Combine flags from `src` into `dest` where `src` is valid
+    src_valid = np.bitwise_and(src, 1)
+    np.bitwise_xor(src_valid, 1, out=src_valid)
+    np.negative(src_valid, out=src_valid)
+    np.bitwise_and(src_valid, src, out=src_valid)
+    np.bitwise_or(dest, src_valid, out=dest)
+
+    # Replace `dest` with `src` where `dest` was nodata, using
+    # `dest ^ ((dest ^ src) & empty)`
+    np.bitwise_xor(dest, src, out=src_valid)
+    np.bitwise_and(src_valid, empty, out=src_valid)
+    np.bitwise_xor(dest, src_valid, out=dest)
+
+
+# Bit positions of DEA Water Observations (WO) flags
+WOFS_FLAGS = {
+    "nodata": 0,
+    "noncontiguous": 1,
+    "sea": 2,
+    "terrain_shadow": 3,
+    "high_slope": 4,
+    "cloud_shadow": 5,
+    "cloud": 6,
+    "wet": 7,
+}
+
+
+def _decode_bits_np(array, bits):
+    """
+    Decode multiple bit flags from a numpy array, returning a tuple
+    of boolean arrays (one for each bit), or a single boolean array if
+    only one bit is requested.
+    """
+    decoded = tuple(np.bitwise_and(array, 1 << bit).astype(bool) for bit in bits)
+    return decoded if len(decoded) > 1 else decoded[0]
+
+
+def wofs_decode_flags(wo, flags=None):
     """
-    empty = (dest & 1).astype(bool)
-    both = ~empty & ~((src & 1).astype(bool))
-    dest[empty] = src[empty]
-    dest[both] |= src[both]
+    Decode DEA Water Observations (WO) bit flags into separate boolean
+    variables (e.g. "wet", "cloud", "terrain_shadow").
+
+    All requested flags are decoded in a single pass through the data.
+    If `wo` is a dask array, flags are decoded lazily for each chunk.
+
+    Parameters
+    ----------
+    wo : xarray.DataArray
+        An array of DEA Water Observations data (e.g. the "water"
+        band of the "ga_ls_wo_3" product).
+    flags : list of str, optional
+        A list of flags to decode. Defaults to None, which will decode
+        all flags: "nodata", "noncontiguous", "sea", "terrain_shadow",
+        "high_slope", "cloud_shadow", "cloud" and "wet".
+
+    Returns
+    -------
+    flags_ds : xarray.Dataset
+        A dataset containing a boolean variable for each flag, which is
+        True where the flag is set.
+    """
+
+    flags = list(WOFS_FLAGS) if flags is None else flags
+
+    # Raise error if any flags are not valid
+    invalid_flags = set(flags) - set(WOFS_FLAGS)
+    if invalid_flags:
+        raise ValueError(
+            f"Unsupported flags {invalid_flags}. Please provide flags from "
+            f"{list(WOFS_FLAGS)}."
+        )
+
+    decoded = xr.apply_ufunc(
+        _decode_bits_np,
+        wo,
+        kwargs={"bits": [WOFS_FLAGS[flag] for flag in flags]},
+        output_core_dims=[[] for _ in flags],
+        dask="parallelized",
+        output_dtypes=[bool] * len(flags),
+    )
+
+    # Only a single array is returned if one flag is requested
+    decoded = (decoded,) if len(flags) == 1 else decoded
+    return xr.Dataset(dict(zip(flags, decoded)))
+
+
+def _clear_wet_np(array):
+    """
+    Identify clear (i.e. no flags other than "wet" set) and clear wet
+    pixels from a numpy array of WO data.
+    """
+    clear = np.bitwise_and(array, ~np.uint8(1 << WOFS_FLAGS["wet"])) == 0
+    wet = array == (1 << WOFS_FLAGS["wet"])
+    return clear, wet
+
+
+def wofs_clear_wet(wo):
+    """
+    Identify clear and wet observations in DEA Water Observations (WO)
+    data, in a single pass through the data. Clear observations are
+    those without any flags set other than "wet" (i.e. values of 0 or
+    128), and wet observations are clear observations where the "wet"
+    flag is set (i.e. a value of 128).
+
+    These can be used to calculate the frequency of wet observations,
+    e.g. ``ds.wet.sum("time") / ds.clear.sum("time")``. If `wo` is a
+    dask array, this is calculated lazily for each chunk.
+
+    Parameters
+    ----------
+    wo : xarray.DataArray
+        An array of DEA Water Observations data (e.g. the "water"
+        band of the "ga_ls_wo_3" product).
+
+    Returns
+    -------
+    clear_wet_ds : xarray.Dataset
+        A dataset containing boolean "clear" and "wet" variables.
+    """
+
+    clear, wet = xr.apply_ufunc(
+        _clear_wet_np,
+        wo,
+        output_core_dims=[[], []],
+        dask="parallelized",
+        output_dtypes=[bool, bool],
+    )
+    return xr.Dataset({"clear": clear, "wet": wet})
+
+
+def _dilate_np(array, dilation):
+    """
+    Dilate each 2D slice (e.g. timestep) of a boolean numpy array using
+    a disk-like radial structuring element, returning the inverse of
+    the dilated array.
+
+    Rather than applying `binary_dilation` with a large disk kernel,
+    this thresholds a Euclidean distance transform, which gives
+    identical results but is much faster for large dilation radii.
+    """
+    out = np.ones(array.shape, dtype=bool)
+    for idx in np.ndindex(array.shape[:-2]):
+        array_2d = array[idx]
+
+        # Pixels within `dilation` + 0.5 pixels of any True pixel are
+        # dilated, matching a disk kernel of `(x * x) + (y * y) <=
+        # (dilation + 0.5) ** 2`. Skip slices with no True pixels.
+        if array_2d.any():
+            distance = distance_transform_edt(~array_2d)
+            out[idx] = distance > (dilation + 0.5)
+
+    return out
 
 
 def dilate(array, dilation=10, invert=True):
@@ -697,10 +1871,17 @@ def dilate(array, dilation=10, invert=True):
     buffer around cloudy or shadowed pixels). This functionality can
     be reversed by specifying `invert=False`.
 
+    Dilation is applied to each 2D slice of the array (e.g. each
+    timestep) using a distance transform, which is fast even for large
+    dilation radii. Dask arrays are processed lazily for each chunk,
+    using an overlap of `dilation` pixels between neighbouring chunks.
+
     Parameters
     ----------
     array : array
-        The binary array to dilate.
+        The binary array to dilate, with spatial dimensions as the
+        final two dimensions (e.g. "time", "y", "x"). This can be a
+        numpy array, dask array or xarray.DataArray.
     dilation : int, optional
         An optional integer specifying the number of pixels to dilate
         by. Defaults to 10, which will dilate `array` by 10 pixels.
@@ -711,25 +1892,38 @@ def dilate(array, dilation=10, invert=True):
 
     Returns
     -------
-    An array of the same shape as `array`, with valid data pixels
-    dilated by the number of pixels specified by `dilation`.
+    An array of the same shape and type as `array`, with valid data
+    pixels dilated by the number of pixels specified by `dilation`.
+    For xarray.DataArray inputs, an xarray.DataArray with the same
+    dimensions and coordinates is returned (previous versions returned
+    a numpy array; use `.values` to obtain one). Dask-backed inputs
+    are returned lazily.
     """
 
-    y, x = np.ogrid[
-        -dilation : (dilation + 1),
-        -dilation : (dilation + 1),
-    ]
+    import dask.array as da
 
-    # disk-like radial dilation
-    kernel = (x * x) + (y * y) <= (dilation + 0.5) ** 2
+    # Apply to underlying data if an xarray.DataArray is provided
+    if isinstance(array, xr.DataArray):
+        return array.copy(data=dilate(array.data, dilation, invert))
 
     # If invert=True, invert True values to False etc
+    array = array.astype(bool)
     if invert:
         array = ~array
 
-    return ~binary_dilation(
-        array.astype(bool), structure=kernel.reshape((1,) + kernel.shape)
-    )
+    # For dask arrays, dilate each chunk with enough overlap to
+    # include all pixels within `dilation` of the chunk
+    if isinstance(array, da.Array):
+        depth = {array.ndim - 2: dilation + 1, array.ndim - 1: dilation + 1}
+        return array.map_overlap(
+            _dilate_np,
+            depth=depth,
+            boundary=False,
+            dilation=dilation,
+            dtype=bool,
+        )
+
+    return _dilate_np(array, dilation)
 
 
 def paths_to_datetimeindex(paths, string_slice=(0, 10)):
@@ -758,16 +1952,88 @@ def paths_to_datetimeindex(paths, string_slice=(0, 10)):
     return pd.to_datetime(date_strings)
 
 
-def _select_along_axis(values, idx, axis):
-    other_ind = np.ix_(*[np.arange(s) for s in idx.shape])
-    sl = other_ind[:axis] + (idx,) + other_ind[axis:]
-    return values[sl]
+def _first_last_np(values, reverse=False):
+    """
+    Select the first (or last if `reverse=True`) non-null value along
+    the last axis of a numpy array, returning the selected values and
+    their indices.
+    """
+    valid = ~pd.isnull(values)
+    if reverse:
+        idx = values.shape[-1] - 1 - np.argmax(valid[..., ::-1], axis=-1)
+    else:
+        idx = np.argmax(valid, axis=-1)
+    selected = np.take_along_axis(values, idx[..., np.newaxis], axis=-1)[..., 0]
+    return selected, idx
+
+
+def _nearest_np(values, dim_values, target):
+    """
+    Select the non-null value closest to `target` along the last axis
+    of a numpy array in a single pass, by tracking the closest valid
+    index on either side of the target. Returns the selected values and
+    their indices.
+    """
+    valid = ~pd.isnull(values)
+    n = values.shape[-1]
+    positions = np.arange(n)
+
+    # Last valid index at or before the target (-1 if none), and first
+    # valid index at or after the target (`n` if none)
+    idx_before = np.where(valid & (dim_values <= target), positions, -1).max(axis=-1)
+    idx_after = np.where(valid & (dim_values >= target), positions, n).min(axis=-1)
+
+    # Distance from each index to target, with infinite distance for
+    # sides without any valid values
+    distance = np.append(np.abs(dim_values - target).astype("float64"), np.inf)
+    dist_before = distance[np.where(idx_before < 0, n, idx_before)]
+    dist_after = distance[idx_after]
+
+    # Select closest valid value. Pixels without any valid values
+    # will return an arbitrary null value
+    idx = np.where(dist_before < dist_after, idx_before, idx_after)
+    idx = np.clip(idx, 0, n - 1)
+    selected = np.take_along_axis(values, idx[..., np.newaxis], axis=-1)[..., 0]
+    return selected, idx
+
+
+def _reduce_along_dim(array, dim, func, **kwargs):
+    """
+    Apply a selection function (e.g. `_first_last_np`) along a dimension
+    of an xarray.DataArray. This operates blockwise on dask arrays, after
+    ensuring that `dim` is contained within a single chunk.
+    """
+    if array.chunks is not None:
+        array = array.chunk({dim: -1})
+
+    reduced, idx = xr.apply_ufunc(
+        func,
+        array,
+        input_core_dims=[[dim]],
+        output_core_dims=[[], []],
+        kwargs=kwargs,
+        dask="parallelized",
+        output_dtypes=[array.dtype, np.int64],
+    )
+
+    # Add coordinate containing the value of `dim` for each selection
+    reduced[dim] = xr.apply_ufunc(
+        array[dim].values.take,
+        idx,
+        dask="parallelized",
+        output_dtypes=[array[dim].dtype],
+    )
+    return reduced, idx
 
 
 def first(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray:
     """
     Finds the first occuring non-null value along the given dimension.
 
+    If `array` is a dask array, this is calculated lazily for each
+    spatial chunk (`array` will be re-chunked so that `dim` is
+    contained within a single chunk if required).
+
     Parameters
     ----------
     array : xr.DataArray
@@ -775,6 +2041,9 @@ def first(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray
     dim : str
         The name of the dimension to reduce by finding the first
         non-null value.
+    index_name : str, optional
+        If given, the name of a coordinate to be added containing the
+        index of where on the dimension the first value was found.
 
     Returns
     -------
@@ -785,12 +2054,9 @@ def first(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray
         the last value was found.
     """
 
-    axis = array.get_axis_num(dim)
-    idx_first = np.argmax(~pd.isnull(array), axis=axis)
-    reduced = array.reduce(_select_along_axis, idx=idx_first, axis=axis)
-    reduced[dim] = array[dim].isel({dim: xr.DataArray(idx_first, dims=reduced.dims)})
+    reduced, idx_first = _reduce_along_dim(array, dim, _first_last_np)
     if index_name is not None:
-        reduced[index_name] = xr.DataArray(idx_first, dims=reduced.dims)
+        reduced[index_name] = idx_first
     return reduced
 
 
@@ -798,6 +2064,10 @@ def last(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray:
     """
     Finds the last occuring non-null value along the given dimension.
 
+    If `array` is a dask array, this is calculated lazily for each
+    spatial chunk (`array` will be re-chunked so that `dim` is
+    contained within a single chunk if required).
+
     Parameters
     ----------
     array : xr.DataArray
@@ -808,6 +2078,7 @@ def last(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray:
     index_name : str, optional
         If given, the name of a coordinate to be added containing the
         index of where on the dimension the nearest value was found.
+        Indices are negative, counting backwards from the end of `dim`.
 
     Returns
     -------
@@ -818,13 +2089,9 @@ def last(array: xr.DataArray, dim: str, index_name: str = None) -> xr.DataArray:
         the last value was found.
     """
 
-    axis = array.get_axis_num(dim)
-    rev = (slice(None),) * axis + (slice(None, None, -1),)
-    idx_last = -1 - np.argmax(~pd.isnull(array)[rev], axis=axis)
-    reduced = array.reduce(_select_along_axis, idx=idx_last, axis=axis)
-    reduced[dim] = array[dim].isel({dim: xr.DataArray(idx_last, dims=reduced.dims)})
+    reduced, idx_last = _reduce_along_dim(array, dim, _first_last_np, reverse=True)
     if index_name is not None:
-        reduced[index_name] = xr.DataArray(idx_last, dims=reduced.dims)
+        reduced[index_name] = idx_last - array.sizes[dim]
     return reduced
 
 
@@ -846,6 +2113,11 @@ def nearest(
     The returned array will include the 'time' coordinate for each x,y
     pixel that the nearest value was found.
 
+    Nearest values are found in a single pass through the data. If
+    `array` is a dask array, this is calculated lazily for each
+    spatial chunk (`array` will be re-chunked so that `dim` is
+    contained within a single chunk if required).
+
     Parameters
     ----------
     array : xr.DataArray
@@ -867,36 +2139,118 @@ def nearest(
         to the given target label.
     """
 
-    before_target = slice(None, target)
-    after_target = slice(target, None)
+    target = array[dim].dtype.type(target)
+    nearest_array, idx_nearest = _reduce_along_dim(
+        array, dim, _nearest_np, dim_values=array[dim].values, target=target
+    )
+    if index_name is not None:
+        nearest_array[index_name] = idx_nearest
+    return nearest_array
 
-    da_before = array.sel({dim: before_target})
-    da_after = array.sel({dim: after_target})
 
-    da_before = last(da_before, dim, index_name) if da_before[dim].shape[0] else None
-    da_after = first(da_after, dim, index_name) if da_after[dim].shape[0] else None
+class _SliceApplier:
+    """
+    Applies a function to a single slice of data along a dimension,
+    writing outputs into pre-allocated arrays. Input and output arrays
+    can be backed by shared memory so that data is not copied between
+    processes.
+    """
 
-    if da_before is None and da_after is not None:
-        return da_after
-    if da_after is None and da_before is not None:
-        return da_before
+    def __init__(self, func, dim, skeleton, var_dims, inputs, name, args, kwargs):
+        self.func = func
+        self.dim = dim
+        self.skeleton = skeleton
+        self.var_dims = var_dims
+        self.inputs = inputs
+        self.name = name
+        self.result_name = None
+        self.outputs = None
+        self.output_dims = None
+        self.args = args
+        self.kwargs = kwargs
+
+    def slice(self, i):
+        """
+        Return an xarray.Dataset containing slice `i` along `dim`, using
+        views into the input arrays rather than copies.
+        """
+        ds_i = self.skeleton.isel({self.dim: i})
+        for name, array in self.inputs.items():
+            dims, attrs = self.var_dims[name]
+            if self.dim in dims:
+                axis = dims.index(self.dim)
+                array = array[(slice(None),) * axis + (i,)]
+                dims = dims[:axis] + dims[axis + 1 :]
+            ds_i[name] = xr.Variable(dims, array, attrs=attrs)
+        return ds_i
+
+    def apply(self, i):
+        ds_i = self.slice(i)
+        if "__dataarray__" in self.var_dims:
+            ds_i = ds_i["__dataarray__"].rename(self.name)
+        result = self.func(ds_i, *self.args, **self.kwargs)
+        if isinstance(result, xr.DataArray):
+            self.result_name = result.name
+            result = result.to_dataset(name="__dataarray__")
+        return result
+
+    def __call__(self, i):
+        result = self.apply(i)
+        for name, out in self.outputs.items():
+            out[i] = result[name].transpose(*self.output_dims[name]).values
+
+
+class _SharedArray:
+    """
+    A numpy array in shared memory that can be pickled and re-attached
+    (without copying data) in other processes.
+    """
 
-    target = array[dim].dtype.type(target)
-    is_before_closer = abs(target - da_before[dim]) < abs(target - da_after[dim])
-    nearest_array = xr.where(is_before_closer, da_before, da_after, keep_attrs=True)
-    nearest_array[dim] = xr.where(
-        is_before_closer, da_before[dim], da_after[dim], keep_attrs=True
-    )
+    def __init__(self, shape, dtype, name=None):
+        from multiprocessing import shared_memory
 
-    if index_name is not None:
-        nearest_array[index_name] = xr.where(
-            is_before_closer,
-            da_before[index_name],
-            da_after[index_name],
-            keep_attrs=True,
-        )
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.shape = shape
+        self.dtype = dtype
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
 
-    return nearest_array
+    def __getstate__(self):
+        return (self.shape, self.dtype, self.shm.name)
+
+    def __setstate__(self, state):
+        shape, dtype, name = state
+        self.__init__(shape, dtype, name=name)
+
+    def __setitem__(self, key, value):
+        self.array[key] = value
+
+    def release(self, unlink=False):
+        del self.array
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# Each worker process holds a single `_SliceApplier`, created when the
+# process is started so that inputs are only attached to once
+_worker_applier = None
+
+
+def _init_worker_applier(applier, inputs, outputs):
+    global _worker_applier
+    applier.inputs = {name: shared.array for name, shared in inputs.items()}
+    applier.outputs = outputs
+
+    # Prevent workers from accidently modifying input data
+    for array in applier.inputs.values():
+        array.flags.writeable = False
+
+    _worker_applier = applier
+
+
+def _run_worker_applier(i):
+    _worker_applier(i)
 
 
 def parallel_apply(ds, dim, func, use_threads=False, *args, **kwargs):
@@ -907,7 +2261,13 @@ def parallel_apply(ds, dim, func, use_threads=False, *args, **kwargs):
     The function can be any function that can be applied to an
     individual xarray.Dataset or xarray.DataArray (e.g. data for a
     single timestep). The function should also return data in
-    xarray.Dataset or xarray.DataArray format.
+    xarray.Dataset or xarray.DataArray format, with the same variables,
+    shape and dtype for every slice along `dim`.
+
+    When using processes, input data is placed in shared memory so
+    that each process can read its slice of data without the data
+    being copied, and outputs are written directly into a shared
+    output array instead of being returned and concatenated.
 
     This function is useful as a simple method for parallising code
     that cannot easily be parallised using Dask.
@@ -916,13 +2276,14 @@ def parallel_apply(ds, dim, func, use_threads=False, *args, **kwargs):
     ----------
     ds : xarray.Dataset or xarray.DataArray
         xarray data with a dimension `dim` to apply the custom function
-        along.
+        along. Dask arrays will be loaded into memory.
     dim : string
         The dimension along which the custom function will be applied.
     func : function
         The function that will be applied in parallel to each array
         along dimension `dim`. The first argument passed to this
-        function should be the array along `dim`.
+        function should be the array along `dim`. When using processes,
+        this must be a function that can be pickled (e.g. not a lambda).
     use_threads : bool, optional
         Whether to use threads instead of processes for parallelisation.
         Defaults to False, which means it'll use multi-processing.
@@ -935,63 +2296,174 @@ def parallel_apply(ds, dim, func, use_threads=False, *args, **kwargs):
 
     Returns
     -------
-    xarray.Dataset
-        A concatenated dataset containing an output for each array
-        along the input `dim` dimension.
+    xarray.Dataset or xarray.DataArray
+        A dataset containing an output for each array along the input
+        `dim` dimension.
     """
 
     from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
-    from functools import partial
-    from itertools import repeat
 
     from tqdm import tqdm
 
-    # Use threads or processes
-    if use_threads:
-        Executor = ThreadPoolExecutor
-    else:
-        Executor = ProcessPoolExecutor
+    # Load data into memory (using `compute` to avoid modifying the
+    # input in place), and convert to dataset so that all inputs can
+    # be treated the same way
+    ds = ds.compute()
+    name = ds.name if isinstance(ds, xr.DataArray) else None
+    if isinstance(ds, xr.DataArray):
+        ds = ds.to_dataset(name="__dataarray__")
+
+    # Split data into metadata and the underlying arrays
+    skeleton = ds.drop_vars(list(ds.data_vars))
+    var_dims = {name: (da.dims, da.attrs) for name, da in ds.data_vars.items()}
+    n_slices = ds.sizes[dim]
+
+    # Apply func to first slice to obtain the structure of the outputs
+    applier = _SliceApplier(
+        func,
+        dim,
+        skeleton,
+        var_dims,
+        inputs={name: da.values for name, da in ds.data_vars.items()},
+        name=name,
+        args=args,
+        kwargs=kwargs,
+    )
+    template = applier.apply(0)
+
+    applier.output_dims = {name: da.dims for name, da in template.data_vars.items()}
+
+    shared = []
+    try:
+        # Allocate outputs for all slices (in shared memory if using
+        # processes), then copy in outputs from the first slice
+        outputs = {}
+        for name, da in template.data_vars.items():
+            shape = (n_slices,) + da.shape
+            if use_threads:
+                outputs[name] = np.empty(shape, dtype=da.dtype)
+            else:
+                outputs[name] = _SharedArray(shape, da.dtype)
+                shared.append(outputs[name])
+            outputs[name][0] = da.values
+
+        # Threads can read inputs and write outputs directly
+        if use_threads:
+            applier.outputs = outputs
+            executor = ThreadPoolExecutor()
+            task = applier
+
+        # Otherwise, copy inputs into shared memory once, and attach
+        # each worker process to the shared inputs and outputs
+        else:
+            inputs = {}
+            for name, da in ds.data_vars.items():
+                inputs[name] = _SharedArray(da.shape, da.dtype)
+                inputs[name][:] = da.values
+                shared.append(inputs[name])
+
+            applier.inputs = None
+            executor = ProcessPoolExecutor(
+                initializer=_init_worker_applier,
+                initargs=(applier, inputs, outputs),
+            )
+            task = _run_worker_applier
+
+        # Apply func to remaining slices in parallel
+        with executor:
+            for _ in tqdm(
+                executor.map(task, range(1, n_slices)),
+                initial=1,
+                total=n_slices,
+            ):
+                pass
+
+        # Outputs from processes are copied out of shared memory once,
+        # before the shared memory is released
+        data_vars = {
+            name: (
+                (dim,) + template[name].dims,
+                out if use_threads else out.array.copy(),
+                template[name].attrs,
+            )
+            for name, out in outputs.items()
+        }
+
+    finally:
+        for array in shared:
+            array.release(unlink=True)
+
+    # Combine outputs into a dataset that matches the original dataset
+    coords = template.drop_vars(dim, errors="ignore").coords
+    out_ds = xr.Dataset(data_vars, coords=coords, attrs=template.attrs)
+    out_ds = out_ds.assign_coords({dim: ds[dim]})
 
-    with Executor as executor:
-        # Update func to add kwargs
-        func = partial(func, **kwargs)
+    if "__dataarray__" in out_ds:
+        return out_ds["__dataarray__"].rename(applier.result_name)
+    return out_ds
+
+
+def _apply_bandwise(ds, pan_band, func, core_dims=(), output_dtype="float64", **kwargs):
+    """
+    Apply a pansharpening function to the raw (numpy or dask) arrays of
+    each multispectral band and the panchromatic band in a dataset.
+    `func` should accept each multispectral band followed by the pan
+    band, and return a tuple of pansharpened multispectral bands.
+
+    If `core_dims` are provided, dask arrays are re-chunked so that
+    these dimensions are contained within a single chunk (e.g. so that
+    `func` has access to every pixel in each timestep). `output_dtype`
+    should match the dtype of the arrays returned by `func`.
+    """
 
-        # Apply func in parallel
-        groups = [group for (i, group) in ds.groupby(dim)]
-        to_iterate = (groups, *(repeat(i, len(groups)) for i in args))
-        out_list = list(tqdm(executor.map(func, *to_iterate), total=len(groups)))
+    ms_bands = [band for band in ds.data_vars if band != pan_band]
+    core_dims = list(core_dims)
+
+    if core_dims and ds.chunks:
+        ds = ds.chunk({dim: -1 for dim in core_dims})
+
+    outputs = xr.apply_ufunc(
+        func,
+        *[ds[band] for band in ms_bands],
+        ds[pan_band],
+        input_core_dims=[core_dims] * (len(ms_bands) + 1),
+        output_core_dims=[core_dims] * len(ms_bands),
+        kwargs=kwargs,
+        dask="parallelized",
+        output_dtypes=[output_dtype] * len(ms_bands),
+    )
 
-    # Combine to match the original dataset
-    return xr.concat(out_list, dim=ds[dim])
+    return xr.Dataset(dict(zip(ms_bands, outputs)))
 
 
-def _apply_weights(da, band_weights):
+def _band_weights(bands, band_weights):
     """
-    Apply weights from a dictionary to the bands of a
-    multispectral xarray.DataArray.  Raises a ValueError if any
-    bands in `da` are not present in the `band_weights` dictionary.
+    Obtain weights for each band of a multispectral dataset from a
+    dictionary. Raises a ValueError if any bands are not present in
+    the `band_weights` dictionary.
 
     Parameters
     ----------
-    da : xarray.DataArray object
-        DataArray containing multispectral data. The dataarray
-        should contain a "variable" dimension that corresponds
-        to the different bands of the data.
-    band_weights : dict
+    bands : list of str
+        Names of the multispectral bands in the dataset.
+    band_weights : dict or None
         Mapping of band names to weights to be applied. The keys
-        of the dictionary should be the names of the bands in the
-        "variable" dimension of `da`, and the values should be
-        the weights to be applied to each band.
+        of the dictionary should be the names of the bands, and the
+        values should be the weights to be applied to each band. If
+        None, all bands will be given a weight of 1.
 
     Returns
     -------
-    xarray.DataArray object
-        DataArray with weights applied to the bands.
+    list of float
+        Weights for each band in `bands`.
     """
 
+    if band_weights is None:
+        return [1.0] * len(bands)
+
     # Identify any bands without weights, and raise an
     # error if they exist
-    bands_without_weights = set(da["variable"].values) - set(band_weights.keys())
+    bands_without_weights = set(bands) - set(band_weights.keys())
     if len(bands_without_weights) > 0:
         raise ValueError(
             f"The following multispectral bands are missing from the "
@@ -1000,16 +2472,49 @@ def _apply_weights(da, band_weights):
             f"bands in `ds`, or set `band_weights=None`."
         )
 
-    # Create xr.DataArray with weights for each variable
-    # along the "variable" dimension
-    weights_da = xr.DataArray(
-        data=list(band_weights.values()),
-        coords={"variable": list(band_weights.keys())},
-        dims="variable",
-    )
+    return [band_weights[band] for band in bands]
 
-    # Apply weights
-    return da.weighted(weights_da)
+
+def _weighted_total(ms_bands, weights):
+    """
+    Calculate the weighted sum of a list of numpy arrays, and the
+    sum of weights for each pixel, ignoring NaN values.
+    """
+    total = 0
+    weight_total = 0
+    for band, weight in zip(ms_bands, weights):
+        valid = ~np.isnan(band)
+        total = total + np.where(valid, band * weight, 0)
+        weight_total = weight_total + valid * weight
+    return total, weight_total
+
+
+def _brovey_pansharpen_np(*bands, weights, dtype):
+    """
+    Brovey pansharpen numpy arrays of multispectral bands and a pan
+    band (supplied as the final band) in a single pass.
+    """
+    *ms_bands, pan = bands
+    total, _ = _weighted_total(ms_bands, weights)
+
+    # Perform Brovey Transform in form of: band / total * panchromatic
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = pan / total
+    return tuple((band * ratio).astype(dtype, copy=False) for band in ms_bands)
+
+
+def _esri_pansharpen_np(*bands, weights, dtype):
+    """
+    ESRI pansharpen numpy arrays of multispectral bands and a pan
+    band (supplied as the final band) in a single pass.
+    """
+    *ms_bands, pan = bands
+    total, weight_total = _weighted_total(ms_bands, weights)
+
+    # Calculate adjustment and apply to multispectral bands
+    with np.errstate(invalid="ignore", divide="ignore"):
+        adj = pan - total / weight_total
+    return tuple((band + adj).astype(dtype, copy=False) for band in ms_bands)
 
 
 def _brovey_pansharpen(ds, pan_band, band_weights=None):
@@ -1017,6 +2522,9 @@ def _brovey_pansharpen(ds, pan_band, band_weights=None):
     Perform pansharpening on multiple timesteps of a multispectral
     dataset using the Brovey transform (with optional per-band weights).
 
+    The weighted total and output bands are calculated in a single
+    pass for each block of data, so Dask arrays remain lazy.
+
     Source: https://pro.arcgis.com/en/pro-app/latest/help/analysis/
             raster-functions/fundamentals-of-pan-sharpening-pro.htm
 
@@ -1043,21 +2551,17 @@ def _brovey_pansharpen(ds, pan_band, band_weights=None):
         Pansharpened dataset with the same dimensions as the input dataset.
     """
 
-    # Create new dataarrays with and without pan band
-    da_nopan = ds.drop(pan_band).to_array()
-    da_pan = ds[pan_band]
-
-    # Calculate weighted sum
-    if band_weights is not None:
-        da_total = _apply_weights(da_nopan, band_weights).sum(dim="variable")
-    else:
-        da_total = da_nopan.sum(dim="variable")
+    ms_bands = [band for band in ds.data_vars if band != pan_band]
+    dtype = np.result_type(*[ds[band].dtype for band in ds.data_vars], np.float32)
 
-    # Perform Brovey Transform in form of: band / total * panchromatic
-    da_pansharpened = da_nopan / da_total * da_pan
-    ds_pansharpened = da_pansharpened.to_dataset("variable")
-
-    return ds_pansharpened
+    return _apply_bandwise(
+        ds,
+        pan_band,
+        _brovey_pansharpen_np,
+        output_dtype=dtype,
+        weights=_band_weights(ms_bands, band_weights),
+        dtype=dtype,
+    )
 
 
 def _esri_pansharpen(ds, pan_band, band_weights=None):
@@ -1065,6 +2569,9 @@ def _esri_pansharpen(ds, pan_band, band_weights=None):
     Perform pansharpening on multiple timesteps of a multispectral
     dataset using the ESRI transform (with optional per-band weights).
 
+    The weighted mean and output bands are calculated in a single
+    pass for each block of data, so Dask arrays remain lazy.
+
     Source: https://pro.arcgis.com/en/pro-app/latest/help/analysis/
             raster-functions/fundamentals-of-pan-sharpening-pro.htm
 
@@ -1090,22 +2597,18 @@ def _esri_pansharpen(ds, pan_band, band_weights=None):
     ds_pansharpened : xarray.Dataset
         Pansharpened dataset with the same dimensions as the input dataset.
     """
-    # Create new dataarrays with and without pan band
-    da_nopan = ds.drop(pan_band).to_array()
-    da_pan = ds[pan_band]
 
-    # Calculate weighted sum
-    if band_weights is not None:
-        da_mean = _apply_weights(da_nopan, band_weights).mean(dim="variable")
-    else:
-        da_mean = da_nopan.mean(dim="variable")
-
-    # Calculate adjustment and apply to multispectral bands
-    adj = da_pan - da_mean
-    da_pansharpened = da_nopan + adj
-    ds_pansharpened = da_pansharpened.to_dataset("variable")
+    ms_bands = [band for band in ds.data_vars if band != pan_band]
+    dtype = np.result_type(*[ds[band].dtype for band in ds.data_vars], np.float32)
 
-    return ds_pansharpened
+    return _apply_bandwise(
+        ds,
+        pan_band,
+        _esri_pansharpen_np,
+        output_dtype=dtype,
+        weights=_band_weights(ms_bands, band_weights),
+        dtype=dtype,
+    )
 
 
 def _simple_mean_pansharpen(ds, pan_band):
@@ -1139,9 +2642,27 @@ def _simple_mean_pansharpen(ds, pan_band):
     return ds_pansharpened
 
 
-def _hsv_timestep_pansharpen(ds_i, pan_band):
+def _hsv_pansharpen_np(*bands):
+    """
+    HSV pansharpen numpy arrays of multispectral bands and a pan band
+    (supplied as the final band). Arrays can have any shape.
+    """
+    *ms_bands, pan = bands
+
+    # Convert to HSV colour space
+    hsv = rgb2hsv(np.stack(ms_bands, axis=-1))
+
+    # Replace value (lightness) channel with pan band data
+    hsv[..., 2] = pan
+
+    # Convert back to RGB colour space
+    rgb = hsv2rgb(hsv)
+    return tuple(rgb[..., i] for i in range(rgb.shape[-1]))
+
+
+def _hsv_pansharpen(ds, pan_band):
     """
-    Perform pansharpening on a single timestep of a multispectral
+    Perform pansharpening on one or more timesteps of a multispectral
     dataset using the Hue Saturation Value (HSV) transform.
 
     Parameters
@@ -1156,36 +2677,83 @@ def _hsv_timestep_pansharpen(ds_i, pan_band):
     ds_pansharpened : xarray.Dataset
         Pansharpened dataset with the same dimensions as the input dataset.
     """
-    # Squeeze out any single dimensions
-    ds_i = ds_i.squeeze()
 
-    # Convert to an xr.DataArray and move "variable" to end
-    da_i = ds_i.to_array().transpose(..., "variable")
+    # HSV transforms each pixel independently, so can be applied to
+    # data with any chunking
+    return _apply_bandwise(ds, pan_band, _hsv_pansharpen_np)
 
-    # Create new dataarrays with and without pan band
-    da_i_nopan = da_i.drop(pan_band, dim="variable")
-    da_i_pan = da_i.sel(variable=pan_band)
-
-    # Convert to HSV colour space
-    hsv = rgb2hsv(da_i_nopan)
 
-    # Replace value (lightness) channel with pan band data
-    hsv[:, :, 2] = da_i_pan.values
-
-    # Convert back to RGB colour space
-    pansharped_array = hsv2rgb(hsv)
+def _pca_pansharpen_np(*bands, pca_rescaling="histogram"):
+    """
+    PCA pansharpen numpy arrays of multispectral bands and a pan band
+    (supplied as the final band). Arrays should have shape (..., y, x);
+    a separate PCA transform is calculated for every y, x slice (e.g.
+    for every timestep).
+    """
+    *ms_bands, pan = bands
+    shape = pan.shape
+
+    # Reshape to (timestep, pixel, variable), and identify pixels with
+    # valid data in all bands
+    ms = np.stack(ms_bands, axis=-1).reshape(-1, shape[-2] * shape[-1], len(ms_bands))
+    ms = ms.astype("float64")
+    pan = pan.reshape(ms.shape[:-1]).astype("float64")
+    valid = np.isfinite(ms).all(axis=-1) & np.isfinite(pan)
+    n_valid = valid.sum(axis=-1)
+
+    # Calculate mean and covariance matrix of valid pixels in each
+    # timestep, ignoring timesteps with too few valid pixels
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(valid[..., None], ms, 0).sum(axis=1) / n_valid[:, None]
+    centred = np.where(valid[..., None], ms - mean[:, None, :], 0)
+    cov = np.einsum("tni,tnj->tij", centred, centred)
+    cov /= np.maximum(n_valid - 1, 1)[:, None, None]
+    cov[n_valid < 2] = np.eye(ms.shape[-1])
+
+    # Obtain first principal component for each timestep from the
+    # eigenvector with the largest eigenvalue. For consistency with
+    # `sklearn.decomposition.PCA`, flip signs so that the largest
+    # absolute loading is positive
+    component = np.linalg.eigh(cov)[1][..., -1]
+    max_loading = np.take_along_axis(
+        component, np.abs(component).argmax(axis=-1)[:, None], axis=-1
+    )
+    component *= np.sign(max_loading)
+
+    # Project data onto first principal component
+    scores = np.einsum("tni,ti->tn", centred, component)
+
+    # Rescale pan band to more closely match the first PCA component.
+    # Timesteps with less than two valid pixels have no variance to
+    # rescale, so are passed through unchanged
+    pan_rescaled = scores.copy()
+    for t in np.flatnonzero(n_valid >= 2):
+        pan_t, scores_t = pan[t, valid[t]], scores[t, valid[t]]
+        if pca_rescaling == "simple":
+            pan_rescaled[t, valid[t]] = (pan_t - pan_t.mean()) * (
+                scores_t.std() / pan_t.std()
+            ) + scores_t.mean()
+        elif pca_rescaling == "histogram":
+            pan_rescaled[t, valid[t]] = match_histograms(pan_t, scores_t)
+        else:
+            pan_rescaled[t, valid[t]] = scores_t
 
-    # Add back into original array, reshape and return dataframe
-    da_i_nopan[:] = pansharped_array
-    ds_pansharpened = da_i_nopan.to_dataset("variable")
+    # Replace first PCA component with rescaled pan band, then apply
+    # reverse PCA transform to restore multispectral array. As all
+    # other components are unchanged, this is equivalent to adding
+    # the change in the first component back onto the original data
+    pansharpened = ms + (pan_rescaled - scores)[..., None] * component[:, None, :]
+    pansharpened[~valid] = np.nan
 
-    return ds_pansharpened
+    pansharpened = pansharpened.reshape(shape + (len(ms_bands),))
+    return tuple(pansharpened[..., i] for i in range(len(ms_bands)))
 
 
-def _pca_timestep_pansharpen(ds_i, pan_band, pca_rescaling="histogram"):
+def _pca_pansharpen(ds, pan_band, pca_rescaling="histogram"):
     """
-    Perform pansharpening on a single timestep of a multispectral
+    Perform pansharpening on one or more timesteps of a multispectral
     dataset using the principal component analysis (PCA) transform.
+    A separate PCA transform is calculated for each timestep.
 
     Parameters
     ----------
@@ -1210,43 +2778,16 @@ def _pca_timestep_pansharpen(ds_i, pan_band, pca_rescaling="histogram"):
     ds_pansharpened : xarray.Dataset
         Pansharpened dataset with the same dimensions as the input dataset.
     """
-    # Squeeze out any single dimensions
-    ds_i = ds_i.squeeze()
-
-    # Reshape to 2D by stacking x and y dimensions to prepare it
-    # as an input to PCA. Drop NA rows as these are not supported
-    # by `pca.fit_transform`.
-    da_2d = (
-        ds_i.to_array()
-        .stack(pixel=("y", "x"))
-        .transpose("pixel", "variable")
-        .dropna(dim="pixel")
-    )
-
-    # Create new dataarrays with and without pan band
-    da_2d_nopan = da_2d.drop(pan_band, dim="variable")
-    da_2d_pan = da_2d.sel(variable=pan_band)
-
-    # Apply PCA transformation
-    pca = sklearn.decomposition.PCA()
-    pca_array = pca.fit_transform(da_2d_nopan)
 
-    # Rescale pan band to more closely match the first PCA component
-    if pca_rescaling == "simple":
-        pca_array[:, 0] = (da_2d_pan.values - da_2d_pan.values.mean()) * (
-            pca_array[:, 0].std() / da_2d_pan.values.std()
-        ) + pca_array[:, 0].mean()
-    elif pca_rescaling == "histogram":
-        pca_array[:, 0] = match_histograms(da_2d_pan.values, pca_array[:, 0])
-
-    # Apply reverse PCA transform to restore multispectral array
-    pansharped_array = pca.inverse_transform(pca_array)
-
-    # Add back into original array, reshape and return dataframe
-    da_2d_nopan[:] = pansharped_array
-    ds_pansharpened = da_2d_nopan.unstack("pixel").to_dataset("variable")
-
-    return ds_pansharpened
+    # PCA requires all pixels in each timestep, so dask arrays are
+    # processed in chunks along time only
+    return _apply_bandwise(
+        ds,
+        pan_band,
+        _pca_pansharpen_np,
+        core_dims=ds[pan_band].odc.spatial_dims,
+        pca_rescaling=pca_rescaling,
+    )
 
 
 def xr_pansharpen(
@@ -1299,8 +2840,10 @@ def xr_pansharpen(
         dtype of the multispectral bands in `ds`.
     parallelise: bool, optional
         Whether to parallelise transformations across multiple cores.
-        Used for PCA and HSV transforms that are applied to each
-        timestep in `ds` individually; defaults to False.
+        Used for PCA and HSV transforms, which are applied to each
+        timestep in `ds` in parallel using Dask; defaults to False.
+        If `ds` is already a Dask array, PCA and HSV transforms are
+        applied lazily to each chunk along the time dimension.
     band_weights : dict, optional
         Used for the Brovey and ESRI transforms. Mapping of band
         names to weights to be applied to each band when calculating
@@ -1355,8 +2898,8 @@ def xr_pansharpen(
         "brovey": _brovey_pansharpen,
         "esri": _esri_pansharpen,
         "simple mean": _simple_mean_pansharpen,
-        "pca": _pca_timestep_pansharpen,
-        "hsv": _hsv_timestep_pansharpen,
+        "pca": _pca_pansharpen,
+        "hsv": _hsv_pansharpen,
     }
 
     # If Brovey, ESRI or Simple Mean pansharpening is specified, apply to
@@ -1372,32 +2915,17 @@ def xr_pansharpen(
             **extra_params,
         )
 
-    # Otherwise, apply PCA or HSV pansharpening to each
-    # timestep in the `xr.Dataset` using `.apply`
+    # Otherwise, apply PCA or HSV pansharpening to all timesteps in
+    # the `xr.Dataset` at once
     elif transform in ("pca", "hsv"):
         extra_params = {"pca_rescaling": pca_rescaling} if transform == "pca" else {}
 
-        # Apply pansharpening to all timesteps in data in parallel
-        if ("time" in ds.dims) and parallelise:
+        # Optionally process each timestep in parallel using dask
+        if ("time" in ds.dims) and parallelise and not ds.chunks:
             print(f"Applying {transform.upper()} pansharpening in parallel")
-            ds_pansharpened = parallel_apply(
-                ds,
-                "time",
-                transform_dict[transform],
-                pan_band,
-                *extra_params.values(),  # TODO: Update once `parallel_apply` supports kwargs
-            )
-
-        # Apply pansharpening to all timesteps in data sequentially
-        elif ("time" in ds.dims) and not parallelise:
-            print(f"Applying {transform.upper()} pansharpening")
-            ds_pansharpened = ds.groupby("time").apply(
-                transform_dict[transform],
-                pan_band=pan_band,
-                **extra_params,
-            )
-
-        # Otherwise, apply func directly if only one timestep
+            ds_pansharpened = transform_dict[transform](
+                ds.chunk({"time": 1}), pan_band=pan_band, **extra_params
+            ).compute()
         else:
             print(f"Applying {transform.upper()} pansharpening")
             ds_pansharpened = transform_dict[transform](
@@ -1415,9 +2943,25 @@ def xr_pansharpen(
         ds_pansharpened[pan_band] = ds[pan_band]
 
     # Return data in original or requested dtype
-    return ds_pansharpened.astype(
-        ds.to_array().dtype if output_dtype is None else output_dtype
-    )
+    if output_dtype is None:
+        output_dtype = np.result_type(*[ds[band].dtype for band in ds.data_vars])
+    return ds_pansharpened.astype(output_dtype)
+
+
+def _overview_level(path, read_shrink):
+    """
+    Select the coarsest overview level of a raster that still has a
+    higher resolution than required, given the maximum integer factor
+    that the raster can be shrunk by (`read_shrink`). Returns None if
+    the full resolution data should be used.
+    """
+    import rasterio
+
+    with rasterio.open(path) as src:
+        factors = src.overviews(1)
+
+    levels = [i for i, factor in enumerate(factors) if factor <= read_shrink]
+    return levels[-1] if levels else None
 
 
 def load_reproject(
@@ -1430,16 +2974,30 @@ def load_reproject(
     bands=None,
     masked=True,
     reproject_kwds=None,
+    use_overviews=True,
     **kwargs,
 ):
     """
     Load and reproject part of a raster dataset into a given GeoBox or
     custom CRS/resolution.
 
+    Multiple raster files (e.g. tiles of a larger mosaic) can be
+    provided, in which case they will be mosaicked together into
+    the output GeoBox. To minimise the amount of data that is read,
+    rasters that do not overlap the output GeoBox are ignored, and
+    only the section of each raster overlapping the output GeoBox is
+    loaded. If no rasters overlap the output GeoBox, an array filled
+    with nodata (or NaN if `masked=True`) is returned. If the output
+    resolution is coarser than the input data, data is read from a
+    lower resolution overview where available.
+
     Parameters
     ----------
-    path : str
-        Path to the raster dataset to be loaded and reprojected.
+    path : str or list of str
+        Path to the raster dataset to be loaded and reprojected, or a
+        list of paths to raster datasets to mosaic together. Where
+        rasters overlap, data from rasters earlier in the list will
+        take priority.
     how : GeoBox, str or int
         How to reproject the raster. Can be a GeoBox or a CRS (e.g.
         "ESPG:XXXX" string or integer).
@@ -1465,9 +3023,19 @@ def load_reproject(
         Bands to optionally filter to when loading data.
     masked : bool, optional
         Whether to mask the data by its nodata value, by default True.
+        If False, data is returned in its original dtype, and pixels
+        outside the input rasters are set to the rasters' nodata value
+        (or NaN for floating point data without a nodata value). When
+        mosaicking multiple integer rasters without a nodata value,
+        gaps in earlier rasters cannot be identified or filled.
     reproject_kwds : dict, optional
         Additional keyword arguments to pass to the `.odc.reproject()`
         method, by default None.
+    use_overviews : bool, optional
+        Whether to read data from lower resolution overviews if the
+        output resolution is coarser than the input data, by default
+        True. This can greatly reduce the amount of data read when
+        loading large rasters at a coarse resolution.
     **kwargs : dict
         Additional keyword arguments to be passed to the
         `rioxarray.open_rasterio` function.
@@ -1477,30 +3045,116 @@ def load_reproject(
     xarray.Dataset
         The reprojected raster dataset.
     """
+    import rasterio
+    from functools import reduce
+    from odc.geo.geobox import GeoBox
+    from odc.geo.overlap import compute_output_geobox, compute_reproject_roi
+    from odc.geo.roi import roi_is_empty
+
     # Use empty kwds if not provided
     reproject_kwds = {} if reproject_kwds is None else reproject_kwds
 
-    # Load data with rasterio
-    da = rioxarray.open_rasterio(
-        filename=path,
-        masked=masked,
-        chunks=chunks,
-        **kwargs,
-    )
+    # Support both single and multiple paths
+    paths = [path] if isinstance(path, (str, os.PathLike)) else list(path)
 
-    # Optionally filter to bands
-    if bands is not None:
-        da = da.sel(band=bands)
-
-    # Reproject into GeoBox
-    da = da.odc.reproject(
-        how=how,
-        resolution=resolution,
-        tight=tight,
-        resampling=resampling,
-        dst_nodata=np.NaN if masked else None,
-        **reproject_kwds,
-    )
+    # Read GeoBox of each raster from its metadata
+    src_geoboxes = []
+    for src_path in paths:
+        with rasterio.open(src_path) as src:
+            src_geoboxes.append(GeoBox(src.shape, src.transform, src.crs))
+
+    # Identify output GeoBox. If a CRS is provided, use a GeoBox that
+    # covers the extent of all input rasters, on the same pixel grid
+    # as the output GeoBox of the first raster
+    if isinstance(how, GeoBox):
+        geobox = how
+    else:
+        output_geoboxes = [
+            compute_output_geobox(src_geobox, how, resolution=resolution, tight=tight)
+            for src_geobox in src_geoboxes
+        ]
+        geobox = output_geoboxes[0]
+        if len(output_geoboxes) > 1:
+            geobox = geobox.enclosing(
+                reduce(lambda a, b: a | b, [g.boundingbox for g in output_geoboxes])
+            )
+
+    # Identify rasters that overlap the output GeoBox. If none overlap,
+    # use the first raster to return an output filled with nodata
+    overlapping = [
+        (src_path, compute_reproject_roi(src_geobox, geobox, padding=2))
+        for src_path, src_geobox in zip(paths, src_geoboxes)
+    ]
+    overlapping = [
+        (src_path, reproject_info)
+        for src_path, reproject_info in overlapping
+        if not roi_is_empty(reproject_info.roi_src)
+    ] or overlapping[:1]
+
+    da_list = []
+    for src_path, reproject_info in overlapping:
+
+        # Select overview level if output resolution is coarser than input
+        open_kwargs = kwargs.copy()
+        if use_overviews and "overview_level" not in open_kwargs:
+            open_kwargs["overview_level"] = _overview_level(
+                src_path, reproject_info.read_shrink
+            )
+
+        # Lazily load data with rasterio
+        da = rioxarray.open_rasterio(
+            filename=src_path,
+            masked=masked,
+            chunks=chunks,
+            **open_kwargs,
+        )
+
+        # Subset to only the section of data overlapping the output
+        # GeoBox, re-calculated in case an overview level was used
+        roi = compute_reproject_roi(da.odc.geobox, geobox, padding=2).roi_src
+        if not roi_is_empty(roi):
+            da = da.isel(y=roi[0], x=roi[1])
+
+        # Optionally filter to bands
+        if bands is not None:
+            da = da.sel(band=bands)
+
+        # Identify nodata value used to fill pixels outside the rasters,
+        # using the first raster so that every raster is reprojected
+        # with the same fill value. Use NaN if masked, otherwise the
+        # raster's own nodata value (or NaN for floating point data
+        # without a nodata value)
+        if not da_list:
+            if masked:
+                nodata = np.nan
+            elif da.odc.nodata is not None:
+                nodata = da.odc.nodata
+            elif np.issubdtype(da.dtype, np.floating):
+                nodata = np.nan
+            else:
+                nodata = None
+
+        # Reproject into GeoBox
+        da = da.odc.reproject(
+            how=geobox,
+            resampling=resampling,
+            dst_nodata=nodata,
+            **reproject_kwds,
+        )
+        da_list.append(da)
+
+    # Mosaic rasters together, using data from rasters earlier in
+    # the list where rasters overlap
+    def _mosaic(da_a, da_b, fill_value):
+        if fill_value is None or np.isnan(fill_value):
+            return da_a.where(da_a.notnull(), da_b)
+        return da_a.where(da_a != fill_value, da_b)
+
+    da = reduce(lambda da_a, da_b: _mosaic(da_a, da_b, nodata), da_list)
+
+    # Record nodata value for unmasked data
+    if not masked and nodata is not None:
+        da.attrs["nodata"] = da.dtype.type(nodata)
 
     # Squeeze if only one band
     da = da.squeeze()
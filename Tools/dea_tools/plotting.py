@@ -38,10 +38,27 @@ from skimage.exposure import rescale_intensity
 from tqdm.auto import tqdm
 
 import odc.geo.xr
+import odc.algo
 from odc.ui import image_aspect
 from dea_tools.spatial import add_geobox
 
 
+def _nodata_to_nan(ds):
+    """
+    Convert integer bands with a `nodata` attribute (e.g. data loaded
+    using `load_ard(dtype='native')`) to `float32`, setting nodata
+    values to NaN so they are not included in plots or colour
+    stretches. Other bands are returned unchanged.
+    """
+
+    def _convert(da):
+        if np.issubdtype(da.dtype, np.integer) and ('nodata' in da.attrs):
+            return odc.algo.to_float(da, dtype='float32')
+        return da
+
+    return ds.map(_convert, keep_attrs=True)
+
+
 def rgb(ds,
         bands=['nbart_red', 'nbart_green', 'nbart_blue'],
         index=None,
@@ -154,8 +171,9 @@ def rgb(ds,
     # values and arguments passed via `**kwargs`
     if index is None:
 
-        # Select bands and convert to DataArray
-        da = ds[bands].to_array().compute()
+        # Select bands and convert to DataArray, setting any nodata
+        # values in native integer data to NaN
+        da = _nodata_to_nan(ds[bands]).to_array().compute()
 
         # If percentile_stretch == True, clip plotting to percentile vmin, vmax
         if percentile_stretch:
@@ -211,8 +229,10 @@ def rgb(ds,
         # can be computed
         index = index if isinstance(index, list) else [index]
 
-        # Select bands and observations and convert to DataArray
-        da = ds[bands].isel(**{index_dim: index}).to_array().compute()
+        # Select bands and observations and convert to DataArray,
+        # setting any nodata values in native integer data to NaN
+        da = _nodata_to_nan(
+            ds[bands].isel(**{index_dim: index})).to_array().compute()
 
         # If percentile_stretch == True, clip plotting to percentile vmin, vmax
         if percentile_stretch:
@@ -670,8 +690,11 @@ def xr_animation(ds,
             left, bottom, right, top)).reindex(show_gdf.index).dropna(how='all')
         show_gdf = _start_end_times(show_gdf, ds)
 
-    # Convert data to 4D numpy array of shape [time, y, x, bands]
-    ds = ds[bands].to_array().transpose(..., 'variable')[0:limit, ...]
+    # Convert data to 4D numpy array of shape [time, y, x, bands],
+    # setting any nodata values in native integer data to NaN
+    first_dim = list(ds[bands].dims)[0]
+    ds = _nodata_to_nan(ds[bands].isel({first_dim: slice(0, limit)}))
+    ds = ds.to_array().transpose(..., 'variable')
     array = ds.astype(np.float32).values
 
     # Optionally apply image processing along axis 0 (e.g. to each timestep)
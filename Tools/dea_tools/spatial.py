@@ -16,7 +16,7 @@ here: https://gis.stackexchange.com/questions/tagged/open-data-cube).
 If you would like to report an issue with this script, file one on 
 GitHub: https://github.com/GeoscienceAustralia/dea-notebooks/issues/new
 
-Last modified: July 2024
+Last modified: October 2026
 
 """
 
@@ -195,6 +195,73 @@ def add_geobox(ds, crs=None):
     return ds
 
 
+def _vectorize_tile(data, mask, row_off, col_off, dtype, **rasterio_kwargs):
+    """
+    Vectorises a single tile of a raster array into a list of
+    polygons and values. Polygons are returned in pixel coordinates
+    of the full array so that vertices along tile seams match exactly
+    between neighbouring tiles.
+    """
+    vectors = rasterio.features.shapes(
+        source=np.asarray(data).astype(dtype),
+        mask=None if mask is None else np.asarray(mask),
+        transform=rasterio.Affine.translation(col_off, row_off),
+        **rasterio_kwargs,
+    )
+    return [(shape(polygon), value) for polygon, value in vectors]
+
+
+def _vectorize_tiled(da, dtype, attribute_name, tile_size, **rasterio_kwargs):
+    """
+    Vectorises a raster array tile-by-tile in parallel using `dask`,
+    then dissolves polygons that were split along tile seams.
+    Returns a ``geopandas.GeoDataFrame`` in pixel coordinates.
+    """
+    from dask.array.core import normalize_chunks
+
+    chunks = normalize_chunks(tile_size, shape=da.shape)
+    row_offsets, col_offsets = [np.cumsum((0,) + c) for c in chunks]
+
+    # Slice each tile (and mask if provided) and vectorise in parallel
+    mask = rasterio_kwargs.pop("mask", None)
+    mask = mask.data if isinstance(mask, xr.DataArray) else mask
+    tasks = []
+    for y0, y1 in zip(row_offsets[:-1], row_offsets[1:]):
+        for x0, x1 in zip(col_offsets[:-1], col_offsets[1:]):
+            tasks.append(
+                dask.delayed(_vectorize_tile)(
+                    da.data[y0:y1, x0:x1],
+                    None if mask is None else mask[y0:y1, x0:x1],
+                    y0,
+                    x0,
+                    dtype,
+                    **rasterio_kwargs,
+                )
+            )
+    vectors = [v for tile_vectors in dask.compute(*tasks) for v in tile_vectors]
+    gdf = gpd.GeoDataFrame(
+        data={attribute_name: [value for polygon, value in vectors]},
+        geometry=[polygon for polygon, value in vectors],
+    )
+
+    # Identify polygons touching an internal tile seam, and dissolve
+    # these by value to merge polygons that were split between tiles
+    bounds = gdf.geometry.bounds.values
+    on_seam = np.isin(bounds[:, [0, 2]], col_offsets[1:-1]).any(axis=1) | np.isin(
+        bounds[:, [1, 3]], row_offsets[1:-1]
+    ).any(axis=1)
+    if on_seam.any():
+        merged = (
+            gdf[on_seam]
+            .dissolve(by=attribute_name, as_index=False, dropna=False)
+            .explode(ignore_index=True)
+        )
+        merged["geometry"] = merged.geometry.simplify(0)
+        gdf = pd.concat([gdf[~on_seam], merged], ignore_index=True)
+
+    return gdf
+
+
 def xr_vectorize(
     da,
     attribute_col=None,
@@ -202,12 +269,19 @@ def xr_vectorize(
     dtype="float32",
     output_path=None,
     verbose=True,
+    tile_size=None,
     **rasterio_kwargs,
 ):
     """
     Vectorises a raster ``xarray.DataArray`` into a vector
     ``geopandas.GeoDataFrame``.
 
+    If ``tile_size`` is provided, the array will be vectorised
+    tile-by-tile in parallel, and polygons crossing tile seams will be
+    dissolved back together. If ``da`` is a lazy dask-backed array,
+    this avoids loading the entire raster into memory at once (although
+    the output polygons are still combined in memory).
+
     Parameters
     ----------
     da : xarray.DataArray
@@ -227,9 +301,15 @@ def xr_vectorize(
     output_path : string, optional
         Provide an optional string file path to export the vectorised
         data to file. Supports any vector file formats supported by
-        ``geopandas.GeoDataFrame.to_file()``.
+        ``geopandas.GeoDataFrame.to_file()`` (e.g. FlatGeobuf using
+        a ".fgb" extension), or GeoParquet using a ".parquet" extension.
     verbose : bool, optional
         Print debugging messages. Default True.
+    tile_size : int or tuple of ints, optional
+        An optional tile size in pixels (e.g. ``2048`` or
+        ``(1024, 2048)``) used to vectorise the array in parallel
+        tiles. If None (default), the entire array will be loaded and
+        vectorised at once.
     **rasterio_kwargs :
         A set of keyword arguments to ``rasterio.features.shapes``.
         Can include `mask` and `connectivity`.
@@ -242,37 +322,110 @@ def xr_vectorize(
 
     # Add GeoBox and odc.* accessor to array using `odc-geo`
     da = add_geobox(da, crs)
+    attribute_name = attribute_col if attribute_col is not None else "attribute"
 
-    # Run the vectorizing function
-    vectors = rasterio.features.shapes(
-        source=da.data.astype(dtype), transform=da.odc.transform, **rasterio_kwargs
-    )
+    # Vectorise in parallel tiles if requested
+    if tile_size is not None:
+        if verbose:
+            print("Vectorising data in parallel tiles")
+        gdf = _vectorize_tiled(
+            da, dtype, attribute_name, tile_size=tile_size, **rasterio_kwargs
+        )
 
-    # Convert the generator into a list
-    vectors = list(vectors)
+        # Transform polygons from pixel to real world coordinates
+        t = da.odc.transform
+        gdf = gdf.set_geometry(
+            gdf.geometry.affine_transform([t.a, t.b, t.d, t.e, t.c, t.f]),
+            crs=da.odc.crs,
+        )
 
-    # Extract the polygon coordinates and values from the list
-    polygons = [polygon for polygon, value in vectors]
-    values = [value for polygon, value in vectors]
+    else:
+        # Run the vectorizing function
+        vectors = rasterio.features.shapes(
+            source=da.data.astype(dtype), transform=da.odc.transform, **rasterio_kwargs
+        )
 
-    # Convert polygon coordinates into polygon shapes
-    polygons = [shape(polygon) for polygon in polygons]
+        # Convert the generator into a list
+        vectors = list(vectors)
 
-    # Create a geopandas dataframe populated with the polygon shapes
-    attribute_name = attribute_col if attribute_col is not None else "attribute"
-    gdf = gpd.GeoDataFrame(
-        data={attribute_name: values}, geometry=polygons, crs=da.odc.crs
-    )
+        # Extract the polygon coordinates and values from the list
+        polygons = [polygon for polygon, value in vectors]
+        values = [value for polygon, value in vectors]
+
+        # Convert polygon coordinates into polygon shapes
+        polygons = [shape(polygon) for polygon in polygons]
+
+        # Create a geopandas dataframe populated with the polygon shapes
+        gdf = gpd.GeoDataFrame(
+            data={attribute_name: values}, geometry=polygons, crs=da.odc.crs
+        )
 
     # If a file path is supplied, export to file
     if output_path is not None:
         if verbose:
             print(f"Exporting vector data to {output_path}")
-        gdf.to_file(output_path)
+        if str(output_path).endswith(".parquet"):
+            gdf.to_parquet(output_path)
+        else:
+            gdf.to_file(output_path)
 
     return gdf
 
 
+def _rasterize_chunk(geoms, values, shape, transform, dtype, **rasterio_kwargs):
+    """
+    Rasterizes a subset of geometries (and optional values) into a
+    single chunk of a larger raster array.
+    """
+    if len(geoms) == 0:
+        return np.full(shape, rasterio_kwargs.get("fill", 0), dtype=dtype)
+
+    shapes = geoms if values is None else zip(geoms, values)
+    return rasterio.features.rasterize(
+        shapes=shapes,
+        out_shape=shape,
+        transform=transform,
+        dtype=dtype,
+        **rasterio_kwargs,
+    )
+
+
+def _rasterize_lazy(geoms, values, gbox, chunks, dtype, **rasterio_kwargs):
+    """
+    Creates a lazy dask array where each chunk rasterizes only the
+    geometries that intersect it, identified using a spatial index.
+    """
+    import dask.array as dsa
+    from shapely import STRtree, box
+
+    # Build spatial index, and calculate chunk extents on the output grid
+    tree = STRtree(geoms)
+    chunks = dsa.core.normalize_chunks(chunks, shape=gbox.shape, dtype=dtype)
+    row_offsets, col_offsets = [np.cumsum((0,) + c) for c in chunks]
+
+    blocks = []
+    for y0, y1 in zip(row_offsets[:-1], row_offsets[1:]):
+        row = []
+        for x0, x1 in zip(col_offsets[:-1], col_offsets[1:]):
+            # Select geometries intersecting the chunk
+            chunk_gbox = gbox[y0:y1, x0:x1]
+            idx = np.sort(tree.query(box(*chunk_gbox.boundingbox), "intersects"))
+
+            # Lazily rasterize selected geometries into the chunk
+            chunk = dask.delayed(_rasterize_chunk)(
+                geoms[idx],
+                None if values is None else values[idx],
+                chunk_gbox.shape,
+                chunk_gbox.transform,
+                dtype,
+                **rasterio_kwargs,
+            )
+            row.append(dsa.from_delayed(chunk, chunk_gbox.shape, dtype=dtype))
+        blocks.append(row)
+
+    return dsa.block(blocks)
+
+
 def xr_rasterize(
     gdf,
     da,
@@ -281,6 +434,7 @@ def xr_rasterize(
     name=None,
     output_path=None,
     verbose=True,
+    chunks=None,
     **rasterio_kwargs,
 ):
     """
@@ -311,6 +465,14 @@ def xr_rasterize(
         data as a GeoTIFF file.
     verbose : bool, optional
         Print debugging messages. Default True.
+    chunks : int, tuple or str, optional
+        An optional dask chunk size (e.g. ``(2048, 2048)`` or "auto").
+        If provided, a lazy dask-backed array will be returned, where
+        each chunk rasterizes only the geometries that intersect it
+        (identified using a spatial index). This allows large numbers
+        of features to be rasterized onto large grids in parallel
+        with bounded memory. Default is None, which rasterizes all
+        data into memory at once.
     **rasterio_kwargs :
         A set of keyword arguments to ``rasterio.features.rasterize``.
         Can include: 'all_touched', 'merge_alg', 'dtype'.
@@ -336,13 +498,34 @@ def xr_rasterize(
         # Use geometry directly (will produce a boolean numpy array)
         shapes = gdf_reproj.geometry
 
-    # Rasterise shapes into a numpy array
-    im = rasterio.features.rasterize(
-        shapes=shapes,
-        out_shape=da.odc.geobox.shape,
-        transform=da.odc.geobox.transform,
-        **rasterio_kwargs,
-    )
+    # Rasterise shapes into a lazy dask array, or a numpy array
+    if chunks is not None:
+        # Use the same output data type as `rasterio` would for all
+        # shapes, so that all chunks are consistent
+        dtype = rasterio_kwargs.pop("dtype", None)
+        if dtype is None and len(gdf_reproj.index) == 0:
+            dtype = "float64"
+        elif dtype is None and attribute_col is not None:
+            dtype = np.array(gdf_reproj[attribute_col]).dtype
+        elif dtype is None:
+            dtype = np.array(rasterio_kwargs.get("default_value", 1)).dtype
+
+        values = None if attribute_col is None else gdf_reproj[attribute_col]
+        im = _rasterize_lazy(
+            geoms=np.asarray(gdf_reproj.geometry),
+            values=None if values is None else np.asarray(values),
+            gbox=da.odc.geobox,
+            chunks=chunks,
+            dtype=np.dtype(dtype),
+            **rasterio_kwargs,
+        )
+    else:
+        im = rasterio.features.rasterize(
+            shapes=shapes,
+            out_shape=da.odc.geobox.shape,
+            transform=da.odc.geobox.transform,
+            **rasterio_kwargs,
+        )
 
     # Convert numpy array to a full xarray.DataArray
     # and set array name if supplied
@@ -358,6 +541,111 @@ def xr_rasterize(
     return da_rasterized
 
 
+def _find_contours(array, z_value, row_off=0, col_off=0):
+    """
+    Helper function to apply marching squares contour extraction
+    to an array, returning a list of (row, col) vertex arrays. Row
+    and column offsets can be used to return vertices relative to
+    a larger array that `array` was sliced from.
+    """
+
+    # Extracts contours from array. If the function returns a KeyError,
+    # this may be due to an unresolved issue in scikit-image:
+    # https://github.com/scikit-image/scikit-image/issues/4830
+    # A temporary workaround is to peturb the z-value by a tiny
+    # amount (1e-12) before using it to extract the contour.
+    array = np.asarray(array)
+    try:
+        contours = find_contours(array, z_value)
+    except KeyError:
+        contours = find_contours(array, z_value + 1e-12)
+
+    return [i + (row_off, col_off) for i in contours]
+
+
+def _stitch_contours(tile_contours):
+    """
+    Helper function to stitch contours extracted from overlapping
+    tiles into continuous lines. Neighbouring tiles share a row or
+    column of pixels along their seam, so contours crossing the seam
+    have matching end points and can be merged into a single line.
+    """
+    from shapely import get_coordinates, get_parts, line_merge, linestrings
+
+    contours = [i for contours in tile_contours for i in contours]
+    if len(contours) == 0:
+        return []
+
+    # Round vertices to remove tiny floating point differences between
+    # tiles, then merge lines that meet end to end. Contours from
+    # `find_contours` are consistently oriented, so merges are directed
+    coords = np.round(np.concatenate(contours), 9)
+    indices = np.repeat(np.arange(len(contours)), [len(i) for i in contours])
+    lines = linestrings(coords, indices=indices)
+    merged = line_merge(MultiLineString(list(lines)), directed=True)
+
+    return [get_coordinates(i) for i in get_parts(merged)]
+
+
+def _contours_to_multiline(contours, affine, min_vertices=2):
+    """
+    Helper function to convert a list of (row, col) contour vertex
+    arrays into a shapely MultiLineString in spatial coordinates,
+    using a vectorised affine transform. The `min_vertices`
+    parameter allows you to drop small contours with less than X
+    vertices.
+    """
+    from shapely import linestrings, multilinestrings
+
+    contours = [i for i in contours if i.shape[0] >= min_vertices]
+    if len(contours) == 0:
+        return MultiLineString()
+
+    # Convert array coords to spatial coords. We need to add 0.5 x pixel
+    # size to the x and y to obtain the centre point of our pixels,
+    # rather than the top-left corner
+    rows, cols = np.concatenate(contours).T
+    x = affine.a * cols + affine.b * rows + affine.xoff + affine.a / 2.0
+    y = affine.d * cols + affine.e * rows + affine.yoff + affine.e / 2.0
+
+    # Build all lines at once from their coordinate arrays, then output
+    # resulting lines into a single combined MultiLineString
+    indices = np.repeat(np.arange(len(contours)), [len(i) for i in contours])
+    return multilinestrings(linestrings(x, y, indices=indices))
+
+
+def _contours_delayed(array, z_value, affine, min_vertices=2, tile_size=None):
+    """
+    Helper function to build a `dask.delayed` task that extracts
+    contours from a two-dimensional array as a MultiLineString. If
+    `tile_size` is provided, contours are extracted from overlapping
+    tiles in parallel, then stitched together across tile seams.
+    """
+    from dask.array.core import normalize_chunks
+
+    if tile_size is None:
+        contours = dask.delayed(_find_contours)(array, z_value)
+
+    else:
+        # Tiles overlap their neighbours by a single row and column of
+        # pixels so that every pixel-to-pixel edge is processed once.
+        # A final tile containing only this overlap row or column is
+        # skipped, as it will already be covered by its neighbour.
+        chunks = normalize_chunks(tile_size, shape=array.shape)
+        row_offsets, col_offsets = [np.cumsum((0,) + c) for c in chunks]
+        tile_contours = [
+            dask.delayed(_find_contours)(
+                array[y0 : y1 + 1, x0 : x1 + 1], z_value, y0, x0
+            )
+            for y0, y1 in zip(row_offsets[:-1], row_offsets[1:])
+            for x0, x1 in zip(col_offsets[:-1], col_offsets[1:])
+            if (y0 < array.shape[0] - 1) and (x0 < array.shape[1] - 1)
+        ]
+        contours = dask.delayed(_stitch_contours)(tile_contours)
+
+    return dask.delayed(_contours_to_multiline)(contours, affine, min_vertices)
+
+
 def subpixel_contours(
     da,
     z_values=[0.0],
@@ -369,6 +657,7 @@ def subpixel_contours(
     time_format="%Y-%m-%d",
     errors="ignore",
     verbose=True,
+    tile_size=None,
 ):
     """
     Uses `skimage.measure.find_contours` to extract multiple z-value
@@ -378,12 +667,20 @@ def subpixel_contours(
     across time by extracting a 0 NDWI contour from each individual
     timestep in an xarray timeseries).
 
+    Contours for each z-value or array are extracted in parallel as
+    separate `dask.delayed` tasks; if `da` is a dask array, each array
+    is only loaded into memory when its contours are extracted. Tasks
+    are run using the active Dask scheduler. As contour extraction
+    holds Python's GIL, using processes (e.g. via an active Dask
+    distributed client, or ``dask.config.set(scheduler="processes")``)
+    will typically be faster than threads on multi-core machines.
+
     Contours are returned as a geopandas.GeoDataFrame with one row per
     z-value or one row per array along a specified dimension. The
     `attribute_df` parameter can be used to pass custom attributes
     to the output contour features.
 
-    Last modified: May 2023
+    Last modified: October 2026
 
     Parameters
     ----------
@@ -435,6 +732,14 @@ def subpixel_contours(
         be raised.
     verbose : bool, optional
         Print debugging messages. Default is True.
+    tile_size : int or tuple of ints, optional
+        An optional tile size in pixels used to extract contours from
+        very large arrays. If provided, contours are extracted from
+        each overlapping tile in parallel and then stitched together
+        across tile seams into continuous lines, so that only a
+        single tile needs to be loaded into memory at a time (if `da`
+        is a dask array). Defaults to None, which extracts contours
+        from each entire array at once.
 
     Returns
     -------
@@ -447,36 +752,6 @@ def subpixel_contours(
         attribute table.
     """
 
-    def _contours_to_multiline(da_i, z_value, min_vertices=2):
-        """
-        Helper function to apply marching squares contour extraction
-        to an array and return a data as a shapely MultiLineString.
-        The `min_vertices` parameter allows you to drop small contours
-        with less than X vertices.
-        """
-
-        # Extracts contours from array, and converts each discrete
-        # contour into a Shapely LineString feature. If the function
-        # returns a KeyError, this may be due to an unresolved issue in
-        # scikit-image: https://github.com/scikit-image/scikit-image/issues/4830
-        # A temporary workaround is to peturb the z-value by a tiny
-        # amount (1e-12) before using it to extract the contour.
-        try:
-            line_features = [
-                LineString(i[:, [1, 0]])
-                for i in find_contours(da_i.data, z_value)
-                if i.shape[0] >= min_vertices
-            ]
-        except KeyError:
-            line_features = [
-                LineString(i[:, [1, 0]])
-                for i in find_contours(da_i.data, z_value + 1e-12)
-                if i.shape[0] >= min_vertices
-            ]
-
-        # Output resulting lines into a single combined MultiLineString
-        return MultiLineString(line_features)
-
     def _time_format(i, time_format):
         """
         Converts numpy.datetime64 into formatted strings;
@@ -506,11 +781,9 @@ def subpixel_contours(
         else [z_values]
     )
 
-    # If dask collection, load into memory
-    if dask.is_dask_collection(da):
-        if verbose:
-            print(f"Loading data into memory using Dask")
-        da = da.compute()
+    # Contours are extracted for each z-value or array in parallel using
+    # `dask.delayed`
+    affine = da.odc.geobox.transform
 
     # Test number of dimensions in supplied data array
     if len(da.shape) == 2:
@@ -518,7 +791,9 @@ def subpixel_contours(
             print(f"Operating in multiple z-value, single array mode")
         dim = "z_value"
         contour_arrays = {
-            _time_format(i, time_format): _contours_to_multiline(da, i, min_vertices)
+            _time_format(i, time_format): _contours_delayed(
+                da.data, i, affine, min_vertices, tile_size
+            )
             for i in z_values
         }
 
@@ -534,12 +809,23 @@ def subpixel_contours(
             )
 
         contour_arrays = {
-            _time_format(i, time_format): _contours_to_multiline(
-                da_i.squeeze(), z_values[0], min_vertices
+            _time_format(i, time_format): _contours_delayed(
+                da_i.squeeze().data, z_values[0], affine, min_vertices, tile_size
             )
             for i, da_i in da.groupby(dim)
         }
 
+    # Run contour extraction in parallel. If `da` is a dask array,
+    # each array (or tile) is only loaded when its contours are extracted
+    if verbose:
+        print(f"Extracting contours from {len(contour_arrays)} arrays in parallel")
+    contour_arrays = dict(
+        zip(
+            contour_arrays.keys(),
+            dask.compute(*contour_arrays.values()),
+        )
+    )
+
     # If attributes are provided, add the contour keys to that dataframe
     if attribute_df is not None:
         try:
@@ -572,20 +858,6 @@ def subpixel_contours(
         data=attribute_df, geometry=list(contour_arrays.values()), crs=da.odc.crs
     )
 
-    # Define affine and use to convert array coords to geographic coords.
-    # We need to add 0.5 x pixel size to the x and y to obtain the centre
-    # point of our pixels, rather than the top-left corner
-    affine = da.odc.geobox.transform
-    shapely_affine = [
-        affine.a,
-        affine.b,
-        affine.d,
-        affine.e,
-        affine.xoff + affine.a / 2.0,
-        affine.yoff + affine.e / 2.0,
-    ]
-    contours_gdf["geometry"] = contours_gdf.affine_transform(shapely_affine)
-
     # Rename the data column to match the dimension
     contours_gdf = contours_gdf.rename({0: dim}, axis=1)
 
@@ -630,6 +902,307 @@ def subpixel_contours(
     return contours_gdf
 
 
+def _idw_tree(input_x, input_y, k):
+    """
+    Helper function to verify IDW parameters, and create a KDTree
+    from input point coordinates to efficiently find nearest neighbours.
+    """
+
+    # Verify k is smaller than total number of points, and non-zero
+    if k > len(input_x):
+        raise ValueError(
+            f"The requested number of nearest neighbours (`k={k}`) "
+            f"is smaller than the total number of points ({len(input_x)})."
+        )
+    elif k == 0:
+        raise ValueError(
+            f"Interpolation based on `k=0` nearest neighbours is not valid."
+        )
+
+    points_xy = np.column_stack((input_y, input_x))
+    return KDTree(points_xy)
+
+
+def _idw_weights(tree, output_x, output_y, p, k, max_dist, epsilon, dtype="float64"):
+    """
+    Helper function to find the `k` nearest neighbours to each output
+    point, and calculate normalised inverse distance weights for each.
+    Returns weights (NaN for invalid neighbours) and neighbour indices.
+    """
+
+    # Determine nearest neighbours and distances to each
+    grid_stacked = np.column_stack((output_y, output_x))
+    distances, indices = tree.query(grid_stacked, k=k, workers=-1)
+
+    # If k == 1, add an additional axis for consistency
+    if k == 1:
+        distances = distances[..., np.newaxis]
+        indices = indices[..., np.newaxis]
+
+    # Add small epsilon to distances to prevent division by zero errors
+    # if output coordinates are the same as input coordinates
+    distances = np.maximum(distances, epsilon)
+
+    # Set distances above max to NaN if specified
+    if max_dist is not None:
+        distances[distances > max_dist] = np.nan
+
+    # Calculate weights based on distance to k nearest neighbours. This
+    # is done in float64 to avoid small distances raised to high powers
+    # underflowing to zero, with only the normalised weights cast to
+    # the requested dtype
+    weights = 1 / np.power(distances, p)
+    weights = weights / np.nansum(weights, axis=1).reshape(-1, 1)
+
+    return weights.astype(dtype, copy=False), indices
+
+
+def _idw_sparse_weights(
+    tree, n_input, output_x, output_y, p, k, max_dist, k_min, epsilon, dtype
+):
+    """
+    Helper function to calculate IDW weights for a set of output points
+    as a sparse (n_output x n_input) matrix, along with a boolean array
+    identifying output points with less than `k_min` valid neighbours.
+    """
+    from scipy.sparse import csr_matrix
+
+    weights, indices = _idw_weights(
+        tree, output_x, output_y, p, k, max_dist, epsilon, dtype
+    )
+
+    # Store valid weights as a sparse matrix with one row per output
+    # point and one column per input point
+    valid = np.isfinite(weights)
+    rows = np.broadcast_to(np.arange(len(output_x))[:, np.newaxis], valid.shape)
+    sparse_weights = csr_matrix(
+        (weights[valid], (rows[valid], indices[valid])),
+        shape=(len(output_x), n_input),
+    )
+
+    # Identify any points with less than `k_min` valid weights
+    invalid = valid.sum(axis=1) < k_min
+
+    return sparse_weights, invalid
+
+
+def _idw_apply(sparse_weights, invalid, input_z):
+    """
+    Helper function to compute the IDW weighted sum of a 2D (points x
+    columns) array of input values (with any NaN values already
+    replaced with 0) for each output point, as a sparse matrix product.
+    """
+    interp_values = np.asarray(sparse_weights @ input_z)
+
+    # Set any points with less than `k_min` valid weights to NaN
+    interp_values[invalid] = np.nan
+
+    return interp_values
+
+
+def _idw_block(
+    tree, input_z, output_x, output_y, p, k, max_dist, k_min, epsilon, dtype
+):
+    """
+    Helper function to perform IDW interpolation for a single block of
+    output points, given a KDTree and a 2D (points x columns) array of
+    input values (with any NaN values already replaced with 0).
+    """
+    sparse_weights, invalid = _idw_sparse_weights(
+        tree, len(input_z), output_x, output_y, p, k, max_dist, k_min, epsilon, dtype
+    )
+    return _idw_apply(sparse_weights, invalid, input_z)
+
+
+def _idw_blocks(
+    tree, input_z, output_x, output_y, block_size=None, lazy=False, **idw_kwargs
+):
+    """
+    Helper function to perform IDW interpolation into output points
+    one block of `block_size` points at a time, either lazily using
+    Dask or into a pre-allocated output array. `input_z` must be a 2D
+    (points x columns) array with any NaN values replaced with 0.
+    """
+    from dask.array.core import normalize_chunks
+
+    # Split output points into blocks
+    dtype = idw_kwargs["dtype"]
+    n_out, n_cols = len(output_x), input_z.shape[1]
+    blocks = normalize_chunks(
+        "auto" if (block_size is None and lazy) else (block_size or max(n_out, 1)),
+        shape=(n_out,),
+        dtype=dtype,
+    )[0]
+    offsets = np.cumsum((0,) + blocks)
+
+    # Interpolate each block lazily using Dask...
+    if lazy:
+        import dask.array as dsa
+
+        tree, input_z = dask.delayed(tree), dask.delayed(input_z)
+        interp_values = dsa.concatenate(
+            [
+                dsa.from_delayed(
+                    dask.delayed(_idw_block)(
+                        tree,
+                        input_z,
+                        output_x[i0:i1],
+                        output_y[i0:i1],
+                        **idw_kwargs,
+                    ),
+                    shape=(i1 - i0, n_cols),
+                    dtype=dtype,
+                )
+                for i0, i1 in zip(offsets[:-1], offsets[1:])
+            ]
+        )
+
+    # ...or into a pre-allocated output array
+    else:
+        interp_values = np.empty((n_out, n_cols), dtype=dtype)
+        for i0, i1 in zip(offsets[:-1], offsets[1:]):
+            interp_values[i0:i1] = _idw_block(
+                tree, input_z, output_x[i0:i1], output_y[i0:i1], **idw_kwargs
+            )
+
+    return interp_values
+
+
+class IDWInterpolator:
+    """
+    Reusable Inverse Distance Weighting (IDW) interpolator.
+
+    Builds a KDTree from a set of input point coordinates, finds the
+    `k` nearest neighbours for each output point, and stores the
+    resulting inverse distance weights as a sparse (n_output x n_input)
+    matrix. Once created, the interpolator can be applied to any number
+    of value columns or timesteps for the same input and output points
+    as a fast sparse matrix product, without rebuilding the KDTree or
+    re-querying neighbours.
+
+    See `idw` for a description of the interpolation parameters.
+
+    Parameters
+    ----------
+    input_x : array-like
+        Array of x-coordinates of the input points.
+    input_y : array-like
+        Array of y-coordinates of the input points.
+    output_x : array-like
+        Array of x-coordinates where the interpolation is to be computed.
+    output_y : array-like
+        Array of y-coordinates where the interpolation is to be computed.
+    p : int or float, optional
+        Power function parameter defining how rapidly weightings should
+        decrease as distance increases. Defaults to 1.
+    k : int, optional
+        Number of nearest neighbors to use for interpolation. Defaults
+        to 10.
+    max_dist : int or float, optional
+        Restrict neighbouring points to less than this distance.
+        By default, no distance limit is applied.
+    k_min : int, optional
+        If `max_dist` is provided, set any points with less than
+        `k_min` neighbours to NaN. Defaults to 1.
+    epsilon : float, optional
+        Small value added to distances to prevent division by zero
+        errors. Defaults to 1e-12.
+
+    Examples
+    --------
+    >>> interpolator = IDWInterpolator(
+    ...     input_x=[0, 1, 2, 3, 4],
+    ...     input_y=[0, 1, 2, 3, 4],
+    ...     output_x=[0.5, 1.5, 2.5],
+    ...     output_y=[0.5, 1.5, 2.5],
+    ...     k=2,
+    ... )
+    >>> interpolator([1, 2, 3, 4, 5])
+    array([1.5, 2.5, 3.5])
+    >>> interpolator([[1, 10], [2, 20], [3, 30], [4, 40], [5, 50]])
+    array([[ 1.5, 15. ],
+           [ 2.5, 25. ],
+           [ 3.5, 35. ]])
+
+    """
+
+    def __init__(
+        self,
+        input_x,
+        input_y,
+        output_x,
+        output_y,
+        p=1,
+        k=10,
+        max_dist=None,
+        k_min=1,
+        epsilon=1e-12,
+    ):
+        # Convert to numpy arrays
+        input_x = np.atleast_1d(input_x)
+        input_y = np.atleast_1d(input_y)
+        output_x = np.atleast_1d(output_x)
+        output_y = np.atleast_1d(output_y)
+
+        # Verify input and outputs have matching lengths
+        if not (len(input_x) == len(input_y)):
+            raise ValueError(f"Both `input_x` and `input_y` must be the same length.")
+        if not (len(output_x) == len(output_y)):
+            raise ValueError(f"Both `output_x` and `output_y` must be the same length.")
+
+        # Create KDTree, then find nearest neighbours and store weights
+        # as a sparse matrix (using the same weights as `idw`)
+        self.tree = _idw_tree(input_x, input_y, k)
+        self.weights, self.invalid = _idw_sparse_weights(
+            self.tree,
+            len(input_x),
+            output_x,
+            output_y,
+            p=p,
+            k=k,
+            max_dist=max_dist,
+            k_min=k_min,
+            epsilon=epsilon,
+            dtype="float64",
+        )
+
+    def __call__(self, input_z):
+        """
+        Interpolate values at the input points into the output points.
+
+        Parameters
+        ----------
+        input_z : array-like
+            Array of values at the input points. This can be either a
+            1-dimensional array, or a multi-dimensional array where the
+            first axis matches the input points, and each other element
+            (e.g. columns or timesteps) represents a different set of
+            values to be interpolated.
+
+        Returns
+        -------
+        interp_values : numpy.ndarray
+            Interpolated values at the output coordinates, with the
+            first axis matching the output points.
+        """
+
+        input_z = np.atleast_1d(input_z)
+        if input_z.shape[0] != self.weights.shape[1]:
+            raise ValueError(
+                f"The first axis of `input_z` ({input_z.shape[0]}) must "
+                f"match the number of input points ({self.weights.shape[1]})."
+            )
+
+        # Compute weighted sum of input_z values for each output point,
+        # ignoring NaN input values. Multi-dimensional inputs are
+        # flattened into columns so every set of values is computed in
+        # a single sparse matrix product
+        values = np.nan_to_num(input_z.reshape(input_z.shape[0], -1), nan=0.0)
+        interp_values = _idw_apply(self.weights, self.invalid, values)
+
+        return interp_values.reshape((self.weights.shape[0],) + input_z.shape[1:])
+
+
 def idw(
     input_z,
     input_x,
@@ -641,6 +1214,9 @@ def idw(
     max_dist=None,
     k_min=1,
     epsilon=1e-12,
+    block_size=None,
+    dtype="float64",
+    lazy=False,
 ):
     """
     Perform Inverse Distance Weighting (IDW) interpolation.
@@ -651,6 +1227,10 @@ def idw(
     inverse distance to each neighbor, with weights descreasing with
     increasing distance.
 
+    To repeatedly interpolate different values between the same input
+    and output points (e.g. multiple timesteps), use `IDWInterpolator`
+    to avoid recalculating nearest neighbours and weights each time.
+
     Code inspired by: https://github.com/DahnJ/REM-xarray
 
     Parameters
@@ -687,10 +1267,25 @@ def idw(
         Small value added to distances to prevent division by zero
         errors in the case that output coordinates are identical to
         input coordinates. Defaults to 1e-12.
+    block_size : int, optional
+        The number of output points to interpolate at a time. Nearest
+        neighbours, distances and weights are calculated for each block
+        of output points separately, limiting peak memory use when
+        interpolating into very large numbers of output points (e.g.
+        large pixel grids). Defaults to None, which interpolates all
+        output points at once (or uses an automatic block size if
+        `lazy=True`).
+    dtype : str, optional
+        The data type used to calculate weights and interpolated
+        values. Use "float32" to halve memory use for large outputs.
+        Defaults to "float64".
+    lazy : bool, optional
+        Whether to return a lazy dask array, with one chunk for each
+        block of output points. Defaults to False.
 
     Returns
     -------
-    interp_values : numpy.ndarray
+    interp_values : numpy.ndarray or dask.array.Array
         Interpolated values at the output coordinates. If `input_z` is
         1-dimensional, `interp_values` will also be 1-dimensional. If
         `input_z` is 2-dimensional, `interp_values` will have the same
@@ -724,58 +1319,172 @@ def idw(
     if not (len(output_x) == len(output_y)):
         raise ValueError(f"Both `output_x` and `output_y` must be the same length.")
 
-    # Verify k is smaller than total number of points, and non-zero
-    if k > input_z.shape[0]:
-        raise ValueError(
-            f"The requested number of nearest neighbours (`k={k}`) "
-            f"is smaller than the total number of points ({input_z.shape[0]})."
-        )
-    elif k == 0:
+    # Create KDTree to efficiently find nearest neighbours
+    tree = _idw_tree(input_x, input_y, k)
+
+    # Flatten values into columns, and ignore NaN input values by
+    # setting them to 0 so they do not contribute to weighted sums
+    out_shape = input_z.shape[1:]
+    input_z = input_z.reshape(input_z.shape[0], -1).astype(dtype)
+    input_z[np.isnan(input_z)] = 0
+
+    # Interpolate values into output points, one block at a time
+    interp_values = _idw_blocks(
+        tree,
+        input_z,
+        output_x,
+        output_y,
+        block_size=block_size,
+        lazy=lazy,
+        p=p,
+        k=k,
+        max_dist=max_dist,
+        k_min=k_min,
+        epsilon=epsilon,
+        dtype=dtype,
+    )
+
+    # Restore original shape of input values
+    return interp_values.reshape((len(output_x),) + out_shape)
+
+
+def _rbf_local(points, values, k=10, **kwargs):
+    """
+    Helper function to create a neighbourhood-limited Radial Basis
+    Function interpolator, where each output point is interpolated using
+    an RBF fitted to only its `k` nearest input points. This keeps the
+    size of each RBF system small, regardless of the total number of
+    input points, and gives results that do not depend on how output
+    points are split into blocks or chunks.
+    """
+
+    # Minimum polynomial degree required by each RBF kernel (see
+    # `scipy.interpolate.RBFInterpolator`). Kernels not listed here do
+    # not require a polynomial term
+    kernel_degrees = {"linear": 0, "thin_plate_spline": 1, "cubic": 1, "quintic": 2}
+    kernel = kwargs.get("kernel", "thin_plate_spline")
+    degree = kwargs.get("degree", kernel_degrees.get(kernel, -1))
+
+    # Verify enough neighbours are used to fit the polynomial term of
+    # the kernel (e.g. 3 points for a 2D degree 1 polynomial)
+    k = min(k, len(points))
+    min_points = (degree + 1) * (degree + 2) // 2
+    if k < min_points:
         raise ValueError(
-            f"Interpolation based on `k=0` nearest neighbours is not valid."
+            f"The '{kernel}' RBF kernel requires at least {min_points} "
+            f"neighbouring points, but only {k} are available. Increase "
+            f"`k` or provide more points."
         )
 
-    # Create KDTree to efficiently find nearest neighbours
-    points_xy = np.column_stack((input_y, input_x))
-    tree = KDTree(points_xy)
+    return scipy.interpolate.RBFInterpolator(points, values, neighbors=k, **kwargs)
 
-    # Determine nearest neighbours and distances to each
-    grid_stacked = np.column_stack((output_y, output_x))
-    distances, indices = tree.query(grid_stacked, k=k, workers=-1)
 
-    # If k == 1, add an additional axis for consistency
-    if k == 1:
-        distances = distances[..., np.newaxis]
-        indices = indices[..., np.newaxis]
+def _grid_interpolator(method, points, values, k=10, **kwargs):
+    """
+    Helper function to prepare interpolation of a 2D (points x columns)
+    array of `values` at (y, x) `points` into grids of output pixels.
+    Any expensive setup (Delaunay triangulation, KDTree or RBF fitting)
+    is performed once, and shared by every grid interpolated using the
+    returned function. The returned function takes 2D `grid_y` and
+    `grid_x` coordinate arrays, and returns a 3D (y, x, columns) array.
+    """
 
-    # Add small epsilon to distances to prevent division by zero errors
-    # if output coordinates are the same as input coordinates
-    distances = np.maximum(distances, epsilon)
+    # Apply scipy.interpolate.griddata interpolation methods, using the
+    # same interpolator classes as `griddata` so that the triangulation
+    # of the input points is only calculated once
+    if method in ("linear", "nearest", "cubic"):
+        if method == "linear":
+            interpolator = scipy.interpolate.LinearNDInterpolator(
+                points, values, **kwargs
+            )
+        elif method == "cubic":
+            interpolator = scipy.interpolate.CloughTocher2DInterpolator(
+                points, values, **kwargs
+            )
+        else:
+            kwargs.pop("fill_value", None)
+            interpolator = scipy.interpolate.NearestNDInterpolator(
+                points, values, **kwargs
+            )
 
-    # Set distances above max to NaN if specified
-    if max_dist is not None:
-        distances[distances > max_dist] = np.nan
+        def interp_func(grid_y, grid_x):
+            return interpolator((grid_y, grid_x))
 
-    # Calculate weights based on distance to k nearest neighbours.
-    weights = 1 / np.power(distances, p)
-    weights = weights / np.nansum(weights, axis=1).reshape(-1, 1)
+    # Apply Inverse Distance Weighted interpolation, using a single
+    # KDTree to find nearest neighbours for all grids and columns
+    elif method == "idw":
+        idw_kwargs = dict(
+            p=1, max_dist=None, k_min=1, epsilon=1e-12, block_size=None, dtype="float64"
+        )
+        idw_kwargs.update(kwargs, k=k)
+        tree = _idw_tree(points[:, 1], points[:, 0], k)
+        values = values.astype(idw_kwargs["dtype"])
+        values[np.isnan(values)] = 0
+
+        def interp_func(grid_y, grid_x):
+            interp_values = _idw_blocks(
+                tree, values, grid_x.ravel(), grid_y.ravel(), **idw_kwargs
+            )
+            return interp_values.reshape(grid_y.shape + (-1,))
+
+    # Apply Radial Basis Function interpolation, fitting an RBF for
+    # each column once
+    elif method == "rbf":
+        rbfs = [
+            scipy.interpolate.Rbf(points[:, 0], points[:, 1], z_values, **kwargs)
+            for z_values in values.T
+        ]
 
-    # 1D case: Compute weighted sum of input_z values for each output point
-    if input_z.ndim == 1:
-        interp_values = np.nansum(weights * input_z[indices], axis=1)
+        def interp_func(grid_y, grid_x):
+            return np.stack([rbf(grid_y, grid_x) for rbf in rbfs], axis=-1)
+
+    # Apply neighbourhood-limited Radial Basis Function interpolation,
+    # interpolating all columns at once using a single KDTree
+    elif method == "rbf_local":
+        rbf = _rbf_local(points, values, k=k, **kwargs)
+
+        def interp_func(grid_y, grid_x):
+            xi = np.column_stack((grid_y.ravel(), grid_x.ravel()))
+            return rbf(xi).reshape(grid_y.shape + (-1,))
 
-    # 2D case: Compute weighted sum for each set of input_z values
-    # weights[..., np.newaxis] adds a dimension for broadcasting
     else:
-        interp_values = np.nansum(
-            weights[..., np.newaxis] * input_z[indices],
-            axis=1,
+        raise ValueError(
+            f"Unsupported interpolation method '{method}'; supported methods "
+            "are 'linear', 'nearest', 'cubic', 'rbf', 'rbf_local' and 'idw'."
         )
 
-    # Set any points with less than `k_min` valid weights to NaN
-    interp_values[np.isfinite(weights).sum(axis=1) < k_min] = np.nan
+    return interp_func
 
-    return interp_values
+
+def _interpolate_grid(interp_func, y_coords, y_grid_coords, x_coords, x_grid_coords):
+    """
+    Helper function to interpolate into the grid of pixels defined by
+    1D `y_grid_coords` and `x_grid_coords` using a function returned by
+    `_grid_interpolator`. If these differ from `y_coords` and `x_coords`
+    (e.g. a subsampled grid), the output is linearly resampled to match
+    `y_coords` and `x_coords`.
+    """
+
+    # Create grid and interpolate into it
+    grid_x, grid_y = np.meshgrid(x_grid_coords, y_grid_coords)
+    interp_3d = interp_func(grid_y, grid_x)
+
+    # Resample subsampled grid back to original coordinates
+    if not (
+        np.array_equal(y_coords, y_grid_coords)
+        and np.array_equal(x_coords, x_grid_coords)
+    ):
+        interp_3d = (
+            xr.DataArray(
+                interp_3d,
+                dims=("y", "x", "column"),
+                coords={"y": y_grid_coords, "x": x_grid_coords},
+            )
+            .interp(y=y_coords, x=x_coords)
+            .values.astype(interp_3d.dtype, copy=False)
+        )
+
+    return interp_3d
 
 
 def xr_interpolate(
@@ -786,6 +1495,7 @@ def xr_interpolate(
     factor=1,
     k=10,
     crs=None,
+    dask_chunks=None,
     **kwargs,
 ):
     """
@@ -797,11 +1507,13 @@ def xr_interpolate(
 
     Supported interpolation methods include "linear", "nearest" and
     "cubic" (using `scipy.interpolate.griddata`), "rbf" (using
-    `scipy.interpolate.Rbf`), and "idw" (Inverse Distance Weighted
-    interpolation using `k` nearest neighbours). Each numeric column
-    will be returned as a variable in the output xarray.Dataset.
+    `scipy.interpolate.Rbf`), "rbf_local" (scalable Radial Basis
+    Function interpolation using `k` nearest neighbours), and "idw"
+    (Inverse Distance Weighted interpolation using `k` nearest
+    neighbours). Each numeric column will be returned as a variable in
+    the output xarray.Dataset.
 
-    Last modified: March 2024
+    Last modified: October 2026
 
     Parameters
     ----------
@@ -821,9 +1533,14 @@ def xr_interpolate(
         The method used to interpolate between point values. This string
         is either passed to `scipy.interpolate.griddata` (for "linear",
         "nearest" and "cubic" methods), or used to specify Radial Basis
-        Function interpolation using `scipy.interpolate.Rbf` ("rbf"), or
-        Inverse Distance Weighted interpolation ("idw").
-        Defaults to 'linear'.
+        Function interpolation using `scipy.interpolate.Rbf` ("rbf"),
+        neighbourhood-limited Radial Basis Function interpolation using
+        `scipy.interpolate.RBFInterpolator` ("rbf_local"), or Inverse
+        Distance Weighted interpolation ("idw"). "rbf" scales poorly
+        to more than a few thousand points; "rbf_local" interpolates
+        each pixel using an RBF fitted to only its `k` nearest points,
+        and is suitable for very large point datasets. Defaults to
+        'linear'.
     factor : int, optional
         An optional integer that can be used to subsample the spatial
         interpolation extent to obtain faster interpolation times, before
@@ -834,23 +1551,37 @@ def xr_interpolate(
         resolution, but will potentially produce less accurate results.
     k : int, optional
         The number of nearest neighbours used to calculate weightings if
-        `method` is "idw". Defaults to 10; setting `k=1` is equivalent to
-        "nearest" interpolation.
+        `method` is "idw", or to fit each local RBF if `method` is
+        "rbf_local" (this must be at least the number of points
+        required by the RBF kernel, e.g. 3 for the default
+        "thin_plate_spline" kernel). Defaults to 10; setting `k=1` is
+        equivalent to "nearest" interpolation if `method` is "idw".
     crs : string or CRS object, optional
         If `ds`'s coordinate reference system (CRS) cannot be determined,
         provide a CRS using this parameter (e.g. 'EPSG:3577').
+    dask_chunks : dict, optional
+        An optional dictionary of chunk sizes for the spatial dimensions
+        of the output (e.g. `{'x': 2048, 'y': 2048}`). If provided, or
+        if `ds` is already a Dask-backed array, the interpolated outputs
+        will be returned as lazy Dask arrays, with each chunk of pixels
+        interpolated independently when computed (re-using the same
+        triangulation, KDTree or RBF fit for every chunk). By default,
+        the chunks of `ds` are used if it is Dask-backed; otherwise
+        outputs are interpolated immediately into in-memory arrays.
     **kwargs :
         Optional keyword arguments to pass to either
         `scipy.interpolate.griddata` (if `method` is "linear", "nearest"
         or "cubic"), `scipy.interpolate.Rbf` (is `method` is "rbf"),
-        or `idw` (if method is "idw").
+        `scipy.interpolate.RBFInterpolator` (if `method` is "rbf_local";
+        e.g. `kernel` or `smoothing`), or `idw` (if method is "idw").
 
     Returns
     -------
     interpolated_ds : xarray.Dataset
         An xarray.Dataset containing interpolated data with the same X
         and Y coordinate pixel grid as `ds`, and a data variable for
-        each numeric column in `gdf`.
+        each numeric column in `gdf`. Data variables will be lazy Dask
+        arrays if `dask_chunks` is provided or `ds` is Dask-backed.
     """
 
     # Add GeoBox and odc.* accessor to array using `odc-geo`, and identify
@@ -885,9 +1616,18 @@ def xr_interpolate(
         )
 
     # Identify spatial coordinates, and stack to use in interpolation
-    x_coords = gdf.geometry.x
-    y_coords = gdf.geometry.y
-    points_xy = np.column_stack((y_coords, x_coords))
+    points_xy = np.column_stack((gdf.geometry.y, gdf.geometry.x))
+
+    # Prepare interpolation of all columns together, so that any
+    # triangulation, nearest neighbour index or RBF fit is calculated
+    # only once rather than once per column or chunk
+    interp_func = _grid_interpolator(
+        method=method,
+        points=points_xy,
+        values=numeric_gdf.to_numpy(dtype="float64"),
+        k=k,
+        **kwargs,
+    )
 
     # Identify x and y coordinates from `ds` to interpolate into.
     # If `factor` is greater than 1, the coordinates will be subsampled
@@ -895,71 +1635,80 @@ def xr_interpolate(
     # grid aren't the same as the last x or y values in the original
     # full resolution grid, add the final full resolution grid value to
     # ensure data is interpolated up to the very edge of the array
-    if ds[x_dim][::factor][-1].item() == ds[x_dim][-1].item():
-        x_grid_coords = ds[x_dim][::factor].values
-    else:
-        x_grid_coords = ds[x_dim][::factor].values.tolist() + [ds[x_dim][-1].item()]
+    y_coords = ds[y_dim].values
+    x_coords = ds[x_dim].values
+    y_grid_index = np.union1d(np.arange(0, len(y_coords), factor), len(y_coords) - 1)
+    x_grid_index = np.union1d(np.arange(0, len(x_coords), factor), len(x_coords) - 1)
+
+    # If `ds` is Dask-backed or `dask_chunks` is provided, interpolate
+    # each chunk of the output grid lazily as a separate Dask task...
+    if dask_chunks is not None or ds.chunksizes:
+        from dask.array.core import normalize_chunks
+        import dask.array as dsa
+
+        dtype = np.dtype(
+            kwargs.get("dtype", "float64") if method == "idw" else "float64"
+        )
+        dask_chunks = ds.chunksizes if dask_chunks is None else dask_chunks
+        y_chunks, x_chunks = normalize_chunks(
+            (dask_chunks.get(y_dim, -1), dask_chunks.get(x_dim, -1)),
+            shape=(len(y_coords), len(x_coords)),
+            dtype=dtype,
+        )
+        y_offsets = np.cumsum((0,) + y_chunks)
+        x_offsets = np.cumsum((0,) + x_chunks)
+
+        # Select the subsampled grid coordinates that cover each chunk
+        # (plus one extra on each side if subsampling), so that chunks
+        # are resampled using the same grid cells as unchunked outputs
+        pad = int(factor > 1)
+
+        def _chunk_grid_coords(coords, grid_index, i0, i1):
+            lower = np.searchsorted(grid_index, i0, side="right") - 1 - pad
+            upper = np.searchsorted(grid_index, i1 - 1) + 1 + pad
+            return coords[i0:i1], coords[grid_index[max(lower, 0) : upper]]
+
+        interp_func = dask.delayed(interp_func)
+        interp_3d = dsa.block(
+            [
+                [
+                    [
+                        dsa.from_delayed(
+                            dask.delayed(_interpolate_grid)(
+                                interp_func,
+                                *_chunk_grid_coords(y_coords, y_grid_index, y0, y1),
+                                *_chunk_grid_coords(x_coords, x_grid_index, x0, x1),
+                            ),
+                            shape=(y1 - y0, x1 - x0, len(numeric_gdf.columns)),
+                            dtype=dtype,
+                        )
+                    ]
+                    for x0, x1 in zip(x_offsets[:-1], x_offsets[1:])
+                ]
+                for y0, y1 in zip(y_offsets[:-1], y_offsets[1:])
+            ]
+        )
 
-    if ds[y_dim][::factor][-1].item() == ds[y_dim][-1].item():
-        y_grid_coords = ds[y_dim][::factor].values
+    # ...or interpolate the entire grid immediately
     else:
-        y_grid_coords = ds[y_dim][::factor].values.tolist() + [ds[y_dim][-1].item()]
-
-    # Create grid to interpolate into
-    grid_x, grid_y = np.meshgrid(x_grid_coords, y_grid_coords)
-
-    # Output dict
-    correlation_outputs = {}
-
-    # Run interpolation on values from each numeric column,
-    for col, z_values in numeric_gdf.items():
-
-        # Apply scipy.interpolate.griddata interpolation methods
-        if method in ("linear", "nearest", "cubic"):
-            # Interpolate x, y and z values
-            interp_2d = scipy.interpolate.griddata(
-                points=points_xy,
-                values=z_values,
-                xi=(grid_y, grid_x),
-                method=method,
-                **kwargs,
-            )
-
-        # Apply Radial Basis Function interpolation
-        elif method == "rbf":
-            # Interpolate x, y and z values
-            rbf = scipy.interpolate.Rbf(y_coords, x_coords, z_values, **kwargs)
-            interp_2d = rbf(grid_y, grid_x)
-
-        # Apply Inverse Distance Weighted interpolation
-        elif method == "idw":
-            # Interpolate x, y and z values
-            interp_1d = idw(
-                input_z=z_values,
-                input_x=x_coords,
-                input_y=y_coords,
-                output_x=grid_x.flatten(),
-                output_y=grid_y.flatten(),
-                k=k,
-                **kwargs,
-            )
-
-            # Reshape to 2D
-            interp_2d = interp_1d.reshape(len(y_grid_coords), len(x_grid_coords))
-
-        # Add 2D interpolated array to output dictionary
-        correlation_outputs[col] = ((y_dim, x_dim), interp_2d)
+        interp_3d = _interpolate_grid(
+            interp_func,
+            y_coords,
+            y_coords[y_grid_index],
+            x_coords,
+            x_coords[x_grid_index],
+        )
 
-    # Combine all outputs into a single xr.Dataset
+    # Combine interpolated outputs for each numeric column into a
+    # single xr.Dataset
     interpolated_ds = xr.Dataset(
-        correlation_outputs, coords={y_dim: y_grid_coords, x_dim: x_grid_coords}
+        {
+            col: ((y_dim, x_dim), interp_3d[..., i])
+            for i, col in enumerate(numeric_gdf.columns)
+        },
+        coords={y_dim: y_coords, x_dim: x_coords},
     )
 
-    # If factor is greater than 1, resample the interpolated array to
-    # match the input `ds` array
-    if factor > 1:
-        interpolated_ds = interpolated_ds.interp_like(ds)
-
     # Ensure CRS is correctly set on output
     interpolated_ds = interpolated_ds.odc.assign_crs(crs=ds.odc.crs)
 
@@ -1197,12 +1946,350 @@ def transform_geojson_wgs_to_epsg(geojson, EPSG):
     return gg.__geo_interface__
 
 
+def _zonal_valid(values, zones, nodata=None):
+    """
+    Helper function to select valid (non-nodata, non-NaN) raster
+    `values` inside rasterized `zones` (with 0 indicating pixels
+    outside all zones), returning flattened values and zone IDs.
+    """
+    values, zones = values.ravel(), zones.ravel()
+    valid = zones > 0
+    if np.issubdtype(values.dtype, np.floating):
+        valid &= ~np.isnan(values)
+    if nodata is not None and not np.isnan(nodata):
+        valid &= values != nodata
+    return values[valid].astype("float64"), zones[valid]
+
+
+def _zonal_block(values, zones, n_zones, nodata=None):
+    """
+    Helper function to calculate partial zonal statistics for a single
+    block of raster `values` and rasterized `zones`. Statistics are
+    calculated using grouped `np.bincount` reductions, and are returned
+    only for the zones that are present in the block.
+    """
+
+    values, zones = _zonal_valid(values, zones, nodata)
+
+    # Calculate pixel count, sum, sum of squared deviations from the
+    # mean, minimum and maximum for each zone
+    counts = np.bincount(zones, minlength=n_zones + 1)
+    sums = np.bincount(zones, weights=values, minlength=n_zones + 1)
+    means = sums / np.maximum(counts, 1)
+    m2 = np.bincount(zones, weights=(values - means[zones]) ** 2, minlength=n_zones + 1)
+    mins = np.full(n_zones + 1, np.inf)
+    maxs = np.full(n_zones + 1, -np.inf)
+    np.minimum.at(mins, zones, values)
+    np.maximum.at(maxs, zones, values)
+
+    # Return statistics for zones present in the block
+    ids = np.flatnonzero(counts)
+    return ids, counts[ids], sums[ids], m2[ids], mins[ids], maxs[ids]
+
+
+def _zonal_bins(values, zones, nodata, mins, maxs, n_bins):
+    """
+    Helper function to assign each valid pixel in a block to one of
+    `n_bins` equal width bins between its zone's minimum and maximum
+    value, returning a unique integer key for each zone and bin
+    combination along with the pixel values.
+    """
+    values, zones = _zonal_valid(values, zones, nodata)
+    value_range = maxs[zones] - mins[zones]
+    bins = (values - mins[zones]) / np.where(value_range > 0, value_range, 1)
+    bins = np.clip((bins * n_bins).astype("int64"), 0, n_bins - 1)
+    return zones.astype("int64") * n_bins + bins, values
+
+
+def _zonal_histogram(values, zones, nodata, mins, maxs, n_bins):
+    """
+    Helper function to calculate a sparse histogram of pixel counts
+    per zone and bin for a single block (see `_zonal_bins`).
+    """
+    keys, _ = _zonal_bins(values, zones, nodata, mins, maxs, n_bins)
+    return np.unique(keys, return_counts=True)
+
+
+def _zonal_select(values, zones, nodata, mins, maxs, n_bins, target_keys):
+    """
+    Helper function to return the keys and values of pixels in a
+    single block that fall within a set of zone and bin combinations
+    (see `_zonal_bins`).
+    """
+    keys, values = _zonal_bins(values, zones, nodata, mins, maxs, n_bins)
+    selected = np.isin(keys, target_keys)
+    return keys[selected], values[selected]
+
+
+def _zonal_map(func, da, zones, *args):
+    """
+    Helper function to apply `func` to each pair of blocks from `da`
+    and rasterized `zones` (in parallel if `da` is Dask-backed),
+    returning a list of outputs for each block.
+    """
+    if da.chunks is not None:
+        return dask.compute(
+            *[
+                dask.delayed(func)(values_block, zones_block, *args)
+                for values_block, zones_block in zip(
+                    da.data.to_delayed().ravel(), zones.data.to_delayed().ravel()
+                )
+            ]
+        )
+    else:
+        return [func(da.values, zones.values, *args)]
+
+
+def _zonal_percentiles(
+    da, zones, nodata, count, minimum, maximum, percentiles, n_bins=1024
+):
+    """
+    Helper function to calculate exact percentiles of `da` for each
+    zone using linear interpolation (as in `np.percentile`), without
+    collecting every valid pixel in memory.
+
+    Pixels are first counted into `n_bins` equal width bins between
+    each zone's minimum and maximum value. This identifies the bins
+    containing the pixels either side of each percentile, and the rank
+    of these pixels within their bin. Only pixels in these bins are
+    then collected and sorted to obtain exact percentile values.
+    """
+
+    # Combine sparse histograms from each block, and calculate the
+    # cumulative pixel count across all zones and bins
+    mins, maxs = np.nan_to_num(minimum), np.nan_to_num(maximum)
+    histograms = _zonal_map(_zonal_histogram, da, zones, nodata, mins, maxs, n_bins)
+    keys, inverse = np.unique(
+        np.concatenate([keys for keys, _ in histograms]), return_inverse=True
+    )
+    bin_counts = np.bincount(
+        inverse, weights=np.concatenate([counts for _, counts in histograms])
+    ).astype("int64")
+    cumulative = np.cumsum(bin_counts)
+
+    # Identify the overall rank of the pixels either side of each
+    # percentile, then the bin they fall in and their rank in the bin
+    valid = np.flatnonzero(count > 0)
+    zone_counts = count[valid].astype("int64")
+    zone_starts = (np.cumsum(count) - count)[valid].astype("int64")
+    positions, ranks = {}, {}
+    for q in percentiles:
+        positions[q] = (zone_counts - 1) * q / 100
+        lower = np.floor(positions[q]).astype("int64")
+        upper = np.minimum(lower + 1, zone_counts - 1)
+        ranks[q] = (zone_starts + lower, zone_starts + upper)
+    all_ranks = np.concatenate([r for rank in ranks.values() for r in rank])
+    bin_index = np.searchsorted(cumulative, all_ranks, side="right")
+    target_keys = np.unique(keys[bin_index])
+
+    # Collect and sort only the pixels within the identified bins
+    selected = _zonal_map(
+        _zonal_select, da, zones, nodata, mins, maxs, n_bins, target_keys
+    )
+    pixel_keys = np.concatenate([keys for keys, _ in selected])
+    pixel_values = np.concatenate([values for _, values in selected])
+    order = np.lexsort((pixel_values, pixel_keys))
+    pixel_keys, pixel_values = pixel_keys[order], pixel_values[order]
+
+    def _rank_values(rank):
+        # Look up the value at a given overall rank
+        index = np.searchsorted(cumulative, rank, side="right")
+        rank_in_bin = rank - (cumulative[index] - bin_counts[index])
+        bin_start = np.searchsorted(pixel_keys, keys[index], side="left")
+        return pixel_values[bin_start + rank_in_bin]
+
+    # Interpolate between values either side of each percentile
+    output = {}
+    for q in percentiles:
+        lower_rank, upper_rank = ranks[q]
+        lower_values = _rank_values(lower_rank)
+        upper_values = _rank_values(upper_rank)
+        fraction = positions[q] - np.floor(positions[q])
+        output[q] = np.full(len(count), np.nan)
+        output[q][valid] = lower_values + fraction * (upper_values - lower_values)
+
+    return output
+
+
+def xr_zonal_stats(
+    da,
+    gdf,
+    stats=("count", "min", "max", "mean"),
+    nodata=None,
+    crs=None,
+    **rasterio_kwargs,
+):
+    """
+    Calculates zonal statistics of a raster ``xarray.DataArray`` for
+    each polygon in a ``geopandas.GeoDataFrame``.
+
+    Rather than reading and masking the raster separately for each
+    polygon, polygons are rasterized once onto the raster's pixel grid
+    as integer zone IDs. Statistics for every zone are then calculated
+    in a single pass over the raster using grouped ``np.bincount``
+    reductions. If ``da`` is Dask-backed, zones are rasterized lazily,
+    and statistics are calculated in parallel for each chunk before
+    being combined. This is significantly faster than per-polygon
+    approaches (e.g. ``zonal_stats_parallel``) for large numbers of
+    polygons.
+
+    Percentiles (including "median") are calculated exactly, but
+    without loading every valid pixel into memory at once: pixels are
+    first counted into histogram bins for each zone, and only the
+    pixels in the bins containing each percentile are then collected
+    and sorted. This requires two additional passes over ``da``, so if
+    ``da`` is expensive to compute, consider calling ``da.persist()``
+    first.
+
+    Pixels are assigned to polygons based on their centres (or using
+    any pixel they touch if ``all_touched=True``). Each pixel can only
+    be assigned to a single zone: where polygons overlap, pixels are
+    assigned to the polygon that appears last in ``gdf``.
+
+    Parameters
+    ----------
+    da : xarray.DataArray
+        A two-dimensional array of raster values to summarise.
+    gdf : geopandas.GeoDataFrame
+        A ``geopandas.GeoDataFrame`` containing polygons over which
+        zonal statistics will be calculated.
+    stats : list, optional
+        A list of statistics to calculate. Supported statistics include
+        "count", "sum", "mean", "min", "max", "std", "range", "median",
+        and percentiles in the form "percentile_<q>" (e.g.
+        "percentile_90"). Defaults to ``["count", "min", "max", "mean"]``.
+    nodata : int or float, optional
+        Pixels with this value will be excluded from statistics. NaN
+        pixels are always excluded. Defaults to the nodata value of
+        ``da``, if available.
+    crs : str or CRS object, optional
+        If ``da``'s coordinate reference system (CRS) cannot be
+        determined, provide a CRS using this parameter.
+        (e.g. 'EPSG:3577').
+    **rasterio_kwargs :
+        Optional keyword arguments to ``rasterio.features.rasterize``
+        used when rasterizing polygons, e.g. "all_touched".
+
+    Returns
+    -------
+    stats_df : pandas.DataFrame
+        A ``pandas.DataFrame`` with the same index as ``gdf``, and a
+        column for each statistic. Statistics for polygons containing
+        no valid pixels will be NaN (with a "count" of 0).
+    """
+
+    # Verify statistics are supported, and identify any percentiles
+    percentiles = {}
+    for stat in stats:
+        if stat == "median":
+            percentiles[stat] = 50.0
+        elif stat.startswith("percentile_"):
+            try:
+                percentiles[stat] = float(stat.split("_", 1)[1])
+            except ValueError:
+                raise ValueError(f"Invalid percentile statistic '{stat}'.")
+            if not 0 <= percentiles[stat] <= 100:
+                raise ValueError(f"Invalid percentile statistic '{stat}'.")
+        elif stat not in ("count", "sum", "mean", "min", "max", "std", "range"):
+            raise ValueError(
+                f"Unsupported statistic '{stat}'; supported statistics are "
+                "'count', 'sum', 'mean', 'min', 'max', 'std', 'range', "
+                "'median' and 'percentile_<q>'."
+            )
+
+    if da.ndim != 2:
+        raise ValueError(
+            "`da` must be a two-dimensional array; select a single "
+            "timestep or band before calculating zonal statistics."
+        )
+
+    # Add GeoBox and odc.* accessor to array using `odc-geo`
+    da = add_geobox(da, crs)
+    nodata = da.odc.nodata if nodata is None else nodata
+
+    # Rasterize polygons once as integer zone IDs (starting at 1, with 0
+    # for pixels outside all polygons), using the same chunks as `da`
+    n_zones = len(gdf.index)
+    zones_gdf = gpd.GeoDataFrame(
+        {"zone": np.arange(1, n_zones + 1, dtype="int32")},
+        geometry=gdf.geometry.values,
+        crs=gdf.crs,
+    )
+    zones = xr_rasterize(
+        zones_gdf,
+        da,
+        attribute_col="zone",
+        verbose=False,
+        chunks=da.chunks,
+        fill=0,
+        dtype="int32",
+        **rasterio_kwargs,
+    )
+
+    # Calculate partial statistics for each chunk in parallel (or for
+    # the entire array at once if `da` is not Dask-backed)
+    partials = _zonal_map(_zonal_block, da, zones, n_zones, nodata)
+
+    # Combine partial statistics from each chunk. Sums of squared
+    # deviations are combined using the parallel variance algorithm
+    ids, counts, sums, m2, mins, maxs = [
+        np.concatenate(arrays) for arrays in zip(*partials)
+    ]
+    count = np.bincount(ids, weights=counts, minlength=n_zones + 1)
+    total = np.bincount(ids, weights=sums, minlength=n_zones + 1)
+    mean = total / np.where(count > 0, count, np.nan)
+    deviations = counts * (sums / counts - mean[ids]) ** 2
+    m2_total = np.bincount(ids, weights=m2 + deviations, minlength=n_zones + 1)
+    minimum = np.full(n_zones + 1, np.nan)
+    maximum = np.full(n_zones + 1, np.nan)
+    minimum[count > 0] = np.inf
+    maximum[count > 0] = -np.inf
+    np.minimum.at(minimum, ids, mins)
+    np.maximum.at(maximum, ids, maxs)
+
+    # Calculate percentiles using additional passes over the data
+    if percentiles:
+        percentile_values = _zonal_percentiles(
+            da, zones, nodata, count, minimum, maximum, set(percentiles.values())
+        )
+        percentile_values = {q: values[1:] for q, values in percentile_values.items()}
+
+    # Select requested statistics, excluding outside-zone pixels (0)
+    empty = count[1:] == 0
+    outputs = {
+        "count": count[1:].astype("int64"),
+        "sum": np.where(empty, np.nan, total[1:]),
+        "mean": mean[1:],
+        "min": minimum[1:],
+        "max": maximum[1:],
+        "std": np.sqrt(m2_total[1:] / np.where(empty, np.nan, count[1:])),
+        "range": maximum[1:] - minimum[1:],
+    }
+    stats_df = pd.DataFrame(
+        {
+            stat: (
+                percentile_values[percentiles[stat]]
+                if stat in percentiles
+                else outputs[stat]
+            )
+            for stat in stats
+        },
+        index=gdf.index,
+    )
+
+    return stats_df
+
+
 def zonal_stats_parallel(shp, raster, statistics, out_shp, ncpus, **kwargs):
     """
     Summarizing raster datasets based on vector geometries in parallel.
     Each cpu recieves an equal chunk of the dataset.
     Utilizes the perrygeo/rasterstats package.
 
+    For large numbers of polygons, `xr_zonal_stats` provides a much
+    faster raster-based alternative that returns statistics as a
+    `pandas.DataFrame`.
+
     Parameters
     ----------
     shp : str
@@ -1415,7 +2502,7 @@ def hillshade(dem, elevation, azimuth, vert_exag=1, dx=30, dy=30):
     return hs
 
 
-def sun_angles(dc, query):
+def sun_angles(dc, query, dataset_cache=False):
     """
     For a given spatiotemporal query, calculate mean sun
     azimuth and elevation for each satellite observation, and
@@ -1429,6 +2516,13 @@ def sun_angles(dc, query):
     query : dict
         A dictionary containing query parameters used to identify
         satellite observations and load metadata.
+    dataset_cache : bool or DatasetCache, optional
+        Whether to re-use the results of previous identical dataset
+        searches (e.g. from `load_ard`) instead of querying the datacube
+        database again. Set to True to use the cache shared with
+        `dea_tools.datahandling.load_ard`, or supply a custom
+        `DatasetCache`. Defaults to False, which always searches the
+        database.
 
     Returns:
     --------
@@ -1439,11 +2533,15 @@ def sun_angles(dc, query):
 
     from datacube.api.query import query_group_by
     from datacube.model.utils import xr_apply
+    from dea_tools.datahandling import _find_datasets
 
     # Identify satellite datasets and group outputs using the
     # same approach used to group satellite imagery (i.e. solar day)
     gb = query_group_by(**query)
-    datasets = dc.find_datasets(**query)
+    find_query = {k: v for k, v in query.items() if k != "product"}
+    datasets = _find_datasets(
+        dc, query.get("product"), cache=dataset_cache, **find_query
+    )
     dataset_array = dc.group_datasets(datasets, gb)
 
     # Load and take the mean of metadata from each product
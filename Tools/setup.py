@@ -76,6 +76,7 @@ EXTRAS = {
     'jupyter': ['ipython', 'ipywidgets', 'ipyleaflet'],
     'dask_gateway': ['dask_gateway'],
     'otps': ['otps'],  # tidal model, hard to install; available on Sandbox/NCI
+    'zarr': ['zarr'],  # local caching of `load_ard` outputs
 }
 
 # The rest you shouldn't have to touch too much :)